@@ -0,0 +1,317 @@
+"""
+Endpoint benchmark suite with latency percentiles and baseline regression checks
+
+Drives every API route through the Flask test client and over real HTTP, with
+cold caches (all server caches dropped before each request) and warm caches.
+Reports p50/p95/p99 latency, throughput and peak RSS, writes the results as
+JSON and compares them against a saved baseline. Each mode and cache state runs
+in its own process, so its peak RSS is not inherited from an earlier run.
+
+By default it runs against the local data source (F1_DATA_SOURCE=local), so it
+needs no network. Disk caches are written to a temporary directory.
+
+Usage:
+    python benchmarks/bench_endpoints.py --save-baseline
+    python benchmarks/bench_endpoints.py                      # fails on regressions
+    python benchmarks/bench_endpoints.py --mode http --concurrency 8 --requests 50
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, 'results', 'endpoints_latest.json')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'results', 'endpoints_baseline.json')
+
+# Routes under test, formatted with season, race and driver codes
+ROUTES = [
+    '/api/seasons',
+    '/api/season/{season}/races',
+    '/api/season/{season}/race/{race}/race',
+    '/api/season/{season}/race/{race}/qualifying',
+    '/api/season/{season}/race/{race}/race/laps',
+    '/api/season/{season}/race/{race}/race/strategy',
+    '/api/season/{season}/race/{race}/event_type',
+    '/api/season/{season}/race/{race}/race/compare?a={a}&b={b}',
+    '/api/season/{season}/race/{race}/race/telemetry?driver={a}&lap=10&points=500',
+    '/api/season/{season}/race/{race}/race/distribution?by=driver',
+    '/api/season/{season}/race/{race}/race/degradation',
+    '/api/season/{season}/race/{race}/race/simulate?samples=200',
+    '/api/test'
+]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, never decreases within a process"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return usage / (1024 * 1024) if platform.system() == 'Darwin' else usage / 1024
+
+
+def summarize(latencies, errors, wall_time):
+    """Latency percentiles in ms and throughput for one route"""
+    values = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p95": round(float(np.percentile(values, 95)), 2),
+        "p99": round(float(np.percentile(values, 99)), 2),
+        "mean": round(float(values.mean()), 2),
+        "throughput": round(len(latencies) / wall_time, 1) if wall_time > 0 else None
+    }
+
+
+def make_client_fetch(app):
+    """Request function going through the Flask test client"""
+    client = app.test_client()
+
+    def fetch(url):
+        response = client.get(url)
+        response.get_data()
+        return response.status_code
+
+    return fetch
+
+
+def start_http_server(app):
+    """Serve the app on a free local port in a background thread, returns (server, base_url)"""
+    from werkzeug.serving import make_server
+
+    http_server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    return http_server, f"http://127.0.0.1:{http_server.server_port}"
+
+
+def make_http_fetch(base_url):
+    """Request function going over real HTTP"""
+    def fetch(url):
+        try:
+            with urllib.request.urlopen(base_url + url, timeout=120) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    return fetch
+
+
+def run_route(fetch, url, requests, concurrency, cold, reset):
+    """Time repeated requests to one route"""
+    latencies = []
+    errors = 0
+
+    def timed():
+        start = time.perf_counter()
+        status = fetch(url)
+        return time.perf_counter() - start, status
+
+    if not cold:
+        fetch(url)  # Warm-up request fills the caches
+
+    wall_start = time.perf_counter()
+    if cold or concurrency <= 1:
+        for _ in range(requests):
+            if cold:
+                reset()
+            elapsed, status = timed()
+            latencies.append(elapsed)
+            errors += status >= 400
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for elapsed, status in pool.map(lambda _: timed(), range(requests)):
+                latencies.append(elapsed)
+                errors += status >= 400
+    wall_time = time.perf_counter() - wall_start
+
+    return summarize(latencies, errors, wall_time)
+
+
+def compare_to_baseline(results, baseline, tolerance, min_ms):
+    """List of regressions where p95 grew beyond tolerance and an absolute floor"""
+    regressions = []
+    for mode, routes in baseline.get('results', {}).items():
+        for route, base in routes.items():
+            current = results['results'].get(mode, {}).get(route)
+            if current is None:
+                continue
+            limit = base['p95'] * (1 + tolerance) + min_ms
+            if current['p95'] > limit:
+                regressions.append(f"{mode} {route}: p95 {current['p95']} ms > {limit:.2f} ms "
+                                   f"(baseline {base['p95']} ms)")
+            if current['errors'] > base['errors']:
+                regressions.append(f"{mode} {route}: {current['errors']} errors (baseline {base['errors']})")
+    return regressions
+
+
+def run_worker(args, urls):
+    """Run one mode and cache state, e.g. client/cold, and write its results to args.output"""
+    mode, cache = args.worker.split('/')
+
+    # Disk caches go to a scratch directory so cold runs never see earlier results
+    work_dir = tempfile.mkdtemp(prefix='f1-bench-')
+    os.chdir(work_dir)
+    os.environ['F1_DATA_SOURCE'] = args.source
+    os.environ.setdefault('F1_LOCAL_DATA_DIR', os.path.join(REPO_DIR, 'recorded_sessions'))
+    os.environ['F1_LOCAL_LOAD_LATENCY_MS'] = str(args.load_latency_ms)
+
+    import logging
+    import server
+    logging.disable(logging.WARNING)
+
+    def reset():
+        server.clear_caches()
+        for cache_dir in (server.TELEMETRY_CACHE_DIR, server.SKETCH_CACHE_DIR):
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            os.makedirs(cache_dir, exist_ok=True)
+
+    http_server = None
+    routes = {}
+    try:
+        if mode == 'client':
+            fetch = make_client_fetch(server.app)
+        else:
+            http_server, base_url = start_http_server(server.app)
+            fetch = make_http_fetch(base_url)
+
+        print(f"\n== {args.worker} ==")
+        print(f"{'route':<90} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8} {'err':>4}")
+
+        reset()
+        for url in urls:
+            stats = run_route(fetch, url, args.requests, args.concurrency, cache == 'cold', reset)
+            routes[url] = stats
+            print(f"{url:<90} {stats['p50']:>9} {stats['p95']:>9} {stats['p99']:>9} "
+                  f"{stats['throughput']:>8} {stats['errors']:>4}")
+
+        rss = round(peak_rss_mb(), 1)
+        print(f"peak RSS: {rss} MB", flush=True)
+    finally:
+        if http_server is not None:
+            http_server.shutdown()
+        os.chdir(REPO_DIR)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump({"results": routes, "peakRssMb": rss}, f)
+    return 0
+
+
+def run_in_worker(key):
+    """Run one mode and cache state in a fresh interpreter, returns its results"""
+    fd, path = tempfile.mkstemp(prefix='f1-bench-', suffix='.json')
+    os.close(fd)
+    try:
+        # Later options win, so the worker keeps every other option given to this run
+        subprocess.run([sys.executable, os.path.abspath(__file__), *sys.argv[1:],
+                        '--worker', key, '--output', path], check=True)
+        with open(path) as f:
+            return json.load(f)
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API endpoints")
+    parser.add_argument('--mode', choices=['client', 'http', 'both'], default='both')
+    parser.add_argument('--cache', choices=['cold', 'warm', 'both'], default='both')
+    parser.add_argument('--requests', type=int, default=20, help="Requests per route and mode")
+    parser.add_argument('--concurrency', type=int, default=4, help="Concurrent HTTP clients in warm mode")
+    parser.add_argument('--source', choices=['local', 'fastf1'], default='local')
+    parser.add_argument('--load-latency-ms', type=float, default=0, help="Artificial local session load latency")
+    parser.add_argument('--season', type=int, default=2023)
+    parser.add_argument('--race', default='bahrain_grand_prix')
+    parser.add_argument('--drivers', default='VER,LEC')
+    parser.add_argument('--route', action='append', help="Only run routes containing this text")
+    parser.add_argument('--output', default=DEFAULT_RESULTS)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative p95 increase")
+    parser.add_argument('--min-ms', type=float, default=2.0, help="Absolute p95 slack in ms")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    driver_a, driver_b = args.drivers.split(',')
+    urls = [route.format(season=args.season, race=args.race, a=driver_a, b=driver_b) for route in ROUTES]
+    if args.route:
+        urls = [url for url in urls if any(text in url for text in args.route)]
+
+    if args.worker:
+        return run_worker(args, urls)
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline)
+
+    modes = ['client', 'http'] if args.mode == 'both' else [args.mode]
+    caches = ['cold', 'warm'] if args.cache == 'both' else [args.cache]
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "source": args.source,
+            "season": args.season,
+            "race": args.race,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "python": platform.python_version(),
+            "machine": platform.machine()
+        },
+        "results": {},
+        "peakRssMb": {}
+    }
+
+    for mode in modes:
+        for cache in caches:
+            key = f"{mode}/{cache}"
+            run = run_in_worker(key)
+            results['results'][key] = run['results']
+            results['peakRssMb'][key] = run['peakRssMb']
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        shutil.copyfile(output, baseline_path)
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print("No baseline found, run with --save-baseline to create one")
+        return 0
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance, args.min_ms)
+    if regressions:
+        print(f"\nREGRESSIONS against {baseline_path}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"\nNo regressions against {baseline_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Micro-benchmarks for the session processing functions in server.py
+
+Runs the /laps JSON encoding, process_race_data, process_qualifying_data,
+process_practice_data, extract_strategy_from_laps and get_fastest_lap against
+pickled session fixtures of different sizes (sprint, full race, long practice)
+and reports time per call plus tracemalloc peak memory and allocated blocks.
+Fixture sessions are put in the session cache, so laps_json measures the
+encoding from the cached lap table as get_lap_data does it.
+
+Fixtures default to synthetic sessions written to benchmarks/fixtures/. A real
+session can be pickled from FastF1 with --record.
+
+Alternate implementations are compared with --ab, giving the function name and
+a module:function with the same signature:
+    python benchmarks/bench_processing.py --ab process_race_data=my_module:process_race_data_v2
+
+Usage:
+    python benchmarks/bench_processing.py
+    python benchmarks/bench_processing.py --function laps_json --repeat 50
+    python benchmarks/bench_processing.py --record 2023 "Bahrain Grand Prix" Race race_bahrain
+"""
+import argparse
+import importlib
+import os
+import pickle
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Synthetic fixtures: name -> (season, race_id, synthetic session type, FastF1 session name)
+SYNTHETIC_FIXTURES = {
+    'sprint': (2023, 'austrian_grand_prix', 'sprint', 'Sprint'),
+    'race': (2023, 'monaco_grand_prix', 'race', 'Race'),
+    'long_practice': (2023, 'bahrain_grand_prix', 'practice2', 'Practice 2')
+}
+
+# Positional arguments each benchmarked function takes, built from a fixture
+FUNCTION_ARGS = {
+    'laps_json': lambda fixture: (fixture['key'],),
+    'process_race_data': lambda fixture: (fixture['session'], fixture['season']),
+    'process_qualifying_data': lambda fixture: (fixture['session'], fixture['season']),
+    'process_practice_data': lambda fixture: (fixture['session'], fixture['season']),
+    'extract_strategy_from_laps': lambda fixture: (fixture['laps_data'],),
+    'get_fastest_lap': lambda fixture: (fixture['session'],)
+}
+
+
+def laps_json(key):
+    """JSON /laps body of a cached session, as get_lap_data writes it"""
+    import server
+
+    return server.session_models.LapsPayload(server.get_session_lap_table(*key)).encode_json()
+
+
+# Benchmarked functions that are not defined in server.py
+LOCAL_FUNCTIONS = {
+    'laps_json': laps_json
+}
+
+
+def make_synthetic_fixtures(fixture_dir):
+    """Pickle synthetic sessions of each size into fixture_dir"""
+    import data_sources
+
+    os.makedirs(fixture_dir, exist_ok=True)
+    for name, (season, race_id, session_type, session_name) in SYNTHETIC_FIXTURES.items():
+        schedule = data_sources.synthetic_schedule(season)
+        event = schedule[schedule['EventName'] == race_id.replace('_', ' ').title()].iloc[0].copy()
+        event['year'] = season
+
+        session = data_sources.LocalSession(season, event, session_name, None, 0)
+        session._laps = data_sources.synthetic_laps_frame(season, race_id, session_type)
+        session._results = data_sources.synthetic_results_frame(season, race_id, session_type, session._laps)
+
+        with open(os.path.join(fixture_dir, f"{name}.pkl"), 'wb') as f:
+            pickle.dump({'season': season, 'session': session}, f)
+        print(f"Wrote fixture {name}: {len(session.laps)} laps")
+
+
+def record_fixture(season, event_name, session_type, name, fixture_dir):
+    """Load a real session through FastF1 and pickle it as a fixture"""
+    import data_sources
+
+    session = data_sources.FastF1Source().get_session(season, event_name, session_type)
+    session.load()
+
+    os.makedirs(fixture_dir, exist_ok=True)
+    with open(os.path.join(fixture_dir, f"{name}.pkl"), 'wb') as f:
+        pickle.dump({'season': season, 'session': session}, f)
+    print(f"Recorded fixture {name}: {len(session.laps)} laps")
+
+
+def load_fixtures(fixture_dir, names):
+    """Unpickle fixtures into the session cache, adding the /laps payload that extract_strategy_from_laps consumes"""
+    import json
+    import server
+
+    fixtures = {}
+    for filename in sorted(os.listdir(fixture_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext != '.pkl' or (names and name not in names):
+            continue
+        with open(os.path.join(fixture_dir, filename), 'rb') as f:
+            fixture = pickle.load(f)
+
+        # Cached under the fixture's name, so fixtures of the same event do not collide
+        session = fixture['session']
+        fixture['key'] = (fixture['season'], f"Fixture {name}", session.name)
+        server.store_session_entry(fixture['key'], server.make_session_entry(session, *fixture['key'][:2]))
+        fixture['laps_data'] = json.loads(laps_json(fixture['key']))['lapsData']
+
+        fixture['laps'] = len(fixture['session'].laps)
+        fixtures[name] = fixture
+    return fixtures
+
+
+def resolve(spec):
+    """Import a module:function spec"""
+    module_name, _, function_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def measure(function, args, repeat):
+    """Median and best time per call in ms, then tracemalloc peak KB and net allocated blocks"""
+    function(*args)  # Warm-up, fills per-session caches the real server would also have warm
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+    del result
+
+    return {
+        "median_ms": statistics.median(times),
+        "best_ms": min(times),
+        "peak_kb": peak / 1024,
+        "blocks": blocks
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark the session processing functions")
+    parser.add_argument('--fixture-dir', default=FIXTURE_DIR)
+    parser.add_argument('--fixture', action='append', help="Only run these fixtures (file name without .pkl)")
+    parser.add_argument('--function', action='append', choices=list(FUNCTION_ARGS))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--ab', action='append', default=[], metavar='NAME=MODULE:FUNCTION',
+                        help="Compare an alternate implementation of a function")
+    parser.add_argument('--make-fixtures', action='store_true', help="Rewrite the synthetic fixtures")
+    parser.add_argument('--record', nargs=4, metavar=('SEASON', 'EVENT', 'SESSION', 'NAME'),
+                        help="Pickle a real FastF1 session as a fixture and exit")
+    args = parser.parse_args()
+
+    fixture_dir = os.path.abspath(args.fixture_dir)
+
+    # Processing touches the telemetry store for the speed trap, keep that out of the repo
+    work_dir = tempfile.mkdtemp(prefix='f1-bench-')
+    os.chdir(work_dir)
+    os.environ.setdefault('F1_DATA_SOURCE', 'local')
+    # Fixtures are not in any schedule, the background refresher must not try to reload them
+    os.environ.setdefault('F1_SESSION_REFRESH', '0')
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    try:
+        if args.record:
+            season, event_name, session_type, name = args.record
+            record_fixture(int(season), event_name, session_type, name, fixture_dir)
+            return 0
+
+        if args.make_fixtures or not os.path.isdir(fixture_dir) or not os.listdir(fixture_dir):
+            make_synthetic_fixtures(fixture_dir)
+
+        import server
+        logging.disable(logging.WARNING)
+
+        fixtures = load_fixtures(fixture_dir, args.fixture)
+        functions = args.function or list(FUNCTION_ARGS)
+        alternates = dict(spec.split('=', 1) for spec in args.ab)
+
+        print(f"{'function':<28} {'fixture':<16} {'laps':>6} {'impl':<6} "
+              f"{'median ms':>10} {'best ms':>9} {'peak KB':>10} {'blocks':>8}")
+
+        with server.app.app_context():
+            for function_name in functions:
+                implementations = [('A', LOCAL_FUNCTIONS.get(function_name) or getattr(server, function_name))]
+                if function_name in alternates:
+                    implementations.append(('B', resolve(alternates[function_name])))
+
+                for fixture_name, fixture in fixtures.items():
+                    call_args = FUNCTION_ARGS[function_name](fixture)
+                    results = {}
+                    for label, function in implementations:
+                        stats = measure(function, call_args, args.repeat)
+                        results[label] = stats
+                        print(f"{function_name:<28} {fixture_name:<16} {fixture['laps']:>6} {label:<6} "
+                              f"{stats['median_ms']:>10.3f} {stats['best_ms']:>9.3f} "
+                              f"{stats['peak_kb']:>10.1f} {stats['blocks']:>8}")
+
+                    if 'B' in results:
+                        speedup = results['A']['median_ms'] / results['B']['median_ms']
+                        memory = results['B']['peak_kb'] / results['A']['peak_kb'] if results['A']['peak_kb'] else 0
+                        print(f"{'':<28} {fixture_name:<16} {'':>6} {'B/A':<6} "
+                              f"{speedup:>9.2f}x faster, {memory:.2f}x peak memory")
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
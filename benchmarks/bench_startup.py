@@ -0,0 +1,99 @@
+"""
+Startup benchmark: import time of server.py and first-request latency, eager vs fast-startup
+
+Every run is a fresh interpreter, so nothing is already imported. Reports the
+time to import server, the first request to each light route and to a
+session route, and whether pandas, NumPy or FastF1 were loaded by then. Fails
+when a light route triggers the deferred imports in fast-startup mode.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--source local]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pandas', 'numpy', 'fastf1')
+
+# Light routes must never load the heavy modules, the session route always does
+LIGHT_ROUTES = ['/api/seasons', '/api/test', '/', '/styles.css']
+SESSION_ROUTE = '/api/season/2023/race/bahrain_grand_prix/race/laps'
+
+# Runs in a fresh interpreter and prints one JSON line
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {repo!r})
+import logging
+import server
+import lazy_imports
+logging.disable(logging.WARNING)
+result = {{"importMs": (time.perf_counter() - start) * 1000, "routes": {{}}}}
+
+client = server.app.test_client()
+for url in {routes!r}:
+    start = time.perf_counter()
+    response = client.get(url)
+    response.get_data()
+    response.close()
+    result["routes"][url] = {{
+        "ms": (time.perf_counter() - start) * 1000,
+        "status": response.status_code,
+        "loaded": [name for name in {heavy!r} if lazy_imports.is_loaded(name)]
+    }}
+print(json.dumps(result))
+"""
+
+
+def run_once(fast, routes, env):
+    """Import the server in a fresh interpreter and time the first requests"""
+    env = dict(env, F1_FAST_STARTUP='1' if fast else '0')
+    code = CHILD.format(repo=REPO_DIR, routes=routes, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark server startup with and without fast-startup mode")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--source', choices=['local', 'fastf1'], default='local')
+    args = parser.parse_args()
+
+    env = dict(os.environ, F1_DATA_SOURCE=args.source)
+    env.setdefault('F1_LOCAL_DATA_DIR', os.path.join(REPO_DIR, 'recorded_sessions'))
+    routes = LIGHT_ROUTES + ([SESSION_ROUTE] if args.source == 'local' else [])
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix='f1-bench-') as work_dir:
+        os.chdir(work_dir)
+        for fast in (False, True):
+            runs = [run_once(fast, routes, env) for _ in range(args.repeat)]
+            mode = 'fast-startup' if fast else 'eager'
+
+            print(f"\n== {mode} ==")
+            print(f"{'import server':<60} {statistics.median(r['importMs'] for r in runs):>9.1f} ms")
+            for url in routes:
+                first = runs[0]['routes'][url]
+                ms = statistics.median(r['routes'][url]['ms'] for r in runs)
+                loaded = ', '.join(first['loaded']) or '-'
+                print(f"{'first ' + url:<60} {ms:>9.1f} ms  status {first['status']}  loaded: {loaded}")
+                if fast and url in LIGHT_ROUTES and first['loaded']:
+                    failures.append(f"{url} loaded {loaded} in fast-startup mode")
+        os.chdir(REPO_DIR)
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Benchmark the strategy simulator throughput in strategies per second
+
+Runs on fixed synthetic inputs, so it needs neither network access nor a FastF1 cache.
+Usage: python benchmarks/bench_strategy_sim.py [--laps 57] [--samples 200] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import strategy_sim  # noqa: E402
+
+# Representative dry race inputs, close to a mid-season street-free circuit
+BENCH_INPUTS = {
+    "baseTime": 92.0,
+    "fuelEffect": 0.03,
+    "compounds": {
+        "Soft": {"offset": 0.0, "degradation": 0.09, "spread": 0.02},
+        "Medium": {"offset": 0.45, "degradation": 0.05, "spread": 0.015},
+        "Hard": {"offset": 0.85, "degradation": 0.03, "spread": 0.01}
+    }
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--laps', type=int, default=57)
+    parser.add_argument('--samples', type=int, default=strategy_sim.DEFAULT_SAMPLES)
+    parser.add_argument('--max-stops', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    inputs = dict(BENCH_INPUTS, totalLaps=args.laps)
+
+    rates = []
+    for run in range(args.repeat):
+        result = strategy_sim.simulate(inputs, samples=args.samples, max_stops=args.max_stops, seed=run)
+        stats = result['stats']
+        rates.append(stats['strategiesPerSecond'])
+        print(f"run {run + 1}: {stats['plansEvaluated']} plans x {stats['samples']} samples "
+              f"in {stats['elapsedMs']} ms ({stats['strategiesPerSecond']} strategies/s)")
+
+    rates.sort()
+    print(f"median: {rates[len(rates) // 2]} strategies/s, best: {rates[-1]} strategies/s")
+    print(f"best plan: {result['plans'][0]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+"""
+Static asset build: bundle, minify, fingerprint and precompress the front end
+
+Concatenates the scripts referenced by static/index.html into one bundle and
+the stylesheet into one file, minifies both, names them by content hash and
+writes gzip (and brotli, when the brotli package is installed) variants next
+to them in static/dist/. A copy of index.html pointing at the hashed files is
+written to static/dist/index.html, which the server prefers when present.
+
+Usage:
+    python build_static.py [--static-dir static]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DIST_DIR_NAME = 'dist'
+
+# Scripts also started as Web Workers from their own URL, each is kept out of the
+# bundle and written as a hashed asset of its own that the page loads before the bundle
+WORKER_SCRIPTS = ('lap-data-worker.js',)
+
+# Local scripts and stylesheets in index.html, CDN links are left alone
+SCRIPT_TAG = re.compile(r'[ \t]*<script src="(?!https?:)([^"]+\.js)"></script>\n?')
+STYLESHEET_TAG = re.compile(r'[ \t]*<link rel="stylesheet" href="(?!https?:)([^"]+\.css)">\n?')
+
+# Spaces next to these characters never matter in scripts
+JS_PUNCTUATION_SPACE = re.compile(r' ?([{}()\[\];,:=<>?&|!]) ?')
+
+# Characters and keywords after which a '/' starts a regular expression rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'yield', 'await',
+                  'new', 'delete', 'throw', 'instanceof'}
+LITERAL_PLACEHOLDER = re.compile(r'\x00(\d+)\x00')
+
+
+def minify_js(source):
+    """Strip comments and redundant whitespace from a script
+
+    Conservative on purpose: line breaks are kept so automatic semicolon
+    insertion is never affected, and strings, template literals and regular
+    expression literals are copied verbatim. Unterminated literals raise
+    ValueError instead of producing a broken bundle.
+    """
+    code = []
+    literals = []
+    i = 0
+    n = len(source)
+    # Brace depth at each open ${...} inside template literals
+    template_depths = []
+    depth = 0
+
+    def add_literal(text):
+        # Literals are swapped for placeholders so whitespace handling never touches them
+        code.append(f"\x00{len(literals)}\x00")
+        literals.append(text)
+
+    def copy_template(start):
+        """Copy template text from start up to the closing backtick or a ${, returns (index, opened)"""
+        j = start + 1
+        while j < n:
+            if source[j] == '\\':
+                j += 2
+            elif source[j] == '`':
+                add_literal(source[start:j + 1])
+                return j + 1, False
+            elif source.startswith('${', j):
+                add_literal(source[start:j + 2])
+                return j + 2, True
+            else:
+                j += 1
+        raise ValueError("Unterminated template literal")
+
+    def regex_allowed():
+        """Whether a '/' here starts a regular expression, decided by the previous token"""
+        k = len(code) - 1
+        while k >= 0 and code[k].isspace():
+            k -= 1
+        if k < 0:
+            return True
+
+        previous = code[k]
+        placeholder = LITERAL_PLACEHOLDER.fullmatch(previous)
+        if placeholder:
+            # After a string, regex or template a '/' divides, unless a ${ was just opened
+            return literals[int(placeholder.group(1))].endswith('${')
+        if previous in '+-' and k > 0 and code[k - 1] == previous:
+            # After a postfix ++ or -- a '/' divides
+            return False
+        if previous in REGEX_PRECEDERS:
+            return True
+
+        # After an identifier or number it divides, unless the word is a keyword like return
+        word = ''
+        while k >= 0 and (code[k].isalnum() or code[k] in '_$'):
+            word = code[k] + word
+            k -= 1
+        return word in REGEX_KEYWORDS
+
+    while i < n:
+        c = source[i]
+
+        if c in '"\'':
+            j = i + 1
+            while j < n and source[j] != c and source[j] != '\n':
+                j += 2 if source[j] == '\\' else 1
+            if j >= n or source[j] != c:
+                raise ValueError(f"Unterminated string literal at offset {i}")
+            add_literal(source[i:j + 1])
+            i = j + 1
+        elif c == '`' or (c == '}' and template_depths and depth - 1 == template_depths[-1]):
+            if c == '}':
+                # End of a ${...} expression, the template literal continues
+                depth -= 1
+                template_depths.pop()
+            i, opened = copy_template(i)
+            if opened:
+                template_depths.append(depth)
+                depth += 1
+        elif source.startswith('//', i):
+            while i < n and source[i] != '\n':
+                i += 1
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            if end == -1:
+                raise ValueError(f"Unterminated comment at offset {i}")
+            code.append('\n' if '\n' in source[i:end] else ' ')
+            i = end + 2
+        elif c == '/' and regex_allowed():
+            j = i + 1
+            in_class = False
+            while j >= n or in_class or source[j] != '/':
+                if j >= n or source[j] == '\n':
+                    raise ValueError(f"Unterminated regular expression at offset {i}")
+                if source[j] == '\\':
+                    j += 1
+                elif source[j] == '[':
+                    in_class = True
+                elif source[j] == ']':
+                    in_class = False
+                j += 1
+            j += 1
+            while j < n and source[j].isalpha():
+                j += 1
+            add_literal(source[i:j])
+            i = j
+        else:
+            if c == '{':
+                depth += 1
+            elif c == '}':
+                depth -= 1
+            code.append(c)
+            i += 1
+
+    if template_depths:
+        raise ValueError("Unterminated template literal")
+
+    lines = []
+    for line in ''.join(code).split('\n'):
+        line = re.sub(r'[ \t]+', ' ', line).strip()
+        if line:
+            lines.append(JS_PUNCTUATION_SPACE.sub(r'\1', line))
+
+    return LITERAL_PLACEHOLDER.sub(lambda match: literals[int(match.group(1))], '\n'.join(lines))
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    parts = re.split(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')', source)
+    for index in range(0, len(parts), 2):
+        text = re.sub(r'\s+', ' ', parts[index])
+        text = re.sub(r' ?([{};,>]) ?', r'\1', text)
+        text = re.sub(r': ', ':', text)
+        text = text.replace(';}', '}')
+        parts[index] = text
+    return ''.join(parts).strip()
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def write_asset(dist_dir, stem, ext, text):
+    """Write a hashed asset with .gz and .br variants, returns its file name"""
+    data = text.encode('utf-8')
+    name = f"{stem}.{content_hash(data)}{ext}"
+    path = os.path.join(dist_dir, name)
+
+    with open(path, 'wb') as f:
+        f.write(data)
+    with open(f"{path}.gz", 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(f"{path}.br", 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+    return name
+
+
+def build(static_dir):
+    """Build static/dist from static/index.html, returns the manifest"""
+    with open(os.path.join(static_dir, 'index.html')) as f:
+        index = f.read()
+
+    scripts = [name for name in SCRIPT_TAG.findall(index) if name not in WORKER_SCRIPTS]
+    workers = [name for name in SCRIPT_TAG.findall(index) if name in WORKER_SCRIPTS]
+    stylesheets = STYLESHEET_TAG.findall(index)
+
+    def read(name):
+        with open(os.path.join(static_dir, name)) as f:
+            return f.read()
+
+    # Scripts share the global scope, so one bundle in the original order behaves the same
+    bundle = '\n;\n'.join(minify_js(read(name)) for name in scripts)
+    styles = '\n'.join(minify_css(read(name)) for name in stylesheets)
+
+    dist_dir = os.path.join(static_dir, DIST_DIR_NAME)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    os.makedirs(dist_dir)
+
+    manifest = {"scripts": scripts, "stylesheets": stylesheets}
+    manifest["bundle"] = write_asset(dist_dir, 'app', '.js', bundle)
+    manifest["styles"] = write_asset(dist_dir, 'styles', '.css', styles)
+    # Workers find their hashed URL through document.currentScript when loaded as a script
+    manifest["workers"] = {
+        name: write_asset(dist_dir, os.path.splitext(name)[0], '.js', minify_js(read(name))) for name in workers
+    }
+
+    # The first tag of each kind is replaced by the built assets, the rest are removed
+    def replace_first(pattern, text, tags):
+        replaced = []
+
+        def sub(match):
+            indent = re.match(r'[ \t]*', match.group(0)).group(0)
+            if replaced:
+                return ''
+            replaced.append(True)
+            return ''.join(f"{indent}{tag}\n" for tag in tags)
+
+        return pattern.sub(sub, text)
+
+    # Worker tags carry an attribute after src, so SCRIPT_TAG never matches them
+    script_tags = [f'<script src="{DIST_DIR_NAME}/{manifest["workers"][name]}" data-worker></script>' for name in workers]
+    script_tags.append(f'<script src="{DIST_DIR_NAME}/{manifest["bundle"]}"></script>')
+    index = replace_first(SCRIPT_TAG, index, script_tags)
+    index = replace_first(STYLESHEET_TAG, index, [f'<link rel="stylesheet" href="{DIST_DIR_NAME}/{manifest["styles"]}">'])
+    with open(os.path.join(dist_dir, 'index.html'), 'w') as f:
+        f.write(index)
+
+    with open(os.path.join(dist_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bundle, minify and precompress the static assets")
+    parser.add_argument('--static-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+    args = parser.parse_args()
+
+    manifest = build(args.static_dir)
+    dist_dir = os.path.join(args.static_dir, DIST_DIR_NAME)
+
+    built = [(manifest['bundle'], manifest['scripts']), (manifest['styles'], manifest['stylesheets'])]
+    built += [(hashed, [name]) for name, hashed in manifest['workers'].items()]
+    for asset, sources in built:
+        original = sum(os.path.getsize(os.path.join(args.static_dir, name)) for name in sources)
+        path = os.path.join(dist_dir, asset)
+        sizes = [f"{os.path.getsize(path)} minified", f"{os.path.getsize(path + '.gz')} gzip"]
+        if os.path.exists(path + '.br'):
+            sizes.append(f"{os.path.getsize(path + '.br')} brotli")
+        print(f"{asset}: {len(sources)} files, {original} bytes -> {', '.join(sizes)}")
+
+    if brotli is None:
+        print("brotli is not installed, only gzip variants were written")
+
+
+if __name__ == '__main__':
+    main()
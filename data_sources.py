@@ -0,0 +1,367 @@
+"""
+Pluggable data sources for event schedules and sessions
+
+The server only talks to a DataSource. FastF1Source forwards to FastF1 and its
+HTTP cache. LocalSource serves sessions recorded to disk with record_session,
+falling back to synthetic sessions, and can add artificial latency so endpoint
+latency, caching and concurrency changes can be benchmarked without network.
+
+The source is chosen with environment variables:
+    F1_DATA_SOURCE=fastf1|local        (default fastf1)
+    F1_LOCAL_DATA_DIR=recorded_sessions
+    F1_LOCAL_SCHEDULE_LATENCY_MS=0
+    F1_LOCAL_LOAD_LATENCY_MS=0
+
+Record a session for offline use:
+    python data_sources.py --season 2023 --event "Bahrain Grand Prix" --session Race
+"""
+import argparse
+import logging
+import os
+import pickle
+import time
+
+import threading
+from importlib import metadata
+
+import lazy_imports
+import structured_logging
+
+# Deferred in fast-startup mode until a session or schedule is actually needed
+np = lazy_imports.import_module('numpy')
+pd = lazy_imports.import_module('pandas')
+synthetic_data = lazy_imports.import_module('synthetic_data')
+
+logger = structured_logging.get_logger(__name__)
+
+DEFAULT_LOCAL_DATA_DIR = 'recorded_sessions'
+
+# FastF1 session names mapped to the synthetic generator's session types
+SYNTHETIC_SESSION_TYPES = {
+    'Race': 'race',
+    'Qualifying': 'qualifying',
+    'Practice 1': 'practice1',
+    'Practice 2': 'practice2',
+    'Practice 3': 'practice3'
+}
+
+# Synthetic telemetry sample rate, roughly that of FastF1 car data
+SYNTHETIC_TELEMETRY_HZ = 4
+
+
+def slugify(name):
+    """Lower case, underscore separated form of an event or session name"""
+    return str(name).lower().replace(' ', '_')
+
+
+class DataSource:
+    """Interface used by the server to fetch event schedules and sessions"""
+
+    name = 'base'
+
+    def get_event_schedule(self, season):
+        """Event schedule of a season with EventName, RoundNumber, EventDate, Country and Location"""
+        raise NotImplementedError
+
+    def get_session(self, season, event_name, session_type):
+        """Session object with load(), laps, results, event, name and car_data"""
+        raise NotImplementedError
+
+    def version(self):
+        """Version string reported by the test endpoint"""
+        return "Unknown"
+
+
+class FastF1Source(DataSource):
+    """Sessions from the live F1 timing service through FastF1"""
+
+    name = 'fastf1'
+
+    def __init__(self, cache_dir='fastf1_cache'):
+        self.cache_dir = cache_dir
+        self._fastf1 = None
+        self._lock = threading.Lock()
+
+        # Fast-startup workers import FastF1 and enable its cache on first use instead
+        if not lazy_imports.FAST_STARTUP:
+            self.fastf1
+
+    @property
+    def fastf1(self):
+        """The fastf1 module, imported with its cache enabled on first access"""
+        if self._fastf1 is None:
+            with self._lock:
+                if self._fastf1 is None:
+                    import fastf1
+
+                    if not os.path.exists(self.cache_dir):
+                        os.makedirs(self.cache_dir)
+                    try:
+                        fastf1.Cache.enable_cache(self.cache_dir)
+                        logger.info("FastF1 cache enabled", cache_dir=self.cache_dir)
+                    except Exception as e:
+                        logger.error("Error enabling FastF1 cache", error=str(e), cache_dir=self.cache_dir)
+                    self._fastf1 = fastf1
+        return self._fastf1
+
+    def get_event_schedule(self, season):
+        return self.fastf1.get_event_schedule(season)
+
+    def get_session(self, season, event_name, session_type):
+        return self.fastf1.get_session(season, event_name, session_type)
+
+    def version(self):
+        if self._fastf1 is not None:
+            return getattr(self._fastf1, '__version__', "Unknown")
+        # Read from package metadata so the test endpoint does not import FastF1
+        try:
+            return metadata.version('fastf1')
+        except metadata.PackageNotFoundError:
+            return "Unknown"
+
+
+
+class LocalSession:
+    """Session read from recorded files, or generated when no recording exists"""
+
+    def __init__(self, season, event, session_type, path, load_latency):
+        self.event = event
+        self.name = session_type
+        self.season = season
+        self._path = path
+        self._load_latency = load_latency
+        self._laps = None
+        self._results = None
+        self._car_data = None
+        self._synthetic = None
+
+    def load(self, laps=True, telemetry=True, weather=True, messages=True):
+        """Read the recorded session, sleeping for the configured load latency first"""
+        if self._load_latency:
+            time.sleep(self._load_latency)
+
+        if self._path and os.path.exists(os.path.join(self._path, 'results.pkl')):
+            self._results = pd.read_pickle(os.path.join(self._path, 'results.pkl'))
+            self._laps = pd.read_pickle(os.path.join(self._path, 'laps.pkl'))
+        else:
+            race_id = slugify(self.event['EventName'])
+            self._synthetic = (self.season, race_id, SYNTHETIC_SESSION_TYPES[self.name])
+            self._laps = synthetic_laps_frame(*self._synthetic)
+            self._results = synthetic_results_frame(*self._synthetic, self._laps)
+
+    @property
+    def laps(self):
+        return self._laps
+
+    @property
+    def results(self):
+        return self._results
+
+    @property
+    def car_data(self):
+        """Recorded car data per driver number, synthesized on first access when not recorded"""
+        if self._car_data is None:
+            car_data_path = os.path.join(self._path, 'car_data.pkl') if self._path else None
+            if car_data_path and os.path.exists(car_data_path):
+                with open(car_data_path, 'rb') as f:
+                    self._car_data = pickle.load(f)
+            else:
+                self._car_data = synthetic_car_data(self._laps)
+        return self._car_data
+
+
+class LocalSource(DataSource):
+    """Recorded or synthetic sessions from local files, with optional artificial latency"""
+
+    name = 'local'
+
+    def __init__(self, root=DEFAULT_LOCAL_DATA_DIR, schedule_latency=0.0, load_latency=0.0):
+        self.root = root
+        self.schedule_latency = schedule_latency
+        self.load_latency = load_latency
+
+    def get_event_schedule(self, season):
+        if self.schedule_latency:
+            time.sleep(self.schedule_latency)
+
+        path = os.path.join(self.root, str(season), 'schedule.pkl')
+        if os.path.exists(path):
+            return pd.read_pickle(path)
+        return synthetic_schedule(season)
+
+    def get_session(self, season, event_name, session_type):
+        schedule = self.get_event_schedule(season)
+        matches = schedule[schedule['EventName'].str.lower() == event_name.lower()]
+        if len(matches) == 0:
+            raise ValueError(f"No event named {event_name} in {season}")
+
+        path = os.path.join(self.root, str(season), slugify(event_name), slugify(session_type))
+        recorded = os.path.exists(os.path.join(path, 'results.pkl'))
+        if not recorded and session_type not in SYNTHETIC_SESSION_TYPES:
+            # Same behaviour as FastF1 for sessions an event did not hold
+            raise ValueError(f"Session type '{session_type}' does not exist for this event")
+
+        # FastF1 events expose the season as event.year, a 'year' label gives Series the same attribute
+        event = matches.iloc[0].copy()
+        event['year'] = season
+
+        return LocalSession(season, event, session_type, path if recorded else None, self.load_latency)
+
+    def version(self):
+        return f"local ({self.root})"
+
+
+def create_data_source():
+    """Data source selected by the F1_DATA_SOURCE environment variable"""
+    name = os.environ.get('F1_DATA_SOURCE', 'fastf1').lower()
+
+    if name == 'local':
+        source = LocalSource(
+            root=os.environ.get('F1_LOCAL_DATA_DIR', DEFAULT_LOCAL_DATA_DIR),
+            schedule_latency=float(os.environ.get('F1_LOCAL_SCHEDULE_LATENCY_MS', 0)) / 1000,
+            load_latency=float(os.environ.get('F1_LOCAL_LOAD_LATENCY_MS', 0)) / 1000
+        )
+        logger.info("Using local data source", root=source.root)
+        return source
+
+    return FastF1Source()
+
+
+def record_session(source, season, event_name, session_type, root=DEFAULT_LOCAL_DATA_DIR):
+    """Load a session from a source and write it where LocalSource can read it"""
+    season_dir = os.path.join(root, str(season))
+    os.makedirs(season_dir, exist_ok=True)
+    pd.DataFrame(source.get_event_schedule(season)).to_pickle(os.path.join(season_dir, 'schedule.pkl'))
+
+    session = source.get_session(season, event_name, session_type)
+    session.load()
+
+    path = os.path.join(season_dir, slugify(event_name), slugify(session_type))
+    os.makedirs(path, exist_ok=True)
+
+    # Plain DataFrames so recordings load without FastF1 installed
+    pd.DataFrame(session.laps).to_pickle(os.path.join(path, 'laps.pkl'))
+    pd.DataFrame(session.results).to_pickle(os.path.join(path, 'results.pkl'))
+    with open(os.path.join(path, 'car_data.pkl'), 'wb') as f:
+        pickle.dump({driver: pd.DataFrame(data) for driver, data in session.car_data.items()}, f)
+
+    logger.info("Session recorded", season=season, event=event_name, session=session_type, path=path)
+    return path
+
+
+def synthetic_schedule(season):
+    """Event schedule for the synthetic calendar, one event per fortnight from March"""
+    names = [race_id.replace('_', ' ').title() for race_id in synthetic_data.SYNTHETIC_CALENDAR]
+    places = [name.replace(' Grand Prix', '') for name in names]
+    return pd.DataFrame({
+        'RoundNumber': np.arange(1, len(names) + 1),
+        'EventName': names,
+        'EventDate': pd.date_range(f"{season}-03-03", periods=len(names), freq='14D'),
+        'Country': places,
+        'Location': places,
+        'EventFormat': 'conventional'
+    })
+
+
+def synthetic_laps_frame(season, race_id, session_type):
+    """Synthetic laps as a DataFrame with FastF1 lap column names"""
+    arrays = synthetic_data.generate_lap_arrays(season, race_id, session_type)
+    n_drivers, n_laps = arrays['time'].shape
+    codes = arrays['drivers']
+
+    # Laps run back to back from a session start one hour into the session clock
+    end_times = 3600 + np.cumsum(arrays['time'], axis=1)
+    start_times = end_times - arrays['time']
+
+    return pd.DataFrame({
+        'Driver': np.repeat(codes, n_laps),
+        'DriverNumber': np.repeat([str(i + 1) for i in range(n_drivers)], n_laps),
+        'Team': np.repeat([arrays['driverInfo'][c]['team'] for c in codes], n_laps),
+        'LapNumber': np.tile(arrays['lap'], n_drivers).astype(np.float64),
+        'LapTime': pd.to_timedelta(arrays['time'].ravel(), unit='s'),
+        'Compound': np.array([c.upper() for c in synthetic_data.COMPOUNDS])[arrays['compound'].ravel()],
+        'TyreLife': (arrays['tire_age'].ravel() + 1).astype(np.float64),
+        'Stint': (arrays['stint'].ravel() + 1).astype(np.float64),
+        'LapStartTime': pd.to_timedelta(start_times.ravel(), unit='s'),
+        'Time': pd.to_timedelta(end_times.ravel(), unit='s')
+    })
+
+
+def synthetic_results_frame(season, race_id, session_type, laps):
+    """Synthetic classification as a DataFrame with FastF1 result column names"""
+    results = synthetic_data.generate_session_results(season, race_id, session_type)
+    best_laps = laps.groupby('Driver')['LapTime'].min()
+    race_times = laps.groupby('Driver')['LapTime'].sum()
+
+    rows = []
+    for result in results:
+        first_name, _, last_name = result['name'].partition(' ')
+        row = {
+            'Position': float(result['position']),
+            'Abbreviation': result['code'],
+            'FirstName': first_name,
+            'LastName': last_name,
+            'TeamName': result['team'],
+            'Status': result['status'],
+            'Time': pd.NaT
+        }
+
+        if session_type in ('race', 'sprint') and result['status'] == 'Finished':
+            # Winner gets the race time, everyone else the gap to the winner
+            if result['position'] == 1:
+                row['Time'] = race_times[result['code']]
+            else:
+                row['Time'] = pd.to_timedelta(float(result['gap'][1:]), unit='s')
+        elif session_type == 'qualifying':
+            best = best_laps[result['code']]
+            row['Q1'] = best
+            row['Q2'] = best if result['position'] <= 15 else pd.NaT
+            row['Q3'] = best if result['position'] <= 10 else pd.NaT
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def synthetic_car_data(laps):
+    """Synthetic car data per driver number, a speed trace that repeats every lap"""
+    car_data = {}
+    for driver_number, driver_laps in laps.groupby('DriverNumber'):
+        start = driver_laps['LapStartTime'].min().total_seconds()
+        end = driver_laps['Time'].max().total_seconds()
+        session_time = np.arange(start, end, 1 / SYNTHETIC_TELEMETRY_HZ)
+
+        # Lap progress in [0, 1) for every sample, driving several corners per lap
+        starts = driver_laps['LapStartTime'].dt.total_seconds().to_numpy()
+        durations = driver_laps['LapTime'].dt.total_seconds().to_numpy()
+        lap_idx = np.clip(np.searchsorted(starts, session_time, side='right') - 1, 0, len(starts) - 1)
+        progress = (session_time - starts[lap_idx]) / durations[lap_idx]
+
+        corners = np.sin(progress * 2 * np.pi * 8)
+        speed = 215 + 95 * corners
+        braking = np.diff(speed, append=speed[-1]) < -4
+
+        car_data[driver_number] = pd.DataFrame({
+            'SessionTime': pd.to_timedelta(session_time, unit='s'),
+            'Speed': speed,
+            'Throttle': np.where(braking, 0, np.clip(60 + 45 * corners, 0, 100)),
+            'Brake': braking,
+            'nGear': np.clip(np.round(speed / 42), 1, 8).astype(np.int64),
+            'RPM': 9000 + 2500 * np.clip(corners, -1, 1)
+        })
+
+    return car_data
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Record a FastF1 session for the local data source")
+    parser.add_argument('--season', type=int, required=True)
+    parser.add_argument('--event', required=True, help="Exact event name, e.g. 'Bahrain Grand Prix'")
+    parser.add_argument('--session', action='append', required=True, help="FastF1 session name, e.g. Race")
+    parser.add_argument('--out', default=DEFAULT_LOCAL_DATA_DIR)
+    args = parser.parse_args()
+
+    fastf1_source = FastF1Source()
+    for session_name in args.session:
+        record_session(fastf1_source, args.season, args.event, session_name, args.out)
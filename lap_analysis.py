@@ -0,0 +1,414 @@
+"""
+Vectorized lap time analysis on columnar lap tables built from FastF1 sessions
+"""
+import numpy as np
+import pandas as pd
+
+import quantile_sketch
+
+# Tire compounds known to the front end, index is the compound code
+COMPOUNDS = ['Soft', 'Medium', 'Hard', 'Intermediate', 'Wet', 'Unknown']
+COMPOUND_INDEX = {name: idx for idx, name in enumerate(COMPOUNDS)}
+
+
+def normalize_compound(value):
+    """Map a FastF1 compound name to one of the known compounds"""
+    if value is None or pd.isna(value):
+        return 'Unknown'
+
+    compound_lower = str(value).lower()
+    if 'soft' in compound_lower:
+        return 'Soft'
+    elif 'medium' in compound_lower:
+        return 'Medium'
+    elif 'hard' in compound_lower:
+        return 'Hard'
+    elif 'inter' in compound_lower:
+        return 'Intermediate'
+    elif 'wet' in compound_lower:
+        return 'Wet'
+    return 'Unknown'
+
+
+def format_lap_time(seconds):
+    """Lap time as the /laps payload has always written it, e.g. 1:32.456, or 1:5.123 without zero padding"""
+    return f"{int(seconds // 60)}:{seconds % 60:.3f}"
+
+
+def empty_lap_table():
+    """Lap table with no laps"""
+    return {
+        'drivers': [],
+        'offsets': np.zeros(1, dtype=np.int64),
+        'driver': np.zeros(0, dtype=np.int16),
+        'lap': np.zeros(0, dtype=np.int16),
+        'time': np.zeros(0, dtype=np.float64),
+        'compound': np.zeros(0, dtype=np.int8),
+        'tire_age': np.zeros(0, dtype=np.int16),
+        'stint': np.zeros(0, dtype=np.int16)
+    }
+
+
+def timedelta_seconds(values):
+    """Seconds of timedeltas, NaN for NaT, exactly as Timedelta.total_seconds() gives them
+
+    That drops nanoseconds and adds the microseconds to the whole seconds, so lap
+    times format and round the same as they did when laps were read one by one.
+    """
+    deltas = pd.to_timedelta(values).to_numpy(dtype='timedelta64[ns]')
+    micros = deltas.astype('timedelta64[us]').astype(np.int64)
+    seconds = micros // 1_000_000 + (micros % 1_000_000) / 10**6
+    return np.where(np.isnat(deltas), np.nan, seconds)
+
+
+def build_lap_table(laps):
+    """Convert a laps DataFrame into NumPy columns sorted by driver and lap number"""
+    if laps is None or len(laps) == 0:
+        return empty_lap_table()
+
+    drivers = laps['Driver'].astype(str).to_numpy()
+    lap_numbers = pd.to_numeric(laps['LapNumber'], errors='coerce').to_numpy(dtype=np.float64)
+    lap_times = timedelta_seconds(laps['LapTime'])
+
+    # FastF1 calls it TyreLife, older code in this repo looked for TireLife
+    tire_column = 'TyreLife' if 'TyreLife' in laps.columns else 'TireLife'
+    if tire_column in laps.columns:
+        tire_age = pd.to_numeric(laps[tire_column], errors='coerce').fillna(0).to_numpy()
+    else:
+        tire_age = np.zeros(len(laps))
+
+    if 'Stint' in laps.columns:
+        stints = pd.to_numeric(laps['Stint'], errors='coerce').fillna(0).to_numpy()
+    else:
+        stints = None
+
+    # Normalize each distinct compound name once instead of once per lap
+    raw_compounds = laps['Compound'].astype(object).fillna('').astype(str).to_numpy() if 'Compound' in laps.columns \
+        else np.full(len(laps), '')
+    unique_compounds, compound_inverse = np.unique(raw_compounds, return_inverse=True)
+    unique_codes = np.array([COMPOUND_INDEX[normalize_compound(c or None)] for c in unique_compounds],
+                            dtype=np.int8)
+    compounds = unique_codes[compound_inverse]
+
+    # Drop laps without a time or lap number, like the /laps endpoint does
+    valid = ~np.isnan(lap_numbers) & ~np.isnan(lap_times)
+    if not valid.any():
+        return empty_lap_table()
+
+    drivers = drivers[valid]
+    driver_codes, driver_idx = np.unique(drivers, return_inverse=True)
+    lap_numbers = lap_numbers[valid].astype(np.int16)
+    order = np.lexsort((lap_numbers, driver_idx))
+
+    driver_idx = driver_idx[order].astype(np.int16)
+    compounds = compounds[valid][order]
+
+    if stints is None:
+        # Derive stints from compound changes within each driver's laps
+        new_stint = np.ones(len(order), dtype=bool)
+        new_stint[1:] = (compounds[1:] != compounds[:-1]) | (driver_idx[1:] != driver_idx[:-1])
+        stint_ids = np.cumsum(new_stint)
+        first_of_driver = np.searchsorted(driver_idx, driver_idx)
+        stints = stint_ids - stint_ids[first_of_driver] + 1
+    else:
+        stints = stints[valid][order]
+
+    return {
+        'drivers': driver_codes.tolist(),
+        'offsets': np.searchsorted(driver_idx, np.arange(len(driver_codes) + 1)),
+        'driver': driver_idx,
+        'lap': lap_numbers[order],
+        'time': lap_times[valid][order],
+        'compound': compounds,
+        'tire_age': tire_age[valid][order].astype(np.int16),
+        'stint': np.asarray(stints).astype(np.int16)
+    }
+
+
+def driver_slice(table, driver_code):
+    """Row range of a driver's laps in the lap table, or None if the driver has no laps"""
+    try:
+        idx = table['drivers'].index(driver_code)
+    except ValueError:
+        return None
+    return slice(int(table['offsets'][idx]), int(table['offsets'][idx + 1]))
+
+
+def group_medians(values, groups):
+    """Median of values within each group, broadcast back to every element"""
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    unique_groups, starts, counts = np.unique(groups[order], return_index=True, return_counts=True)
+
+    medians = (sorted_values[starts + (counts - 1) // 2] + sorted_values[starts + counts // 2]) / 2
+    return medians[np.searchsorted(unique_groups, groups)]
+
+
+def rolling_median(values, window):
+    """Trailing rolling median, NaN until the window is full"""
+    result = np.full(len(values), np.nan)
+    if window <= 1:
+        return values.astype(np.float64)
+    if len(values) < window:
+        return result
+
+    windows = np.lib.stride_tricks.sliding_window_view(values, window)
+    result[window - 1:] = np.median(windows, axis=1)
+    return result
+
+
+def to_json_list(values, decimals=3):
+    """Round an array and convert it to a JSON friendly list with NaN as None"""
+    return [None if v != v else v for v in np.round(values, decimals).tolist()]
+
+
+def compare_drivers(table, driver_a, driver_b, window=5):
+    """Lap aligned pace comparison between two drivers"""
+    rows_a = driver_slice(table, driver_a)
+    rows_b = driver_slice(table, driver_b)
+    if rows_a is None or rows_b is None:
+        raise KeyError(driver_a if rows_a is None else driver_b)
+
+    laps, idx_a, idx_b = np.intersect1d(table['lap'][rows_a], table['lap'][rows_b],
+                                        assume_unique=True, return_indices=True)
+
+    times_a = table['time'][rows_a]
+    times_b = table['time'][rows_b]
+
+    # Each driver's laps relative to the median of the stint they were driven in
+    stint_norm_a = times_a - group_medians(times_a, table['stint'][rows_a])
+    stint_norm_b = times_b - group_medians(times_b, table['stint'][rows_b])
+
+    aligned_a = times_a[idx_a]
+    aligned_b = times_b[idx_b]
+    delta = aligned_a - aligned_b
+
+    return {
+        "a": driver_a,
+        "b": driver_b,
+        "laps": laps.tolist(),
+        "delta": to_json_list(delta),
+        "cumulativeGap": to_json_list(np.cumsum(delta)),
+        "rollingPace": {
+            driver_a: to_json_list(rolling_median(aligned_a, window)),
+            driver_b: to_json_list(rolling_median(aligned_b, window))
+        },
+        "stintDelta": to_json_list(stint_norm_a[idx_a] - stint_norm_b[idx_b]),
+        "summary": {
+            "lapsCompared": int(len(laps)),
+            "meanDelta": round(float(delta.mean()), 3) if len(delta) else None,
+            "medianDelta": round(float(np.median(delta)), 3) if len(delta) else None,
+            "lapsFasterA": int((delta < 0).sum())
+        }
+    }
+
+
+# Quantiles reported by the distribution endpoints
+DISTRIBUTION_QUANTILES = [0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95]
+DISTRIBUTION_GROUPINGS = ('driver', 'compound', 'stint')
+
+
+def group_labels(table, by):
+    """Integer group id per lap and the label of each group id"""
+    if by == 'driver':
+        return table['driver'].astype(np.int64), list(table['drivers'])
+    elif by == 'compound':
+        return table['compound'].astype(np.int64), list(COMPOUNDS)
+    elif by == 'stint':
+        max_stint = int(table['stint'].max()) + 1 if len(table['stint']) else 1
+        ids = table['driver'].astype(np.int64) * max_stint + table['stint']
+        labels = [f"{driver}-{stint}" for driver in table['drivers'] for stint in range(max_stint)]
+        return ids, labels
+    raise ValueError(f"Unknown grouping: {by}")
+
+
+def stint_lengths(table):
+    """Number of laps in each lap's stint, broadcast to every lap"""
+    if len(table['lap']) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    ids = table['driver'].astype(np.int64) * (int(table['stint'].max()) + 1) + table['stint']
+    _, inverse, counts = np.unique(ids, return_inverse=True, return_counts=True)
+    return counts[inverse]
+
+
+def group_quantiles(values, groups, quantiles):
+    """Linearly interpolated quantiles of values within each group"""
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    unique_groups, starts, counts = np.unique(groups[order], return_index=True, return_counts=True)
+
+    positions = (counts - 1)[:, None] * np.asarray(quantiles)[None, :]
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    fraction = positions - lower
+
+    result = sorted_values[starts[:, None] + lower] * (1 - fraction) + \
+        sorted_values[starts[:, None] + upper] * fraction
+    return unique_groups, counts, result
+
+
+def quantile_key(q):
+    """Response key for a quantile, e.g. p5 or p50"""
+    return f"p{round(q * 100):g}"
+
+
+def distribution_stats(table, by, min_stint_laps=0, driver_code=None):
+    """Lap time quantiles, IQR and outlier filtered mean per group"""
+    groups, labels = group_labels(table, by)
+    times = table['time']
+
+    keep = np.ones(len(times), dtype=bool)
+    if min_stint_laps > 0:
+        keep &= stint_lengths(table) >= min_stint_laps
+    if driver_code is not None:
+        rows = driver_slice(table, driver_code)
+        driver_mask = np.zeros(len(times), dtype=bool)
+        if rows is not None:
+            driver_mask[rows] = True
+        keep &= driver_mask
+
+    times = times[keep]
+    groups = groups[keep]
+    if len(times) == 0:
+        return {}
+
+    # Q1 and Q3 are always computed for the Tukey fences
+    quantiles = DISTRIBUTION_QUANTILES + [0.25, 0.75]
+    unique_groups, counts, values = group_quantiles(times, groups, quantiles)
+    q1 = values[:, -2]
+    q3 = values[:, -1]
+    iqr = q3 - q1
+
+    # Mean of the laps inside the 1.5 * IQR fences of their own group
+    group_idx = np.searchsorted(unique_groups, groups)
+    inside = (times >= (q1 - 1.5 * iqr)[group_idx]) & (times <= (q3 + 1.5 * iqr)[group_idx])
+    filtered_sums = np.bincount(group_idx[inside], weights=times[inside], minlength=len(unique_groups))
+    filtered_counts = np.bincount(group_idx[inside], minlength=len(unique_groups))
+    means = np.bincount(group_idx, weights=times, minlength=len(unique_groups)) / counts
+
+    stats = {}
+    for i, group in enumerate(unique_groups):
+        stats[labels[group]] = {
+            "count": int(counts[i]),
+            "quantiles": {
+                quantile_key(q): round(float(values[i, j]), 3)
+                for j, q in enumerate(DISTRIBUTION_QUANTILES)
+            },
+            "iqr": round(float(iqr[i]), 3),
+            "mean": round(float(means[i]), 3),
+            "filteredMean": round(float(filtered_sums[i] / filtered_counts[i]), 3)
+            if filtered_counts[i] else None
+        }
+
+    return stats
+
+
+def build_session_sketches(table, compression):
+    """Quantile sketches of lap times per driver and per compound for one session"""
+    sketches = {}
+    for by in ('driver', 'compound'):
+        groups, labels = group_labels(table, by)
+        sketches[by] = {}
+        for group in np.unique(groups):
+            sketches[by][labels[group]] = quantile_sketch.sketch_from_values(
+                table['time'][groups == group], compression)
+
+    return sketches
+
+
+# Lap time lost per lap of fuel still on board, in seconds
+DEFAULT_FUEL_EFFECT = 0.03
+# Accepted fuel effects, in steps of FUEL_EFFECT_STEP, so each session caches a bounded number of fits
+MAX_FUEL_EFFECT = 0.2
+FUEL_EFFECT_STEP = 0.001
+
+
+def quantize_fuel_effect(fuel_effect):
+    """Clamp a finite fuel effect to 0..MAX_FUEL_EFFECT and snap it to the FUEL_EFFECT_STEP grid"""
+    fuel_effect = max(0.0, min(fuel_effect, MAX_FUEL_EFFECT))
+    return round(round(fuel_effect / FUEL_EFFECT_STEP) * FUEL_EFFECT_STEP, 6)
+
+# Laps slower than this fraction of their stint median are treated as traffic or incidents
+DEGRADATION_OUTLIER_RATIO = 1.07
+
+
+def fit_degradation(table, fuel_effect=DEFAULT_FUEL_EFFECT, degree=1, min_laps=4):
+    """Fit fuel corrected lap time against tire age for every stint in one batched solve"""
+    if len(table['lap']) == 0:
+        return []
+
+    laps = table['lap'].astype(np.float64)
+    tire_age = table['tire_age'].astype(np.float64)
+
+    # Remove the fuel effect so only tire wear remains in the trend
+    corrected = table['time'] - fuel_effect * (laps.max() - laps)
+
+    max_stint = int(table['stint'].max()) + 1
+    stint_ids = table['driver'].astype(np.int64) * max_stint + table['stint']
+    unique_stints, group, counts = np.unique(stint_ids, return_inverse=True, return_counts=True)
+    n_groups = len(unique_stints)
+
+    # Skip first laps of the race and of each stint (out laps) plus slow outliers
+    order = np.argsort(group, kind='stable')
+    first_rows = order[np.searchsorted(group[order], np.arange(n_groups))]
+    first_in_stint = np.zeros(len(group), dtype=bool)
+    first_in_stint[first_rows] = True
+    medians = group_medians(corrected, group)
+    use = ~first_in_stint & (laps > 1) & (corrected <= medians * DEGRADATION_OUTLIER_RATIO)
+
+    x = tire_age[use]
+    y = corrected[use]
+    g = group[use]
+    n_terms = degree + 1
+
+    # Normal equations for every stint: sums of x^(i+j) and x^i * y per stint
+    power_sums = np.stack([np.bincount(g, weights=x ** p, minlength=n_groups)
+                           for p in range(2 * degree + 1)], axis=1)
+    xy_sums = np.stack([np.bincount(g, weights=(x ** p) * y, minlength=n_groups)
+                        for p in range(n_terms)], axis=1)
+    exponents = np.add.outer(np.arange(n_terms), np.arange(n_terms))
+    normal = power_sums[:, exponents]
+
+    fit_counts = np.bincount(g, minlength=n_groups)
+    solvable = (fit_counts >= max(min_laps, n_terms + 1)) & (np.abs(np.linalg.det(normal)) > 1e-9)
+
+    coefficients = np.full((n_groups, n_terms), np.nan)
+    if solvable.any():
+        coefficients[solvable] = np.linalg.solve(normal[solvable], xy_sums[solvable][..., None])[..., 0]
+
+    # Goodness of fit for every stint from the same grouped sums
+    predicted = (coefficients[g] * x[:, None] ** np.arange(n_terms)).sum(axis=1)
+    safe_counts = np.maximum(fit_counts, 1)
+    group_means = np.bincount(g, weights=y, minlength=n_groups) / safe_counts
+    ss_res = np.bincount(g, weights=(y - predicted) ** 2, minlength=n_groups)
+    ss_tot = np.bincount(g, weights=(y - group_means[g]) ** 2, minlength=n_groups)
+
+    stints = []
+    for i in np.flatnonzero(solvable):
+        row = first_rows[i]
+        stints.append({
+            "driver": table['drivers'][table['driver'][row]],
+            "stint": int(table['stint'][row]),
+            "compound": COMPOUNDS[table['compound'][row]],
+            "startLap": int(table['lap'][row]),
+            "laps": int(counts[i]),
+            "lapsFitted": int(fit_counts[i]),
+            "coefficients": [round(float(c), 5) for c in coefficients[i]],
+            "degradation": round(float(coefficients[i, 1]), 4),
+            "r2": round(float(1 - ss_res[i] / ss_tot[i]), 3) if ss_tot[i] > 0 else None
+        })
+
+    return stints
+
+
+def degradation_by_compound(stints):
+    """Median per-lap degradation across all fitted stints of each compound"""
+    by_compound = {}
+    for stint in stints:
+        by_compound.setdefault(stint['compound'], []).append(stint['degradation'])
+
+    return {compound: round(float(np.median(values)), 4) for compound, values in by_compound.items()}
@@ -0,0 +1,121 @@
+"""
+Binary encoding of /laps payloads as little-endian typed-array columns
+
+Layout: the magic bytes F1LP, the header length as a little-endian uint32, a
+UTF-8 JSON header padded with spaces to an 8-byte boundary, then one column
+after another, each starting on an 8-byte boundary so clients can view them
+in place as typed arrays. The header lists the drivers, the compound names
+and every column's name, dtype, byte offset (from the start of the payload)
+and length. Rows are sorted by driver and lap number, the driver column
+indexes the header's driver list and the compound column its compound list.
+"""
+import json
+import struct
+
+import numpy as np
+
+import lap_analysis
+
+MEDIA_TYPE = 'application/vnd.f1.laps'
+MAGIC = b'F1LP'
+VERSION = 1
+ALIGNMENT = 8
+
+# Column name, dtype and the typed array a client views it with
+COLUMNS = [
+    ('lapTimeMs', np.dtype('<u4'), 'Uint32Array'),
+    ('lap', np.dtype('<u2'), 'Uint16Array'),
+    ('tireAge', np.dtype('<u2'), 'Uint16Array'),
+    ('driver', np.dtype('u1'), 'Uint8Array'),
+    ('compound', np.dtype('u1'), 'Uint8Array')
+]
+
+
+def padded(length):
+    return -length % ALIGNMENT
+
+
+def encode_columns(drivers, columns):
+    """Encode {column name: array} rows, sorted by driver and lap, for the given driver codes"""
+    count = len(columns['lap'])
+    header = {
+        "version": VERSION,
+        "count": count,
+        "drivers": list(drivers),
+        "compounds": lap_analysis.COMPOUNDS,
+        "columns": []
+    }
+
+    arrays = [np.ascontiguousarray(columns[name], dtype=dtype) for name, dtype, _ in COLUMNS]
+
+    # Offsets depend on the header length, which depends on the offsets' digits, so repeat until it settles
+    header_length = 0
+    while True:
+        offset = len(MAGIC) + 4 + header_length
+        offset += padded(offset)
+        header['columns'] = []
+        for (name, _, view), array in zip(COLUMNS, arrays):
+            header['columns'].append({"name": name, "type": view, "offset": offset, "length": count})
+            offset += array.nbytes + padded(array.nbytes)
+        header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        start = len(MAGIC) + 4 + len(header_bytes)
+        header_bytes += b' ' * padded(start)
+        if len(header_bytes) == header_length:
+            break
+        header_length = len(header_bytes)
+
+    parts = [MAGIC, struct.pack('<I', len(header_bytes)), header_bytes]
+    for array in arrays:
+        data = array.tobytes()
+        parts.append(data)
+        parts.append(b'\0' * padded(len(data)))
+    return b''.join(parts)
+
+
+def encode_lap_table(table):
+    """Encode a lap table from lap_analysis.build_lap_table()"""
+    return encode_columns(table['drivers'], {
+        'lapTimeMs': np.rint(table['time'] * 1000),
+        'lap': table['lap'],
+        'tireAge': np.clip(table['tire_age'], 0, None),
+        'driver': table['driver'],
+        'compound': table['compound']
+    })
+
+
+def parse_lap_time(text):
+    """Seconds from "M:SS.sss" or "SS.sss" """
+    minutes, _, seconds = str(text).rpartition(':')
+    return int(minutes or 0) * 60 + float(seconds)
+
+
+def encode_laps_data(laps_data):
+    """Encode a JSON /laps payload's lapsData, used for the synthetic fallback data"""
+    drivers = sorted(laps_data)
+    rows = [(idx, lap) for idx, code in enumerate(drivers)
+            for lap in sorted(laps_data[code], key=lambda lap: lap['lap'])]
+
+    return encode_columns(drivers, {
+        'lapTimeMs': np.rint([parse_lap_time(lap['time']) * 1000 for _, lap in rows]),
+        'lap': [lap['lap'] for _, lap in rows],
+        'tireAge': [max(int(lap.get('tireAge') or 0), 0) for _, lap in rows],
+        'driver': [idx for idx, _ in rows],
+        'compound': [lap_analysis.COMPOUND_INDEX[lap_analysis.normalize_compound(lap.get('compound'))]
+                     for _, lap in rows]
+    })
+
+
+def decode(data):
+    """Header and {column name: array} of an encoded payload"""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a binary laps payload")
+    header_length, = struct.unpack_from('<I', data, len(MAGIC))
+    header = json.loads(data[len(MAGIC) + 4:len(MAGIC) + 4 + header_length])
+
+    dtypes = {name: dtype for name, dtype, _ in COLUMNS}
+    columns = {
+        column['name']: np.frombuffer(data, dtype=dtypes[column['name']], count=column['length'],
+                                      offset=column['offset'])
+        for column in header['columns']
+    }
+    return header, columns
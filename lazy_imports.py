@@ -0,0 +1,60 @@
+"""
+Deferred imports for the fast-startup mode
+
+With F1_FAST_STARTUP=1, heavy modules (pandas, numpy, FastF1 and the analysis
+modules built on them) are returned as lazy modules that only execute on first
+attribute access, so routes that never touch them never pay for the import.
+"""
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+
+FAST_STARTUP = os.environ.get('F1_FAST_STARTUP', '0').lower() in ('1', 'true', 'yes')
+
+# Names of modules registered lazily, loaded together by load_deferred()
+_deferred = []
+_load_lock = threading.Lock()
+
+
+def import_module(name):
+    """Import a module now, or on first attribute access in fast-startup mode"""
+    if name in sys.modules:
+        # Returned as is, importlib.import_module would touch a lazy module and load it
+        return sys.modules[name]
+    if not FAST_STARTUP:
+        return importlib.import_module(name)
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    _deferred.append(name)
+    return module
+
+
+def load_deferred():
+    """Execute every lazily registered module now
+
+    Lazy modules are not safe to load from several threads at once before
+    Python 3.12, so request threads call this, serialized, before touching them.
+    """
+    if not _deferred:
+        return
+    with _load_lock:
+        while _deferred:
+            name = _deferred[0]
+            getattr(sys.modules[name], '__name__')  # Any attribute access runs the module
+            _deferred.pop(0)
+
+
+def is_loaded(name):
+    """Whether a module has actually been executed, not just registered lazily"""
+    module = sys.modules.get(name)
+    return module is not None and not isinstance(module, importlib.util._LazyModule)
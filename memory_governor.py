@@ -0,0 +1,96 @@
+"""
+Memory accounting and slimming of cached sessions
+
+Sessions are slimmed once when they enter the cache:
+    - columns no endpoint reads are dropped from the laps and results frames
+    - repeated strings such as driver, team and compound become categoricals
+    - float64 columns become int16 when they hold small whole numbers without
+      gaps, or float32 when that keeps every value exactly
+Their deep memory, and that of the artifacts derived from them, is what the
+session cache budgets by.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Columns read by the endpoints, lap_analysis and the telemetry store, everything else is dropped
+LAP_COLUMNS = (
+    'Driver', 'DriverNumber', 'DriverFullName', 'Team', 'LapNumber', 'LapTime', 'Compound',
+    'TyreLife', 'TireLife', 'Stint', 'Time', 'LapStartTime'
+)
+RESULT_COLUMNS = (
+    'Abbreviation', 'DriverNumber', 'FirstName', 'LastName', 'TeamName', 'Position', 'Status', 'Time',
+    'Q1', 'Q2', 'Q3', 'FastestLap', 'FastestLapTime', 'FastestLapNum'
+)
+
+# Low-cardinality strings stored as categoricals
+CATEGORY_COLUMNS = ('Driver', 'DriverNumber', 'Team', 'TeamName', 'Compound', 'Abbreviation', 'Status')
+
+# Session attributes holding frames: FastF1 and the local source both keep them privately
+SESSION_FRAMES = (('_laps', LAP_COLUMNS), ('_results', RESULT_COLUMNS))
+
+INT16_MIN, INT16_MAX = np.iinfo(np.int16).min, np.iinfo(np.int16).max
+
+
+def downcast_column(column):
+    """Smallest lossless dtype for a column, or the column unchanged"""
+    # Strings are object columns before pandas 3 and str columns since
+    if column.name in CATEGORY_COLUMNS and (column.dtype == object or pd.api.types.is_string_dtype(column.dtype)):
+        return column.astype('category')
+
+    if column.dtype != np.float64:
+        return column
+
+    values = column.to_numpy()
+    finite = values[~np.isnan(values)]
+    if len(finite) == len(values) and np.array_equal(finite, np.round(finite)) and \
+            (len(finite) == 0 or (finite.min() >= INT16_MIN and finite.max() <= INT16_MAX)):
+        return column.astype(np.int16)
+
+    narrowed = values.astype(np.float32)
+    if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+        return column.astype(np.float32)
+    return column
+
+
+def slim_frame(frame, keep):
+    """Copy of a frame with only the kept columns, each in its smallest lossless dtype"""
+    # Indexing keeps FastF1's Laps and SessionResults subclasses and their session reference
+    frame = frame[[column for column in frame.columns if column in keep]]
+    return frame.assign(**{column: downcast_column(frame[column]) for column in frame.columns})
+
+
+def slim_session(session):
+    """Drop unused columns and downcast the session's laps and results in place"""
+    for attr, keep in SESSION_FRAMES:
+        frame = getattr(session, attr, None)
+        if isinstance(frame, pd.DataFrame) and len(frame.columns) > 0:
+            setattr(session, attr, slim_frame(frame, keep))
+
+
+def deep_bytes(value, seen=None):
+    """Approximate deep memory of a value: frames, arrays and the containers holding them"""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_bytes(k, seen) + deep_bytes(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(deep_bytes(item, seen) for item in value)
+    return sys.getsizeof(value)
+
+
+def session_bytes(session):
+    """Deep memory of the frames a session holds"""
+    frames = [getattr(session, attr, None) for attr, _ in SESSION_FRAMES]
+    # Car data is only present when something asked for telemetry from the cached session
+    frames.append(getattr(session, '_car_data', None))
+    return sum(deep_bytes(frame) for frame in frames if frame is not None)
@@ -0,0 +1,125 @@
+"""
+Mergeable quantile sketches for lap time distributions
+
+A sketch is a t-digest style summary: sorted centroids (mean, weight) whose size
+is bounded by the compression parameter, with more resolution near the tails.
+Sketches built per session can be merged to answer season-wide percentile
+queries without keeping every lap in memory.
+"""
+import numpy as np
+
+DEFAULT_COMPRESSION = 100
+
+
+def empty_sketch():
+    """Sketch with no values"""
+    return {
+        'means': np.zeros(0, dtype=np.float64),
+        'weights': np.zeros(0, dtype=np.float64),
+        'min': np.nan,
+        'max': np.nan
+    }
+
+
+def compress(means, weights, compression=DEFAULT_COMPRESSION):
+    """Merge centroids so that each covers a bounded slice of the arcsine quantile scale"""
+    if len(means) == 0:
+        return means, weights
+
+    order = np.argsort(means, kind='stable')
+    means = means[order]
+    weights = weights[order]
+
+    # Quantile at the middle of each centroid, mapped onto the k1 scale function
+    cumulative = np.cumsum(weights)
+    q_mid = (cumulative - weights / 2) / cumulative[-1]
+    k = compression / (2 * np.pi) * np.arcsin(2 * q_mid - 1)
+
+    # k is monotonic in q, so each unit interval of k becomes one centroid
+    _, bucket = np.unique(np.floor(k - k[0]), return_inverse=True)
+    merged_weights = np.bincount(bucket, weights=weights)
+    merged_means = np.bincount(bucket, weights=weights * means) / merged_weights
+
+    return merged_means, merged_weights
+
+
+def sketch_from_values(values, compression=DEFAULT_COMPRESSION):
+    """Build a sketch from raw values, ignoring NaN"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return empty_sketch()
+
+    means, weights = compress(values, np.ones(len(values)), compression)
+    return {
+        'means': means,
+        'weights': weights,
+        'min': float(values.min()),
+        'max': float(values.max())
+    }
+
+
+def merge_sketches(sketches, compression=DEFAULT_COMPRESSION):
+    """Combine several sketches into one"""
+    sketches = [s for s in sketches if len(s['weights']) > 0]
+    if not sketches:
+        return empty_sketch()
+
+    means, weights = compress(
+        np.concatenate([s['means'] for s in sketches]),
+        np.concatenate([s['weights'] for s in sketches]),
+        compression
+    )
+    return {
+        'means': means,
+        'weights': weights,
+        'min': min(s['min'] for s in sketches),
+        'max': max(s['max'] for s in sketches)
+    }
+
+
+def sketch_count(sketch):
+    """Number of values summarized by a sketch"""
+    return int(round(sketch['weights'].sum()))
+
+
+def sketch_quantiles(sketch, quantiles):
+    """Estimate quantiles by interpolating between centroid midpoints"""
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+    if len(sketch['weights']) == 0:
+        return np.full(len(quantiles), np.nan)
+
+    weights = sketch['weights']
+    total = weights.sum()
+    positions = np.concatenate(([0.0], np.cumsum(weights) - weights / 2, [total]))
+    values = np.concatenate(([sketch['min']], sketch['means'], [sketch['max']]))
+
+    return np.interp(quantiles * total, positions, values)
+
+
+def sketch_filtered_mean(sketch, low, high):
+    """Weighted mean of the centroids falling between low and high"""
+    inside = (sketch['means'] >= low) & (sketch['means'] <= high)
+    if not inside.any():
+        return np.nan
+    return float(np.average(sketch['means'][inside], weights=sketch['weights'][inside]))
+
+
+def sketch_to_json(sketch):
+    """Serializable form of a sketch"""
+    return {
+        'means': sketch['means'].tolist(),
+        'weights': sketch['weights'].tolist(),
+        'min': None if np.isnan(sketch['min']) else sketch['min'],
+        'max': None if np.isnan(sketch['max']) else sketch['max']
+    }
+
+
+def sketch_from_json(data):
+    """Rebuild a sketch from its serialized form"""
+    return {
+        'means': np.asarray(data['means'], dtype=np.float64),
+        'weights': np.asarray(data['weights'], dtype=np.float64),
+        'min': np.nan if data['min'] is None else data['min'],
+        'max': np.nan if data['max'] is None else data['max']
+    }
@@ -0,0 +1,226 @@
+"""
+Per-request phase timing, cache counters and gauges, exported as Prometheus text
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds, from static files to cold FastF1 loads
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Phases timed inside a request; 'processing' is the handler time not spent in the others
+PHASES = ('import', 'schedule', 'load', 'processing', 'serialize', 'response')
+
+_lock = threading.Lock()
+_local = threading.local()
+
+# (route, phase) -> [bucket counts..., +Inf count], sum
+_histograms = defaultdict(lambda: [[0] * (len(BUCKETS) + 1), 0.0])
+_requests = defaultdict(int)  # (route, status) -> count
+_cache_events = defaultdict(int)  # (cache, result) -> count
+_gauges = defaultdict(float)  # name -> value
+_labeled_gauges = {}  # name -> {((label, value), ...): value}
+
+
+class RequestTimer:
+    """Phase durations of one request, carried with the request rather than its thread
+
+    Streamed responses keep producing their body after the handler returned,
+    possibly on another thread, so they time their phases on this object and
+    close it themselves.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = defaultdict(float)
+        self.handler_end = None
+        self.closed = False
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent in the block to a phase of this request"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+
+def begin_request():
+    """Start timing phases for a request handled by this thread, returns its timer"""
+    gauge_add('requests_in_flight', 1)
+    _local.timer = RequestTimer()
+    return _local.timer
+
+
+def current_timer():
+    """Timer of the request this thread is handling, or None"""
+    return getattr(_local, 'timer', None)
+
+
+def current_phases():
+    """Phase durations in seconds recorded so far for this thread's request, or None"""
+    timer = current_timer()
+    return timer.phases if timer is not None else None
+
+
+@contextmanager
+def phase(name):
+    """Add the time spent in the block to a phase of the request this thread is handling"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = current_phases()
+        if phases is not None:
+            phases[name] += time.perf_counter() - start
+
+
+def finish_handler(timer):
+    """Close the handler part of a request, returns the phase durations for Server-Timing
+
+    The thread lets go of the timer, anything it runs later is not timed as this request.
+    """
+    if current_timer() is timer:
+        _local.timer = None
+    if timer is None:
+        return {}
+    phases = timer.phases
+    handler_time = time.perf_counter() - timer.start
+    measured = sum(phases.get(name, 0.0) for name in ('import', 'schedule', 'load', 'serialize'))
+    phases['processing'] = max(handler_time - measured, 0.0)
+    phases['total'] = handler_time
+    timer.handler_end = time.perf_counter()
+    return {name: phases[name] for name in PHASES + ('total',) if name in phases}
+
+
+def end_request(timer, route, status):
+    """Record a finished request once its body has been sent, only the first call counts"""
+    if timer is None or timer.closed:
+        return
+    timer.closed = True
+    phases = timer.phases
+    if timer.handler_end is not None:
+        phases['response'] = time.perf_counter() - timer.handler_end
+        phases['total'] += phases['response']
+
+    with _lock:
+        _requests[(route, status)] += 1
+        for name, seconds in phases.items():
+            observe(route, name, seconds)
+    gauge_add('requests_in_flight', -1)
+
+
+def observe(route, name, seconds):
+    """Add one observation to a histogram, the caller holds the lock"""
+    histogram = _histograms[(route, name)]
+    for i, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            histogram[0][i] += 1
+            break
+    else:
+        histogram[0][-1] += 1
+    histogram[1] += seconds
+
+
+def cache_hit(cache):
+    """Count a hit in a named cache"""
+    with _lock:
+        _cache_events[(cache, 'hit')] += 1
+
+
+def cache_miss(cache):
+    """Count a miss in a named cache"""
+    with _lock:
+        _cache_events[(cache, 'miss')] += 1
+
+
+def gauge_add(name, amount):
+    """Move a gauge such as in-flight loads up or down"""
+    with _lock:
+        _gauges[name] += amount
+
+
+def gauge_set(name, value):
+    """Set a gauge to an absolute value"""
+    with _lock:
+        _gauges[name] = value
+
+
+def labeled_gauge_set(name, values):
+    """Replace every series of a labeled gauge, values maps label pairs to a value"""
+    with _lock:
+        _labeled_gauges[name] = dict(values)
+
+
+@contextmanager
+def in_flight(name):
+    """Count the block as in flight on a gauge while it runs"""
+    gauge_add(name, 1)
+    try:
+        yield
+    finally:
+        gauge_add(name, -1)
+
+
+def server_timing(phases):
+    """Server-Timing header value for the given phase durations"""
+    return ', '.join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in phases.items())
+
+
+def reset():
+    """Forget the recorded histograms and counters
+
+    Gauges describe the current state, such as requests still in flight that
+    will count themselves down later, so they are kept.
+    """
+    with _lock:
+        _histograms.clear()
+        _requests.clear()
+        _cache_events.clear()
+
+
+def escape(value):
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    with _lock:
+        lines.append('# HELP f1_request_phase_seconds Time spent in each phase of a request')
+        lines.append('# TYPE f1_request_phase_seconds histogram')
+        for (route, name), (counts, total) in sorted(_histograms.items()):
+            labels = f'route="{escape(route)}",phase="{name}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS, counts):
+                cumulative += count
+                lines.append(f'f1_request_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'f1_request_phase_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f'f1_request_phase_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'f1_request_phase_seconds_count{{{labels}}} {cumulative}')
+
+        lines.append('# HELP f1_requests_total Finished requests by route and status')
+        lines.append('# TYPE f1_requests_total counter')
+        for (route, status), count in sorted(_requests.items()):
+            lines.append(f'f1_requests_total{{route="{escape(route)}",status="{status}"}} {count}')
+
+        lines.append('# HELP f1_cache_requests_total Cache lookups by cache and result')
+        lines.append('# TYPE f1_cache_requests_total counter')
+        for (cache, result), count in sorted(_cache_events.items()):
+            lines.append(f'f1_cache_requests_total{{cache="{escape(cache)}",result="{result}"}} {count}')
+
+        for name, value in sorted(_gauges.items()):
+            lines.append(f'# TYPE f1_{name} gauge')
+            lines.append(f'f1_{name} {value:.15g}')
+
+        for name, series in sorted(_labeled_gauges.items()):
+            lines.append(f'# TYPE f1_{name} gauge')
+            for labels, value in sorted(series.items()):
+                label_text = ','.join(f'{label}="{escape(label_value)}"' for label, label_value in labels)
+                lines.append(f'f1_{name}{{{label_text}}} {value:.15g}')
+
+    return '\n'.join(lines) + '\n'
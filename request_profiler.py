@@ -0,0 +1,255 @@
+"""
+Opt-in profiling of slow or sampled requests, written to a rotating local directory
+
+Modes:
+    sample   - a background thread samples the stacks of profiled request threads,
+               cheap enough to run on every request and keep only the slow ones
+    cprofile - deterministic cProfile trace of the request thread, more detail
+               but noticeably slower, best combined with a sample rate. Only one
+               profiler can be active per process, so requests arriving while
+               another is traced are sampled instead
+
+Profiles are kept when a request took longer than the threshold, or always for
+the sampled fraction of traffic. Each profile has a JSON sidecar with the
+route, parameters and timing.
+
+Profiles and their sidecars expose code paths and request parameters, so they
+are only served while profiling is enabled: to clients presenting the
+F1_PROFILE_TOKEN as a bearer token, or, without a token, to loopback clients.
+"""
+import cProfile
+import hmac
+import ipaddress
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+MODES = ('off', 'sample', 'cprofile')
+
+_config = {
+    'mode': 'off',
+    'threshold_ms': 1000.0,
+    'sample_rate': 0.0,
+    'interval_ms': 5.0,
+    'directory': 'profiles',
+    'keep': 50,
+    'token': None
+}
+
+# Stack sample counts per profiled thread id, filled by the sampler thread
+_samples = {}
+_samples_lock = threading.Lock()
+_sampler = None
+_write_lock = threading.Lock()
+
+# Held by the one request being traced with cProfile
+_cprofile_lock = threading.Lock()
+
+
+def configure(mode=None, threshold_ms=None, sample_rate=None, interval_ms=None, directory=None, keep=None,
+              token=None):
+    """Change the profiling settings, unset arguments keep their value"""
+    updates = {
+        'mode': mode, 'threshold_ms': threshold_ms, 'sample_rate': sample_rate,
+        'interval_ms': interval_ms, 'directory': directory, 'keep': keep, 'token': token
+    }
+    for name, value in updates.items():
+        if value is not None:
+            _config[name] = value
+    if _config['mode'] not in MODES:
+        raise ValueError(f"Unknown profile mode '{_config['mode']}', expected one of {', '.join(MODES)}")
+
+
+def configure_from_env():
+    """Settings from the F1_PROFILE* environment variables"""
+    configure(
+        mode=os.environ.get('F1_PROFILE', 'off').lower(),
+        threshold_ms=float(os.environ.get('F1_PROFILE_THRESHOLD_MS', _config['threshold_ms'])),
+        sample_rate=float(os.environ.get('F1_PROFILE_SAMPLE_RATE', _config['sample_rate'])),
+        interval_ms=float(os.environ.get('F1_PROFILE_INTERVAL_MS', _config['interval_ms'])),
+        directory=os.environ.get('F1_PROFILE_DIR', _config['directory']),
+        keep=int(os.environ.get('F1_PROFILE_KEEP', _config['keep'])),
+        token=os.environ.get('F1_PROFILE_TOKEN') or None
+    )
+
+
+def enabled():
+    return _config['mode'] != 'off'
+
+
+def authorized(remote_addr, authorization):
+    """Whether a client may read profiles, from its address and Authorization header"""
+    if not enabled():
+        return False
+
+    token = _config['token']
+    if token is not None:
+        scheme, _, credentials = (authorization or '').partition(' ')
+        return scheme.lower() == 'bearer' and hmac.compare_digest(credentials.strip().encode(), token.encode())
+
+    try:
+        return ipaddress.ip_address(remote_addr or '').is_loopback
+    except ValueError:
+        return False
+
+
+def folded_stack(frame):
+    """Stack of a frame in the root-first 'file:function;...' form used by flame graph tools"""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(parts))
+
+
+def sampler_loop():
+    """Record the current stack of every profiled thread once per interval"""
+    while True:
+        time.sleep(_config['interval_ms'] / 1000)
+        with _samples_lock:
+            if not _samples:
+                continue
+            frames = sys._current_frames()
+            for thread_id, counts in _samples.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    counts[folded_stack(frame)] += 1
+
+
+def ensure_sampler():
+    """Start the shared sampler thread on first use"""
+    global _sampler
+    with _samples_lock:
+        if _sampler is None:
+            _sampler = threading.Thread(target=sampler_loop, name='request-profiler', daemon=True)
+            _sampler.start()
+
+
+def start():
+    """Begin profiling the current request, returns a handle for stop() or None when not profiled"""
+    mode = _config['mode']
+    if mode == 'off':
+        return None
+
+    sampled = random.random() < _config['sample_rate']
+    if not sampled and _config['threshold_ms'] <= 0:
+        return None
+
+    handle = {'mode': mode, 'sampled': sampled, 'start': time.perf_counter(), 'started': time.time()}
+    if mode == 'cprofile' and _cprofile_lock.acquire(blocking=False):
+        try:
+            handle['profile'] = cProfile.Profile()
+            handle['profile'].enable()
+            return handle
+        except ValueError:
+            # Another profiler, e.g. a debugger or coverage, already owns the interpreter's hook
+            _cprofile_lock.release()
+
+    handle['mode'] = 'sample'
+    ensure_sampler()
+    handle['thread_id'] = threading.get_ident()
+    with _samples_lock:
+        _samples[handle['thread_id']] = Counter()
+    return handle
+
+
+def stop(handle, route, params, status):
+    """Finish profiling a request and keep the profile if it was slow or sampled, returns its name"""
+    if handle is None:
+        return None
+
+    duration_ms = (time.perf_counter() - handle['start']) * 1000
+    if handle['mode'] == 'cprofile':
+        handle['profile'].disable()
+        _cprofile_lock.release()
+    else:
+        with _samples_lock:
+            counts = _samples.pop(handle['thread_id'], Counter())
+
+    slow = _config['threshold_ms'] > 0 and duration_ms >= _config['threshold_ms']
+    if not slow and not handle['sampled']:
+        return None
+
+    directory = _config['directory']
+    os.makedirs(directory, exist_ok=True)
+
+    route_slug = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'root'
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(handle['started']))
+    # The suffix keeps names unique across threads and worker processes sharing the directory
+    name = (f"{stamp}-{int(handle['started'] * 1000) % 1000:03d}-{route_slug}-{duration_ms:.0f}ms-"
+            f"{uuid.uuid4().hex[:8]}")
+
+    if handle['mode'] == 'cprofile':
+        profile_file = f"{name}.prof"
+        handle['profile'].dump_stats(os.path.join(directory, profile_file))
+    else:
+        profile_file = f"{name}.folded"
+        with open(os.path.join(directory, profile_file), 'w') as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+    meta = {
+        "name": name,
+        "file": profile_file,
+        "mode": handle['mode'],
+        "route": route,
+        "params": params,
+        "status": status,
+        "durationMs": round(duration_ms, 1),
+        "reason": 'slow' if slow else 'sampled',
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(handle['started']))
+    }
+    if handle['mode'] == 'sample':
+        meta["samples"] = sum(counts.values())
+        meta["intervalMs"] = _config['interval_ms']
+
+    with _write_lock:
+        with open(os.path.join(directory, f"{name}.json"), 'w') as f:
+            json.dump(meta, f, indent=2)
+        rotate(directory, _config['keep'])
+
+    return name
+
+
+def rotate(directory, keep):
+    """Delete the oldest profiles beyond the newest `keep`"""
+    names = sorted(filename[:-5] for filename in os.listdir(directory) if filename.endswith('.json'))
+    for name in names[:max(len(names) - keep, 0)]:
+        for ext in ('.json', '.prof', '.folded'):
+            path = os.path.join(directory, name + ext)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def list_profiles():
+    """Metadata of the kept profiles, newest first"""
+    directory = _config['directory']
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    for filename in sorted(os.listdir(directory), reverse=True):
+        if filename.endswith('.json'):
+            try:
+                with open(os.path.join(directory, filename)) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Rotated away or still being written
+    return profiles
+
+
+def profile_file(filename):
+    """(directory, filename) for a kept profile file, or None for anything else"""
+    directory = _config['directory']
+    if os.path.basename(filename) != filename or not filename.endswith(('.prof', '.folded', '.json')):
+        return None
+    if not os.path.exists(os.path.join(directory, filename)):
+        return None
+    return directory, filename
@@ -1,47 +1,539 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, g, request, send_from_directory, stream_with_context
+from flask import jsonify as flask_jsonify
 from flask_cors import CORS
-import fastf1
-import pandas as pd
 import os
-import logging
+import json
+import math
+import mimetypes
 import time
-import traceback
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
+import data_sources
+import lazy_imports
+import request_metrics
+import request_profiler
+import session_refresher
+import structured_logging
+
+# pandas, NumPy and the analysis modules load on first use when F1_FAST_STARTUP=1
+pd = lazy_imports.import_module('pandas')
+lap_analysis = lazy_imports.import_module('lap_analysis')
+lap_binary = lazy_imports.import_module('lap_binary')
+memory_governor = lazy_imports.import_module('memory_governor')
+quantile_sketch = lazy_imports.import_module('quantile_sketch')
+session_models = lazy_imports.import_module('session_models')
+strategy_sim = lazy_imports.import_module('strategy_sim')
+synthetic_data = lazy_imports.import_module('synthetic_data')
+telemetry = lazy_imports.import_module('telemetry')
+telemetry_store = lazy_imports.import_module('telemetry_store')
+
+# Configure logging, levels and format come from the F1_LOG_* environment variables
+structured_logging.configure_logging()
+logger = structured_logging.get_logger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__, static_folder='static')
 CORS(app)  # Enable CORS for all routes
 
+
+# Opt-in profiling of slow or sampled requests, configured by F1_PROFILE* variables
+request_profiler.configure_from_env()
+
+
+# Endpoints answered without pandas, NumPy or FastF1, they never trigger the deferred imports
+LIGHT_ENDPOINTS = {
+    'static', 'serve_static', 'get_seasons', 'test_api', 'get_metrics', 'list_request_profiles',
+    'get_request_profile'
+}
+
+
+@app.before_request
+def start_request_timing():
+    # Kept in g, so streamed responses can still time and close their request after the handler
+    g.metrics = request_metrics.begin_request()
+    g.profile = request_profiler.start()
+    
+    # Redirects, 404s and 405s from routing have no endpoint and need nothing either
+    if request.endpoint is not None and request.endpoint not in LIGHT_ENDPOINTS:
+        with request_metrics.phase('import'):
+            lazy_imports.load_deferred()
+
+
+@app.after_request
+def add_server_timing(response):
+    timer = g.get('metrics')
+    phases = request_metrics.finish_handler(timer)
+    if phases:
+        # Streamed bodies are produced later, their header only covers the handler
+        response.headers['Server-Timing'] = request_metrics.server_timing(phases)
+    
+    # The response phase ends once the body has been sent
+    route = request_route()
+    status = response.status_code
+    
+    params = dict(request.view_args or {}, **request.args.to_dict())
+    request_profiler.stop(g.pop('profile', None), route, params, status)
+    
+    # A streamed response closes its timer itself when done, this is then a no-op
+    response.call_on_close(lambda: request_metrics.end_request(timer, route, status))
+    return response
+
+
+def request_route():
+    """Route pattern of the current request, the label its metrics are recorded under"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def jsonify(*args, **kwargs):
+    """flask.jsonify, timed as the serialization phase of the request"""
+    with request_metrics.phase('serialize'):
+        return flask_jsonify(*args, **kwargs)
+
+
+def json_response(payload):
+    """Like jsonify, for payloads holding compact records, which encode themselves"""
+    with request_metrics.phase('serialize'):
+        return Response(session_models.encode_json(payload) + '\n', mimetype='application/json')
+
 # Create directories if they don't exist
 def ensure_dir_exists(directory):
     if not os.path.exists(directory):
         os.makedirs(directory)
-        logger.info(f"Created directory: {directory}")
+        logger.info("Created directory", path=directory)
+
+# Schedules and sessions come from FastF1 or, for offline benchmarks, local files
+data_source = data_sources.create_data_source()
 
-# Set up cache directory
-CACHE_DIR = 'fastf1_cache'
-ensure_dir_exists(CACHE_DIR)
+# Derived caches are kept per data source so local and live data never mix
+# Memory-mapped telemetry stores, shared between worker processes via the page cache
+TELEMETRY_CACHE_DIR = os.path.join('telemetry_cache', data_source.name)
+ensure_dir_exists(TELEMETRY_CACHE_DIR)
 
-# Configure FastF1 cache
-try:
-    fastf1.Cache.enable_cache(CACHE_DIR)
-    logger.info(f"FastF1 cache enabled at '{CACHE_DIR}' directory")
-except Exception as e:
-    logger.error(f"Error enabling FastF1 cache: {str(e)}")
+# Per-session lap time sketches used for season-wide percentiles
+SKETCH_CACHE_DIR = os.path.join('sketch_cache', data_source.name)
+ensure_dir_exists(SKETCH_CACHE_DIR)
 
 # Available seasons
 AVAILABLE_SEASONS = list(range(2018, 2026))  # 2018-2025
 
+# Map API session types to FastF1 session names
+SESSION_TYPE_MAP = {
+    'race': 'Race',
+    'qualifying': 'Qualifying',
+    'sprint': 'Sprint',
+    'sprint_qualifying': 'Sprint Qualifying',
+    'sprint_shootout': 'Sprint Shootout',
+    'practice1': 'Practice 1',
+    'practice2': 'Practice 2',
+    'practice3': 'Practice 3'
+}
+
+# Loaded sessions kept in memory within a byte budget, least recently used evicted first
+SESSION_CACHE_BUDGET = int(float(os.environ.get('F1_SESSION_CACHE_MB', '512')) * 1024 * 1024)
+_session_cache = OrderedDict()
+_session_cache_lock = threading.Lock()
+
+
+def get_event_schedule(season):
+    """Event schedule from the data source, timed as the schedule phase of the request"""
+    with request_metrics.phase('schedule'):
+        return data_source.get_event_schedule(season)
+
+
+def load_session(session, **kwargs):
+    """Load a session, timed as the load phase and counted as an in-flight load"""
+    with request_metrics.phase('load'), request_metrics.in_flight('session_loads_in_flight'):
+        session.load(**kwargs)
+
+
+# Sessions an event did not hold and race_ids no schedule knows, so repeated misses skip FastF1
+MISSING_TTL = 600.0  # seconds, for misses that may still turn into data
+# How FastF1 and the local source word the ValueError for a session an event did not hold
+SESSION_NOT_HELD = 'does not exist for this event'
+_missing_cache = {}  # key -> expiry time, None for permanent entries
+_missing_cache_lock = threading.Lock()
+
+
+def remember_missing(key, season, permanent=True):
+    """Record a lookup that found nothing, for good in past seasons unless it may have been transient"""
+    historical = session_refresher.session_tier(season, None) == 'historical'
+    with _missing_cache_lock:
+        _missing_cache[key] = None if permanent and historical else time.time() + MISSING_TTL
+
+
+def is_known_missing(key):
+    """Whether a lookup recently found nothing for key"""
+    with _missing_cache_lock:
+        expires = _missing_cache.get(key, False)
+        if expires is not False and expires is not None and expires <= time.time():
+            del _missing_cache[key]
+            expires = False
+    
+    if expires is False:
+        request_metrics.cache_miss('missing')
+        return False
+    request_metrics.cache_hit('missing')
+    return True
+
+
+def get_held_session(season, event_name, session_type):
+    """data_source.get_session, failing at once for sessions already known not to have been held"""
+    key = ('session', season, event_name, session_type)
+    if is_known_missing(key):
+        raise ValueError(f"Session type '{session_type}' does not exist for this event")
+    
+    try:
+        return data_source.get_session(season, event_name, session_type)
+    except ValueError as e:
+        # Other ValueErrors, such as a schedule that failed to load, may be transient
+        remember_missing(key, season, permanent=SESSION_NOT_HELD in str(e))
+        raise
+
+
+def schedule_event_index(season):
+    """Exact schedule event names of a season keyed by their lowercase form"""
+    schedule = get_event_schedule(season)
+    return {row['EventName'].lower(): row['EventName'] for idx, row in schedule.iterrows()}
+
+
+def find_event_name(season, race_id):
+    """Find the exact schedule event name for a race_id, or None if not found"""
+    key = ('event', season, race_id.lower())
+    if is_known_missing(key):
+        return None
+    
+    exact_event_name = schedule_event_index(season).get(race_id.replace('_', ' ').lower())
+    if exact_event_name is None:
+        remember_missing(key, season)
+    return exact_event_name
+
+
+def new_session_entry(season, event_name, session_type):
+    """Load a session into a fresh cache entry, its artifacts are built on demand"""
+    # Telemetry is served from the memory-mapped store, weather and messages are never read
+    session = get_held_session(season, event_name, session_type)
+    load_session(session, telemetry=False, weather=False, messages=False)
+    memory_governor.slim_session(session)
+    return make_session_entry(session, season, event_name)
+
+
+def make_session_entry(session, season, event_name):
+    """Cache entry for an already loaded session"""
+    return {
+        'session': session,
+        'artifacts': {},
+        'bytes': memory_governor.session_bytes(session),
+        'loaded_at': time.time(),
+        'tier': _refresher.tier(season, event_name)
+    }
+
+
+def evict_over_budget():
+    """Evict least recently used sessions until the cache fits its budget, the lock must be held"""
+    total = sum(entry['bytes'] for entry in _session_cache.values())
+    # The most recent session stays even when it alone is over budget
+    while total > SESSION_CACHE_BUDGET and len(_session_cache) > 1:
+        key, entry = _session_cache.popitem(last=False)
+        total -= entry['bytes']
+        logger.debug("Session evicted", season=key[0], event=key[1], session=key[2], bytes=entry['bytes'])
+
+
+def store_session_entry(key, entry, replace=False):
+    """Put an entry in the session cache, keeping an existing one unless replacing it"""
+    with _session_cache_lock:
+        if replace:
+            _session_cache[key] = entry
+        else:
+            # Another request may have loaded the same session meanwhile, keep the first one
+            entry = _session_cache.setdefault(key, entry)
+        _session_cache.move_to_end(key)
+        evict_over_budget()
+    return entry
+
+
+def get_cached_entry(season, event_name, session_type):
+    """Cache entry of a loaded session, the last good snapshot when it is due for a refresh"""
+    key = (season, event_name, session_type)
+    if REFRESH_SESSIONS:
+        _refresher.start()
+    
+    with _session_cache_lock:
+        entry = _session_cache.get(key)
+        if entry is not None:
+            _session_cache.move_to_end(key)
+    
+    if entry is not None:
+        logger.debug("Session cache hit", season=season, event=event_name, session=session_type)
+        request_metrics.cache_hit('session')
+        # Stale snapshots are still served, the refresher reloads them off the request thread
+        if REFRESH_SESSIONS and session_refresher.is_stale(entry['tier'], entry['loaded_at']):
+            _refresher.request_refresh(key)
+        return entry
+    
+    request_metrics.cache_miss('session')
+    start_time = time.time()
+    logger.debug("Loading session", season=season, event=event_name, session=session_type)
+    
+    entry = new_session_entry(season, event_name, session_type)
+    
+    logger.info("Session loaded", season=season, event=event_name, session=session_type,
+                seconds=round(time.time() - start_time, 2))
+    
+    return store_session_entry(key, entry)
+
+
+def get_cached_session(season, event_name, session_type):
+    """Load a FastF1 session, reusing an already loaded one when possible"""
+    return get_cached_entry(season, event_name, session_type)['session']
+
+
+def get_session_artifact(season, event_name, session_type, name, build, keep=None):
+    """Return a value derived from a cached session, building it at most once per snapshot
+
+    Values keep(value) rejects are returned without being cached, so the next request builds them again.
+    """
+    # Artifacts belong to the entry, so a refreshed session never gets values built from the old one
+    entry = get_cached_entry(season, event_name, session_type)
+    artifacts = entry['artifacts']
+    
+    with _session_cache_lock:
+        if name in artifacts:
+            request_metrics.cache_hit('artifact')
+            return artifacts[name]
+    
+    request_metrics.cache_miss('artifact')
+    value = build(entry['session'])
+    if keep is not None and not keep(value):
+        return value
+    size = memory_governor.deep_bytes(value)
+    
+    with _session_cache_lock:
+        if name not in artifacts:
+            # Artifacts count towards their session's footprint
+            artifacts[name] = value
+            entry['bytes'] += size
+            evict_over_budget()
+        return artifacts[name]
+
+
+def refresher_season_events(season):
+    """(event name, event date, session types) of a season for the session refresher"""
+    events = []
+    for idx, row in get_event_schedule(season).iterrows():
+        if int(row['RoundNumber']) == 0:
+            continue  # Pre-season testing
+        
+        # FastF1 schedules name the weekend's sessions, other sources get every session type tried
+        named = [row.get(f'Session{n}') for n in range(1, 6)]
+        session_types = [name for name in named if name in SESSION_TYPE_MAP.values()]
+        events.append((row['EventName'], pd.Timestamp(row['EventDate']).date(),
+                       session_types or list(SESSION_TYPE_MAP.values())))
+    return events
+
+
+def refresher_loaded_at(key):
+    with _session_cache_lock:
+        entry = _session_cache.get(key)
+        return entry['loaded_at'] if entry is not None else None
+
+
+def refresh_session(key):
+    """Reload a session and swap it in, requests keep the old snapshot until then"""
+    store_session_entry(key, new_session_entry(*key), replace=True)
+    
+    # Telemetry and sketches of the old snapshot are rebuilt from the new one when next requested
+    drop_telemetry(key)
+    telemetry_store.remove_store(telemetry_store.store_path(TELEMETRY_CACHE_DIR, *key))
+    try:
+        os.remove(sketch_path(*key))
+    except FileNotFoundError:
+        pass
+
+
+def artifact_is_current(key, loaded_at):
+    """Whether an artifact built from session data loaded at loaded_at may still be served
+
+    Artifacts older than the cached snapshot were built before its last
+    reload. Without a cached snapshot they age like one of their tier.
+    """
+    snapshot_loaded_at = refresher_loaded_at(key)
+    if snapshot_loaded_at is not None:
+        return loaded_at >= snapshot_loaded_at
+    if not REFRESH_SESSIONS:
+        return True
+    return not session_refresher.is_stale(_refresher.tier(key[0], key[1]), loaded_at)
+
+
+# Live weekend sessions are reloaded in the background, F1_SESSION_REFRESH=0 turns that off
+REFRESH_SESSIONS = os.environ.get('F1_SESSION_REFRESH', '1') != '0'
+_refresher = session_refresher.SessionRefresher(refresher_season_events, refresher_loaded_at, refresh_session,
+                                                AVAILABLE_SEASONS)
+
+
+# Open telemetry stores and recently downsampled lap traces
+_telemetry_stores = {}
+_telemetry_store_lock = threading.Lock()
+TELEMETRY_TRACE_CACHE_SIZE = 256
+_telemetry_trace_cache = OrderedDict()
+
+# Recent strategy simulations, keyed by their inputs and query parameters
+SIMULATION_CACHE_SIZE = 64
+_simulation_cache = OrderedDict()
+_simulation_cache_lock = threading.Lock()
+
+
+def drop_telemetry(key):
+    """Forget the open telemetry store of a session and the lap traces downsampled from it"""
+    with _telemetry_store_lock:
+        _telemetry_stores.pop(key, None)
+        for trace_key in [trace_key for trace_key in _telemetry_trace_cache if trace_key[:3] == key]:
+            del _telemetry_trace_cache[trace_key]
+
+
+def get_telemetry_store(season, event_name, session_type, build=True):
+    """Open the memory-mapped telemetry store for a session, building it on first use
+
+    Stores built before the session's last reload are built again. With
+    build=False a store that is missing or outdated is not built, None is
+    returned instead.
+    """
+    key = (season, event_name, session_type)
+    
+    with _telemetry_store_lock:
+        store = _telemetry_stores.get(key)
+    if store is not None:
+        if artifact_is_current(key, store['loaded_at']):
+            request_metrics.cache_hit('telemetry_store')
+            return store
+        drop_telemetry(key)
+    
+    request_metrics.cache_miss('telemetry_store')
+    path = telemetry_store.store_path(TELEMETRY_CACHE_DIR, season, event_name, session_type)
+    if not telemetry_store.store_exists(path) or not artifact_is_current(key, telemetry_store.store_loaded_at(path)):
+        if not build:
+            return None
+        start_time = time.time()
+        logger.info("Building telemetry store", season=season, event=event_name, session=session_type)
+        
+        # Full telemetry is only held in memory while the store is written
+        session = get_held_session(season, event_name, session_type)
+        load_session(session, laps=True, telemetry=True, weather=False, messages=False)
+        telemetry_store.build_store(session, path, start_time)
+        del session
+        
+        logger.info("Telemetry store built", season=season, event=event_name, session=session_type,
+                    seconds=round(time.time() - start_time, 2))
+    
+    store = telemetry_store.open_store(path)
+    with _telemetry_store_lock:
+        return _telemetry_stores.setdefault(key, store)
+
+
+def clear_caches():
+    """Drop every in-memory cache, used by benchmarks to measure cold requests"""
+    with _session_cache_lock:
+        _session_cache.clear()
+    with _missing_cache_lock:
+        _missing_cache.clear()
+    with _telemetry_store_lock:
+        _telemetry_stores.clear()
+        _telemetry_trace_cache.clear()
+    with _simulation_cache_lock:
+        _simulation_cache.clear()
+
+
+def get_session_lap_table(season, event_name, session_type):
+    """Get the columnar lap table for a session, cached alongside the session"""
+    return get_session_artifact(season, event_name, session_type, 'lap_table',
+                                lambda session: lap_analysis.build_lap_table(session.laps))
+
+
+def sketch_path(season, event_name, session_type):
+    """File holding the persisted lap time sketches of a session"""
+    safe_name = f"{event_name}_{session_type}".lower().replace(' ', '_')
+    return os.path.join(SKETCH_CACHE_DIR, str(season), f"{safe_name}.json")
+
+
+def get_session_sketches(season, event_name, session_type):
+    """Lap time quantile sketches for a session, persisted so season queries skip the session load"""
+    key = (season, event_name, session_type)
+    path = sketch_path(season, event_name, session_type)
+    
+    if os.path.exists(path):
+        with open(path) as f:
+            data = json.load(f)
+        if 'sketches' not in data:
+            # Files written before snapshots were recorded hold the sketches alone
+            data = {'loaded_at': 0.0, 'sketches': data}
+        if artifact_is_current(key, data['loaded_at']):
+            request_metrics.cache_hit('sketch')
+            return {
+                by: {label: quantile_sketch.sketch_from_json(sketch) for label, sketch in groups.items()}
+                for by, groups in data['sketches'].items()
+            }
+    
+    request_metrics.cache_miss('sketch')
+    loaded_at = get_cached_entry(season, event_name, session_type)['loaded_at']
+    table = get_session_lap_table(season, event_name, session_type)
+    sketches = lap_analysis.build_session_sketches(table, quantile_sketch.DEFAULT_COMPRESSION)
+    
+    ensure_dir_exists(os.path.dirname(path))
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'loaded_at': loaded_at,
+            'sketches': {
+                by: {label: quantile_sketch.sketch_to_json(sketch) for label, sketch in groups.items()}
+                for by, groups in sketches.items()
+            }
+        }, f)
+    os.replace(tmp_path, path)
+    
+    return sketches
+
+# Bundled, content-hashed assets written by build_static.py
+STATIC_DIST_DIR = os.path.join(app.root_path, 'static', 'dist')
+
+# Precompressed variants in order of preference
+PRECOMPRESSED_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def send_built_asset(name):
+    """Send a hashed asset, precompressed when the client accepts it, cached forever"""
+    response = None
+    for encoding, ext in PRECOMPRESSED_ENCODINGS:
+        if request.accept_encodings[encoding] and os.path.exists(os.path.join(STATIC_DIST_DIR, name + ext)):
+            response = send_from_directory(STATIC_DIST_DIR, name + ext, mimetype=mimetypes.guess_type(name)[0])
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_from_directory(STATIC_DIST_DIR, name)
+    
+    # File names change with their content, so they never need revalidating
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
 # Route to serve static files (HTML, CSS, JS)
 @app.route('/', defaults={'path': 'index.html'})
 @app.route('/<path:path>')
 def serve_static(path):
-    return send_from_directory('static', path)
+    if path.startswith('dist/'):
+        return send_built_asset(path[len('dist/'):])
+    
+    # Prefer the built index.html that points at the bundled assets
+    if path == 'index.html' and os.path.exists(os.path.join(STATIC_DIST_DIR, 'index.html')):
+        response = send_from_directory(STATIC_DIST_DIR, 'index.html')
+    else:
+        response = send_from_directory('static', path)
+    
+    # Unhashed files are revalidated with their ETag on every use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 # API Routes
 @app.route('/api/seasons', methods=['GET'])
@@ -56,12 +548,12 @@ def get_races(season):
         if season not in AVAILABLE_SEASONS:
             return jsonify({"error": f"Season {season} not available"}), 404
         
-        logger.info(f"API: Getting race schedule for season {season}")
+        logger.info("API: Getting race schedule", season=season)
         
         # Get race schedule from FastF1
         try:
-            schedule = fastf1.get_event_schedule(season)
-            logger.info(f"Successfully fetched schedule for {season} with {len(schedule)} events")
+            schedule = get_event_schedule(season)
+            logger.info("Fetched schedule", season=season, events=len(schedule))
             
             # Convert to a list of dictionaries
             races = []
@@ -86,14 +578,46 @@ def get_races(season):
             return jsonify(races)
             
         except Exception as e:
-            logger.error(f"Error fetching races from FastF1: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.error("Error fetching races from FastF1", error=str(e), exc_info=True)
             return jsonify({"error": f"Error fetching races: {str(e)}"}), 500
     
     except Exception as e:
-        logger.error(f"Error in get_races: {str(e)}")
+        logger.error("Error in get_races", error=str(e))
         return jsonify({"error": str(e)}), 500
 
+# Session types served by get_race_data, a subset of SESSION_TYPE_MAP
+RACE_DATA_SESSION_TYPES = ('race', 'qualifying', 'sprint', 'practice1', 'practice2', 'practice3')
+
+
+def encoded_race_data(session, season, session_type):
+    """(status, JSON text) of the race data of a loaded session"""
+    # Process the session data based on session type
+    if session_type in ['race', 'sprint']:
+        response = process_race_data(session, season)
+    elif session_type == 'qualifying':
+        response = process_qualifying_data(session, season)
+    else:  # Practice sessions
+        response = process_practice_data(session, season)
+    
+    response, status = response if isinstance(response, tuple) else (response, response.status_code)
+    return status, response.get_data(as_text=True)
+
+
+def race_data_response(season, event_name, session_type):
+    """get_race_data for an event name already resolved against the schedule"""
+    try:
+        # Results are encoded once per session snapshot, failures are processed again next time
+        status, body = get_session_artifact(season, event_name, SESSION_TYPE_MAP[session_type],
+                                            ('race_data', session_type),
+                                            lambda session: encoded_race_data(session, season, session_type),
+                                            keep=lambda value: value[0] != 500)
+        return Response(body, status=status, mimetype='application/json')
+        
+    except Exception as e:
+        logger.error("Error loading session data", error=str(e), exc_info=True)
+        return jsonify({"error": f"Error loading session data: {str(e)}"}), 500
+
+
 @app.route('/api/season/<int:season>/race/<string:race_id>/<string:session_type>', methods=['GET'])
 def get_race_data(season, race_id, session_type):
     try:
@@ -101,164 +625,517 @@ def get_race_data(season, race_id, session_type):
         if season not in AVAILABLE_SEASONS:
             return jsonify({"error": f"Season {season} not available"}), 404
         
-        # Map session type to FastF1 session type
-        session_map = {
-            'race': 'Race',
-            'qualifying': 'Qualifying',
-            'sprint': 'Sprint',
-            'practice1': 'Practice 1',
-            'practice2': 'Practice 2',
-            'practice3': 'Practice 3'
-        }
-        
-        if session_type not in session_map:
+        if session_type not in RACE_DATA_SESSION_TYPES:
             return jsonify({"error": f"Invalid session type: {session_type}"}), 400
         
-        fastf1_session_type = session_map[session_type]
-        
         # Convert race_id to event name format
         event_name = race_id.replace('_', ' ').title()
         
-        logger.info(f"API: Getting {fastf1_session_type} data for {season} {event_name}")
+        logger.info("API: Getting session data", season=season, event=event_name, session=SESSION_TYPE_MAP[session_type])
         
-        # Try to get the event schedule
+        # Find the exact event name from the schedule
         try:
-            schedule = fastf1.get_event_schedule(season)
-            logger.debug(f"Successfully fetched schedule for season {season}")
-            
-            # Find the exact event name from the schedule
-            exact_event_name = None
-            event_data = None
-            
-            for idx, row in schedule.iterrows():
-                if row['EventName'].lower() == event_name.lower():
-                    exact_event_name = row['EventName']
-                    event_data = row
-                    break
-            
-            if not exact_event_name:
-                logger.warning(f"Race not found in schedule: {race_id} in {season}")
-                return jsonify({"error": f"Race not found: {race_id}"}), 404
-            
-            # Try to load the session
-            try:
-                start_time = time.time()
-                logger.debug(f"Loading session for {season} {exact_event_name} {fastf1_session_type}")
-                
-                # Load the session - removed timeout parameter
-                session = fastf1.get_session(season, exact_event_name, fastf1_session_type)
-                session.load()  # Removed timeout parameter which caused the error
-                
-                logger.info(f"Session loaded in {time.time() - start_time:.2f} seconds")
-                
-                # Process the session data based on session type
-                if session_type in ['race', 'sprint']:
-                    return process_race_data(session, season)
-                elif session_type == 'qualifying':
-                    return process_qualifying_data(session, season)
-                else:  # Practice sessions
-                    return process_practice_data(session, season)
-                
-            except Exception as e:
-                logger.error(f"Error loading session data: {str(e)}")
-                logger.error(traceback.format_exc())
-                return jsonify({"error": f"Error loading session data: {str(e)}"}), 500
-            
+            exact_event_name = find_event_name(season, race_id)
         except Exception as e:
-            logger.error(f"Error fetching schedule: {str(e)}")
+            logger.error("Error fetching schedule", error=str(e))
             return jsonify({"error": f"Error fetching schedule: {str(e)}"}), 500
+        
+        if not exact_event_name:
+            logger.warning("Race not found in schedule", season=season, race=race_id)
+            return jsonify({"error": f"Race not found: {race_id}"}), 404
+        
+        return race_data_response(season, exact_event_name, session_type)
     
     except Exception as e:
-        logger.error(f"Error in get_race_data: {str(e)}")
+        logger.error("Error in get_race_data", error=str(e))
         return jsonify({"error": str(e)}), 500
+
+
+
+def wants_binary_laps():
+    """Whether a /laps request asked for the binary encoding in its Accept header"""
+    # Routes that reuse get_lap_data, like /bundle, always need JSON
+    if request.endpoint != 'get_lap_data':
+        return False
+    best = request.accept_mimetypes.best_match(['application/json', lap_binary.MEDIA_TYPE])
+    return best == lap_binary.MEDIA_TYPE
+
+
+def binary_laps_response(encode):
+    """Response with the binary laps payload returned by encode()"""
+    with request_metrics.phase('serialize'):
+        data = encode()
+    response = Response(data, mimetype=lap_binary.MEDIA_TYPE)
+    response.headers['Vary'] = 'Accept'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def fallback_lap_data(season, race_id, session_type):
+    """Synthetic lap data as a plain /laps payload"""
+    return synthetic_data.generate_lap_data_for_session(season, race_id, session_type), 200, None
+
+
+def lap_data_payload(season, race_id, session_type):
+    """(payload, status, session key) of /laps: a LapsPayload of the session, synthetic fallback data or an error
+
+    The LapsPayload keeps the session's columnar lap table, so callers can
+    also derive stints from it, and its encodings are cached per session
+    with encoded_laps(). Fallback data and errors are plain dicts without
+    a session key.
+    """
+    # Check if season is valid
+    if season not in AVAILABLE_SEASONS:
+        return {"error": f"Season {season} not available"}, 404, None
+    
+    # Map session type to FastF1 session type
+    session_map = {
+        'race': 'Race',
+        'qualifying': 'Qualifying',
+        'sprint': 'Sprint',
+        'sprint_qualifying': 'Sprint Qualifying',
+        'sprint_shootout': 'Sprint Shootout',
+        'practice1': 'Practice 1',
+        'practice2': 'Practice 2',
+        'practice3': 'Practice 3'
+    }
     
+    if session_type not in session_map:
+        return {"error": f"Invalid session type: {session_type}"}, 400, None
+    
+    fastf1_session_type = session_map[session_type]
+    
+    # Convert race_id to event name format
+    event_name = race_id.replace('_', ' ').title()
+    
+    logger.info("API: Getting lap data", season=season, event=event_name, session=fastf1_session_type)
+    
+    # For sprint sessions before 2021, return error
+    if session_type in ['sprint', 'sprint_qualifying', 'sprint_shootout'] and season < 2021:
+        return {"error": "Sprint sessions were not held before 2021"}, 404, None
+    
+    # Try to get the event schedule
+    try:
+        # Find the exact event name from the schedule
+        exact_event_name = find_event_name(season, race_id)
+        
+        if not exact_event_name:
+            # For 2019 or missing races, generate fallback lap data
+            if season == 2019 or season >= 2025:
+                logger.info("Generating fallback lap data", season=season, race=race_id, session=session_type)
+                return fallback_lap_data(season, race_id, session_type)
+            return {"error": f"Race not found: {race_id}"}, 404, None
+        
+        # Try to load the session
+        try:
+            # Both encodings are written straight from the cached columnar lap table
+            table = get_session_lap_table(season, exact_event_name, fastf1_session_type)
+            if len(table['lap']) == 0:
+                logger.warning("No lap data available", season=season, event=exact_event_name,
+                               session=fastf1_session_type)
+                return {"error": "No lap data available"}, 404, None
+            
+            return session_models.LapsPayload(table), 200, (season, exact_event_name, fastf1_session_type)
+            
+        except Exception as e:
+            logger.error("Error loading session data", error=str(e), exc_info=True)
+            
+            # Generate fallback lap data
+            logger.info("Generating fallback lap data after an error", season=season, race=race_id, session=session_type)
+            return fallback_lap_data(season, race_id, session_type)
+        
+    except Exception as e:
+        logger.error("Error fetching schedule", error=str(e))
+        
+        # Generate fallback lap data
+        logger.info("Generating fallback lap data after a schedule error", season=season, race=race_id,
+                    session=session_type)
+        return fallback_lap_data(season, race_id, session_type)
+
 
-AVAILABLE_SEASONS = list(range(2018, 2025))  # 2018-2025
+def encoded_laps(payload, session_key, encoding):
+    """A LapsPayload's 'json', 'binary' or 'stints' encoding, written once per session snapshot"""
+    encode = {'json': payload.encode_json, 'binary': payload.encode_binary, 'stints': payload.encode_stints_json}
+    return get_session_artifact(*session_key, ('laps', encoding), lambda session: encode[encoding]())
 
 
 @app.route('/api/season/<int:season>/race/<string:race_id>/<string:session_type>/laps', methods=['GET'])
 def get_lap_data(season, race_id, session_type):
+    try:
+        payload, status, session_key = lap_data_payload(season, race_id, session_type)
+        if status != 200:
+            return jsonify(payload), status
+        
+        if isinstance(payload, session_models.LapsPayload):
+            if wants_binary_laps():
+                return binary_laps_response(lambda: encoded_laps(payload, session_key, 'binary'))
+            return json_response(session_models.RawJSON(encoded_laps(payload, session_key, 'json')))
+        
+        # Synthetic fallback data, in the encoding the client asked for
+        if wants_binary_laps():
+            return binary_laps_response(lambda: lap_binary.encode_laps_data(payload['lapsData']))
+        return jsonify(payload)
+    
+    except Exception as e:
+        logger.error("Error in get_lap_data", error=str(e))
+        return jsonify({"error": str(e)}), 500
+    
+
+@app.route('/api/season/<int:season>/race/<string:race_id>/<string:session_type>/compare', methods=['GET'])
+def get_driver_comparison(season, race_id, session_type):
+    """Head-to-head lap comparison between two drivers"""
     try:
         # Check if season is valid
         if season not in AVAILABLE_SEASONS:
             return jsonify({"error": f"Season {season} not available"}), 404
         
-        # Map session type to FastF1 session type
-        session_map = {
-            'race': 'Race',
-            'qualifying': 'Qualifying',
-            'sprint': 'Sprint',
-            'sprint_qualifying': 'Sprint Qualifying',
-            'sprint_shootout': 'Sprint Shootout',
-            'practice1': 'Practice 1',
-            'practice2': 'Practice 2',
-            'practice3': 'Practice 3'
-        }
+        if session_type not in SESSION_TYPE_MAP:
+            return jsonify({"error": f"Invalid session type: {session_type}"}), 400
+        
+        driver_a = request.args.get('a', '').upper()
+        driver_b = request.args.get('b', '').upper()
+        if not driver_a or not driver_b:
+            return jsonify({"error": "Both drivers must be given as ?a=XXX&b=YYY"}), 400
+        
+        window = request.args.get('window', 5, type=int)
+        if window < 1:
+            return jsonify({"error": "Rolling window must be at least 1 lap"}), 400
+        
+        logger.info("API: Comparing drivers", season=season, race=race_id, session=session_type, a=driver_a, b=driver_b)
+        
+        try:
+            exact_event_name = find_event_name(season, race_id)
+            if not exact_event_name:
+                return jsonify({"error": f"Race not found: {race_id}"}), 404
+            
+            table = get_session_lap_table(season, exact_event_name, SESSION_TYPE_MAP[session_type])
+        except Exception as e:
+            logger.error("Error loading session data", error=str(e), exc_info=True)
+            return jsonify({"error": f"Error loading session data: {str(e)}"}), 500
         
-        if session_type not in session_map:
+        try:
+            comparison = lap_analysis.compare_drivers(table, driver_a, driver_b, window)
+        except KeyError as e:
+            return jsonify({"error": f"No lap data for driver {e.args[0]}"}), 404
+        
+        return jsonify(comparison)
+    
+    except Exception as e:
+        logger.error("Error in get_driver_comparison", error=str(e))
+        return jsonify({"error": str(e)}), 500
+    
+
+@app.route('/api/season/<int:season>/race/<string:race_id>/<string:session_type>/telemetry', methods=['GET'])
+def get_telemetry_data(season, race_id, session_type):
+    """Downsampled speed, throttle, brake and gear traces for one driver's lap, or whole session without a lap"""
+    try:
+        # Check if season is valid
+        if season not in AVAILABLE_SEASONS:
+            return jsonify({"error": f"Season {season} not available"}), 404
+        
+        if session_type not in SESSION_TYPE_MAP:
             return jsonify({"error": f"Invalid session type: {session_type}"}), 400
         
-        fastf1_session_type = session_map[session_type]
+        driver_code = request.args.get('driver', '').upper()
+        lap_number = request.args.get('lap', type=int)
+        points = request.args.get('points', telemetry.DEFAULT_POINTS, type=int)
         
-        # Convert race_id to event name format
-        event_name = race_id.replace('_', ' ').title()
+        if not driver_code:
+            return jsonify({"error": "Driver must be given as ?driver=XXX, a single lap as &lap=N"}), 400
         
-        logger.info(f"API: Getting lap data for {fastf1_session_type} data for {season} {event_name}")
+        # Clamp the resolution so the cache only holds a bounded set of variants
+        points = max(3, min(points, telemetry.MAX_POINTS))
         
-        # For sprint sessions before 2021, return error
-        if session_type in ['sprint', 'sprint_qualifying', 'sprint_shootout'] and season < 2021:
-            return jsonify({"error": "Sprint sessions were not held before 2021"}), 404
+        logger.info("API: Getting telemetry", season=season, race=race_id, session=session_type, driver=driver_code,
+                    lap=lap_number, points=points)
         
-        # Try to get the event schedule
         try:
-            schedule = fastf1.get_event_schedule(season)
+            exact_event_name = find_event_name(season, race_id)
+            if not exact_event_name:
+                return jsonify({"error": f"Race not found: {race_id}"}), 404
             
-            # Find the exact event name from the schedule
-            exact_event_name = None
+            fastf1_session_type = SESSION_TYPE_MAP[session_type]
+            trace_key = (season, exact_event_name, fastf1_session_type, driver_code, lap_number, points)
             
-            for idx, row in schedule.iterrows():
-                if row['EventName'].lower() == event_name.lower():
-                    exact_event_name = row['EventName']
-                    break
+            # Opened first, an outdated store drops the traces downsampled from it
+            store = get_telemetry_store(season, exact_event_name, fastf1_session_type)
+            with _telemetry_store_lock:
+                trace = _telemetry_trace_cache.get(trace_key)
+                if trace is not None:
+                    _telemetry_trace_cache.move_to_end(trace_key)
             
+            if trace is not None:
+                request_metrics.cache_hit('telemetry_trace')
+            else:
+                request_metrics.cache_miss('telemetry_trace')
+                if lap_number is None:
+                    channels = telemetry_store.driver_channels(store, driver_code)
+                else:
+                    channels = telemetry_store.lap_channels(store, driver_code, lap_number)
+                if channels is None:
+                    target = driver_code if lap_number is None else f"{driver_code} lap {lap_number}"
+                    return jsonify({"error": f"No telemetry for {target}"}), 404
+                
+                trace = telemetry.downsample_telemetry(channels, points)
+                with _telemetry_store_lock:
+                    _telemetry_trace_cache[trace_key] = trace
+                    while len(_telemetry_trace_cache) > TELEMETRY_TRACE_CACHE_SIZE:
+                        _telemetry_trace_cache.popitem(last=False)
+        except Exception as e:
+            logger.error("Error loading telemetry data", error=str(e), exc_info=True)
+            return jsonify({"error": f"Error loading telemetry data: {str(e)}"}), 500
+        
+        return jsonify({
+            "driver": driver_code,
+            "lap": lap_number,
+            **trace
+        })
+    
+    except Exception as e:
+        logger.error("Error in get_telemetry_data", error=str(e))
+        return jsonify({"error": str(e)}), 500
+    
+
+@app.route('/api/season/<int:season>/race/<string:race_id>/<string:session_type>/distribution', methods=['GET'])
+def get_lap_distribution(season, race_id, session_type):
+    """Lap time percentiles per driver, compound or stint for one session"""
+    try:
+        # Check if season is valid
+        if season not in AVAILABLE_SEASONS:
+            return jsonify({"error": f"Season {season} not available"}), 404
+        
+        if session_type not in SESSION_TYPE_MAP:
+            return jsonify({"error": f"Invalid session type: {session_type}"}), 400
+        
+        by = request.args.get('by', 'driver')
+        if by not in lap_analysis.DISTRIBUTION_GROUPINGS:
+            return jsonify({"error": f"Invalid grouping: {by}"}), 400
+        
+        # Long-run analysis only looks at stints of at least this many laps
+        min_stint_laps = request.args.get('minStintLaps', 0, type=int)
+        driver_code = request.args.get('driver', '').upper() or None
+        
+        logger.info("API: Getting lap distribution", season=season, race=race_id, session=session_type, by=by)
+        
+        try:
+            exact_event_name = find_event_name(season, race_id)
             if not exact_event_name:
-                # For 2019 or missing races, generate fallback lap data
-                if season == 2019 or season >= 2025:
-                    logger.info(f"Generating fallback lap data for {season} {race_id} {session_type}")
-                    return jsonify(generate_lap_data_for_session(season, race_id, session_type))
                 return jsonify({"error": f"Race not found: {race_id}"}), 404
             
-            # Try to load the session
+            table = get_session_lap_table(season, exact_event_name, SESSION_TYPE_MAP[session_type])
+        except Exception as e:
+            logger.error("Error loading session data", error=str(e), exc_info=True)
+            return jsonify({"error": f"Error loading session data: {str(e)}"}), 500
+        
+        return jsonify({
+            "by": by,
+            "minStintLaps": min_stint_laps,
+            "groups": lap_analysis.distribution_stats(table, by, min_stint_laps, driver_code)
+        })
+    
+    except Exception as e:
+        logger.error("Error in get_lap_distribution", error=str(e))
+        return jsonify({"error": str(e)}), 500
+    
+
+@app.route('/api/season/<int:season>/distribution', methods=['GET'])
+def get_season_lap_distribution(season):
+    """Season-wide lap time percentiles merged from per-session sketches"""
+    try:
+        # Check if season is valid
+        if season not in AVAILABLE_SEASONS:
+            return jsonify({"error": f"Season {season} not available"}), 404
+        
+        session_type = request.args.get('session', 'race')
+        if session_type not in SESSION_TYPE_MAP:
+            return jsonify({"error": f"Invalid session type: {session_type}"}), 400
+        
+        by = request.args.get('by', 'driver')
+        if by not in ('driver', 'compound'):
+            return jsonify({"error": f"Invalid grouping for a season: {by}"}), 400
+        
+        logger.info("API: Getting season lap distribution", season=season, session=session_type, by=by)
+        
+        try:
+            schedule = get_event_schedule(season)
+        except Exception as e:
+            logger.error("Error fetching schedule", error=str(e))
+            return jsonify({"error": f"Error fetching schedule: {str(e)}"}), 500
+        
+        # Collect each group's sketches across the season's events
+        group_sketches = {}
+        events_used = []
+        for idx, row in schedule.iterrows():
+            if int(row['RoundNumber']) == 0:
+                continue  # Pre-season testing
+            
             try:
-                start_time = time.time()
-                logger.debug(f"Loading session for {season} {exact_event_name} {fastf1_session_type}")
-                
-                # Load the session
-                session = fastf1.get_session(season, exact_event_name, fastf1_session_type)
-                session.load()
-                
-                logger.info(f"Session loaded in {time.time() - start_time:.2f} seconds")
-                
-                # Get lap data
-                return process_lap_data(session)
-                
+                sketches = get_session_sketches(season, row['EventName'], SESSION_TYPE_MAP[session_type])
             except Exception as e:
-                logger.error(f"Error loading session data: {str(e)}")
-                logger.error(traceback.format_exc())
-                
-                # Generate fallback lap data
-                logger.info(f"Generating fallback lap data after error for {season} {race_id} {session_type}")
-                return jsonify(generate_lap_data_for_session(season, race_id, session_type))
+                logger.warning("Skipping event in season distribution", event=row['EventName'], error=str(e))
+                continue
             
+            events_used.append(row['EventName'])
+            for label, sketch in sketches.get(by, {}).items():
+                group_sketches.setdefault(label, []).append(sketch)
+        
+        groups = {}
+        quantiles = lap_analysis.DISTRIBUTION_QUANTILES
+        for label, sketches in group_sketches.items():
+            merged = quantile_sketch.merge_sketches(sketches)
+            values = quantile_sketch.sketch_quantiles(merged, quantiles + [0.25, 0.75])
+            q1, q3 = values[-2], values[-1]
+            iqr = q3 - q1
+            filtered_mean = quantile_sketch.sketch_filtered_mean(merged, q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+            
+            groups[label] = {
+                "count": quantile_sketch.sketch_count(merged),
+                "quantiles": {
+                    lap_analysis.quantile_key(q): round(float(values[i]), 3)
+                    for i, q in enumerate(quantiles)
+                },
+                "iqr": round(float(iqr), 3),
+                "filteredMean": None if filtered_mean != filtered_mean else round(filtered_mean, 3)
+            }
+        
+        return jsonify({
+            "season": season,
+            "session": session_type,
+            "by": by,
+            "events": events_used,
+            "groups": groups
+        })
+    
+    except Exception as e:
+        logger.error("Error in get_season_lap_distribution", error=str(e))
+        return jsonify({"error": str(e)}), 500
+    
+
+@app.route('/api/season/<int:season>/race/<string:race_id>/<string:session_type>/degradation', methods=['GET'])
+def get_degradation_data(season, race_id, session_type):
+    """Fuel corrected tire degradation fitted per driver and stint"""
+    try:
+        # Check if season is valid
+        if season not in AVAILABLE_SEASONS:
+            return jsonify({"error": f"Season {season} not available"}), 404
+        
+        if session_type not in SESSION_TYPE_MAP:
+            return jsonify({"error": f"Invalid session type: {session_type}"}), 400
+        
+        fuel_effect = request.args.get('fuelEffect', lap_analysis.DEFAULT_FUEL_EFFECT, type=float)
+        if not math.isfinite(fuel_effect):
+            return jsonify({"error": "fuelEffect must be a finite number"}), 400
+        degree = request.args.get('degree', 1, type=int)
+        if degree not in (1, 2):
+            return jsonify({"error": "Degree must be 1 (linear) or 2 (quadratic)"}), 400
+        
+        # Fits are cached per fuel effect, so only values on a bounded grid ever reach the artifact key
+        fuel_effect = lap_analysis.quantize_fuel_effect(fuel_effect)
+        
+        logger.info("API: Fitting tire degradation", season=season, race=race_id, session=session_type)
+        
+        try:
+            exact_event_name = find_event_name(season, race_id)
+            if not exact_event_name:
+                return jsonify({"error": f"Race not found: {race_id}"}), 404
+            
+            fastf1_session_type = SESSION_TYPE_MAP[session_type]
+            
+            # Fitted from the session the artifact belongs to, never from another cache lookup
+            stints = get_session_artifact(
+                season, exact_event_name, fastf1_session_type, ('degradation', fuel_effect, degree),
+                lambda session: lap_analysis.fit_degradation(lap_analysis.build_lap_table(session.laps),
+                                                             fuel_effect, degree))
         except Exception as e:
-            logger.error(f"Error fetching schedule: {str(e)}")
+            logger.error("Error loading session data", error=str(e), exc_info=True)
+            return jsonify({"error": f"Error loading session data: {str(e)}"}), 500
+        
+        return jsonify({
+            "fuelEffect": fuel_effect,
+            "degree": degree,
+            "byCompound": lap_analysis.degradation_by_compound(stints),
+            "stints": stints
+        })
+    
+    except Exception as e:
+        logger.error("Error in get_degradation_data", error=str(e))
+        return jsonify({"error": str(e)}), 500
+    
+
+@app.route('/api/season/<int:season>/race/<string:race_id>/<string:session_type>/simulate', methods=['GET'])
+def get_strategy_simulation(season, race_id, session_type):
+    """Rank 1, 2 and 3 stop plans by simulated race time using the session's pace and degradation"""
+    try:
+        # Check if season is valid
+        if season not in AVAILABLE_SEASONS:
+            return jsonify({"error": f"Season {season} not available"}), 404
+        
+        if session_type not in SESSION_TYPE_MAP:
+            return jsonify({"error": f"Invalid session type: {session_type}"}), 400
+        
+        pit_loss = request.args.get('pitLoss', strategy_sim.DEFAULT_PIT_LOSS, type=float)
+        if not math.isfinite(pit_loss):
+            return jsonify({"error": "pitLoss must be a finite number"}), 400
+        pit_loss = max(0.0, min(pit_loss, strategy_sim.MAX_PIT_LOSS))
+        pit_loss = round(round(pit_loss / strategy_sim.PIT_LOSS_STEP) * strategy_sim.PIT_LOSS_STEP, 6)
+        samples = max(10, min(request.args.get('samples', strategy_sim.DEFAULT_SAMPLES, type=int), 2000))
+        max_stops = max(1, min(request.args.get('maxStops', 3, type=int), 3))
+        min_stint = max(1, request.args.get('minStint', strategy_sim.DEFAULT_MIN_STINT, type=int))
+        top = max(1, min(request.args.get('top', 10, type=int), 100))
+        seed = max(0, min(request.args.get('seed', 0, type=int), 2 ** 32 - 1))
+        
+        logger.info("API: Simulating strategies", season=season, race=race_id, session=session_type)
+        
+        try:
+            exact_event_name = find_event_name(season, race_id)
+            if not exact_event_name:
+                return jsonify({"error": f"Race not found: {race_id}"}), 404
             
-            # Generate fallback lap data
-            logger.info(f"Generating fallback lap data after schedule error for {season} {race_id} {session_type}")
-            return jsonify(generate_lap_data_for_session(season, race_id, session_type))
+            fastf1_session_type = SESSION_TYPE_MAP[session_type]
+            inputs = get_session_artifact(
+                season, exact_event_name, fastf1_session_type, 'strategy_inputs',
+                lambda session: strategy_sim.derive_inputs(lap_analysis.build_lap_table(session.laps)))
+        except Exception as e:
+            logger.error("Error loading session data", error=str(e), exc_info=True)
+            return jsonify({"error": f"Error loading session data: {str(e)}"}), 500
+        
+        if inputs is None:
+            return jsonify({"error": "Not enough dry stints to model this race"}), 404
+        
+        # The seed makes results deterministic, so identical queries are served from a bounded cache.
+        # Keyed by the inputs rather than the session, a refreshed session with new pace misses it
+        simulation_key = (session_models.dumps(inputs), pit_loss, samples, max_stops, min_stint, top, seed)
+        with _simulation_cache_lock:
+            simulation = _simulation_cache.get(simulation_key)
+            if simulation is not None:
+                _simulation_cache.move_to_end(simulation_key)
+        
+        if simulation is not None:
+            request_metrics.cache_hit('simulation')
+            # Timings belong to the run that computed the plans, a hit reports none
+            simulation = {**simulation, "stats": {**simulation['stats'], "cached": True}}
+        else:
+            request_metrics.cache_miss('simulation')
+            simulation = strategy_sim.simulate(inputs, pit_loss, samples, max_stops, min_stint, top=top, seed=seed)
+            logger.info("Evaluated strategy plans", plans=simulation['stats']['plansEvaluated'],
+                        strategies_per_second=simulation['stats']['strategiesPerSecond'])
+            
+            stats = {key: value for key, value in simulation['stats'].items()
+                     if key not in ('elapsedMs', 'strategiesPerSecond')}
+            with _simulation_cache_lock:
+                _simulation_cache[simulation_key] = {**simulation, "stats": stats}
+                while len(_simulation_cache) > SIMULATION_CACHE_SIZE:
+                    _simulation_cache.popitem(last=False)
+            simulation['stats']['cached'] = False
+        
+        return jsonify({
+            "inputs": inputs,
+            **simulation
+        })
     
     except Exception as e:
-        logger.error(f"Error in get_lap_data: {str(e)}")
+        logger.error("Error in get_strategy_simulation", error=str(e))
         return jsonify({"error": str(e)}), 500
     
 
@@ -266,9 +1143,11 @@ def get_lap_data(season, race_id, session_type):
 def get_strategy_data(season, race_id, session_type):
     try:
         # Get race data first
-        race_data = get_race_data(season, race_id, session_type)
-        if isinstance(race_data, tuple):
-            race_data = race_data[0].json
+        race_response = get_race_data(season, race_id, session_type)
+        if isinstance(race_response, tuple):
+            race_data = race_response[0].get_json()
+        else:
+            race_data = race_response.get_json()
         
         # Get lap data
         lap_response = get_lap_data(season, race_id, session_type)
@@ -310,10 +1189,228 @@ def get_strategy_data(season, race_id, session_type):
         # Add to race data
         race_data['strategies'] = strategies
         return jsonify(race_data)
-        
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Parts of a session bundle, in the order they are built
+BUNDLE_PARTS = ('sessions', 'results', 'laps', 'stints')
+
+
+def response_payload(response):
+    """JSON body and status code of a route's return value"""
+    if isinstance(response, tuple):
+        response, status = response
+    else:
+        status = response.status_code
+    return response.get_json(), status
+
+
+def spliced_payload(response):
+    """Status code and body of a route's return value, successful JSON kept encoded as RawJSON"""
+    if isinstance(response, tuple):
+        response, status = response
+    else:
+        status = response.status_code
+    if status != 200:
+        # Only error bodies are decoded, for their message
+        return response.get_json(), status
+    return session_models.RawJSON(response.get_data(as_text=True).rstrip('\n')), status
+
+
+@app.route('/api/season/<int:season>/race/<string:race_id>/<string:session_type>/bundle', methods=['GET'])
+def get_session_bundle(season, race_id, session_type):
+    """Results, laps, stints and available sessions for a session in one response
+
+    ?parts= selects a comma separated subset of results, laps, stints and
+    sessions. Every part comes from the same cached session; parts that fail
+    are reported under "errors" without failing the others. Parts are
+    spliced in as the JSON their routes encoded, and cached, rather than
+    decoded and encoded again.
+    """
+    try:
+        requested = request.args.get('parts')
+        if requested is None:
+            parts = list(BUNDLE_PARTS)
+        else:
+            # Blank and repeated parts are dropped, the first mention keeps its place
+            parts = list(dict.fromkeys(part.strip() for part in requested.split(',') if part.strip()))
+        unknown = [part for part in parts if part not in BUNDLE_PARTS]
+        if unknown:
+            return jsonify({"error": f"Unknown bundle parts: {', '.join(unknown)}"}), 400
+        if not parts:
+            return jsonify({"error": "Expected at least one bundle part"}), 400
+
+        logger.info("API: Getting bundle", season=season, race=race_id, session=session_type, parts=','.join(parts))
+
+        bundle = {"season": season, "raceId": race_id, "sessionType": session_type}
+        errors = {}
+
+        def part_error(data, status):
+            return {"status": status, "error": (data or {}).get('error', 'Unknown error')}
+
+        for part, route in (('sessions', lambda: get_event_type(season, race_id)),
+                            ('results', lambda: get_race_data(season, race_id, session_type))):
+            if part in parts:
+                data, status = spliced_payload(route())
+                if status == 200:
+                    bundle[part] = data
+                else:
+                    errors[part] = part_error(data, status)
+
+        # Stints are derived from the laps, which are only sent when asked for
+        lap_parts = [part for part in ('laps', 'stints') if part in parts]
+        if lap_parts:
+            payload, status, session_key = lap_data_payload(season, race_id, session_type)
+            if status == 200 and isinstance(payload, session_models.LapsPayload):
+                # Stints of session data come straight from the lap table
+                for part, encoding in (('laps', 'json'), ('stints', 'stints')):
+                    if part in parts:
+                        bundle[part] = session_models.RawJSON(encoded_laps(payload, session_key, encoding))
+            elif status == 200:
+                # Synthetic fallback data is plain laps
+                if 'laps' in parts:
+                    bundle['laps'] = payload
+                if 'stints' in parts:
+                    bundle['stints'] = extract_strategy_from_laps(payload.get('lapsData', {}))
+            else:
+                for part in lap_parts:
+                    errors[part] = part_error(payload, status)
+
+        if errors:
+            bundle['errors'] = errors
+
+        # Only fail the request when nothing could be built
+        if len(errors) == len(parts):
+            return json_response(bundle), errors[parts[0]]['status']
+
+        response = json_response(bundle)
+        if errors:
+            # A failed part may be transient, so a partial bundle must not be kept
+            response.headers['Cache-Control'] = 'no-store'
+            return response
+
+        # Clients keep complete bundles and revalidate them with If-None-Match
+        response.headers['Cache-Control'] = 'no-cache'
+        response.add_etag()
+        return response.make_conditional(request)
+
     except Exception as e:
+        logger.error("Error in get_session_bundle", error=str(e), exc_info=True)
         return jsonify({"error": str(e)}), 500
+
+
+# Sessions resolved concurrently by /api/batch, shared by every batch request
+BATCH_WORKERS = 4
+BATCH_MAX_SESSIONS = 50
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch')
+
+
+def batch_race_data(season, event_name, session_type):
+    """Status and JSON of race_data_response, run on a batch worker"""
+    with app.app_context(), request_metrics.in_flight('batch_items_in_flight'):
+        data, status = response_payload(race_data_response(season, event_name, session_type))
+        return status, data
+
+
+@app.route('/api/batch', methods=['POST'])
+def get_batch_race_data():
+    """Race data for many sessions, streamed as newline-delimited JSON
+
+    The body is {"sessions": [{"season", "raceId", "sessionType"}, ...]}.
+    Each line of the response is one session, in the order they complete,
+    with its index in the request, its status and either "data" or "error".
+    Schedules are looked up once per season, failed sessions do not fail
+    the others.
+    """
+    try:
+        body = request.get_json(silent=True) or {}
+        sessions = body.get('sessions')
+        if not isinstance(sessions, list) or not sessions:
+            return jsonify({"error": "Expected a non-empty list of sessions"}), 400
+        if len(sessions) > BATCH_MAX_SESSIONS:
+            return jsonify({"error": f"At most {BATCH_MAX_SESSIONS} sessions per batch"}), 400
+        
+        logger.info("API: Getting batch", sessions=len(sessions))
+        
+        # Items answered without a session load, and the ones handed to the workers
+        results = []
+        futures = {}
+        event_indexes = {}
+        for index, item in enumerate(sessions):
+            item = item if isinstance(item, dict) else {}
+            key = {"index": index, "season": item.get('season'), "raceId": item.get('raceId'),
+                   "sessionType": item.get('sessionType')}
+            season, race_id, session_type = key['season'], key['raceId'], key['sessionType']
+            
+            if not isinstance(season, int) or not isinstance(race_id, str) or not isinstance(session_type, str):
+                results.append(dict(key, status=400, error="Expected season, raceId and sessionType"))
+                continue
+            if season not in AVAILABLE_SEASONS:
+                results.append(dict(key, status=404, error=f"Season {season} not available"))
+                continue
+            if session_type not in RACE_DATA_SESSION_TYPES:
+                results.append(dict(key, status=400, error=f"Invalid session type: {session_type}"))
+                continue
+            
+            if season not in event_indexes:
+                try:
+                    event_indexes[season] = schedule_event_index(season)
+                except Exception as e:
+                    logger.error("Error fetching schedule", error=str(e))
+                    event_indexes[season] = e
+            events = event_indexes[season]
+            if isinstance(events, Exception):
+                results.append(dict(key, status=500, error=f"Error fetching schedule: {str(events)}"))
+                continue
+            
+            event_name = events.get(race_id.replace('_', ' ').lower())
+            if not event_name:
+                results.append(dict(key, status=404, error=f"Race not found: {race_id}"))
+                continue
+            
+            futures[_batch_executor.submit(batch_race_data, season, event_name, session_type)] = key
+        
+        # The body is produced after the handler returned, so it is timed on the request's own timer
+        timer = g.get('metrics')
+        route = request_route()
+        
+        def generate():
+            try:
+                for result in results:
+                    yield json.dumps(result) + '\n'
+                
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        status, data = future.result()
+                    except Exception as e:
+                        logger.error("Error in batch item", error=str(e))
+                        status, data = 500, {"error": str(e)}
+                    
+                    if status == 200:
+                        result = dict(key, status=status, data=data)
+                    else:
+                        result = dict(key, status=status, error=(data or {}).get('error', 'Unknown error'))
+                    if timer is not None:
+                        with timer.phase('serialize'):
+                            line = json.dumps(result) + '\n'
+                    else:
+                        line = json.dumps(result) + '\n'
+                    yield line
+            finally:
+                # A client that went away does not keep the workers busy
+                for future in futures:
+                    future.cancel()
+                request_metrics.end_request(timer, route, 200)
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
     
+    except Exception as e:
+        logger.error("Error in get_batch_race_data", error=str(e), exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
 
 def extract_strategy_from_laps(laps_data):
     """Extract tire stints from lap data with exact lap numbers"""
@@ -390,161 +1487,6 @@ def extract_strategy_from_laps(laps_data):
     return strategies
 
 
-def generate_fallback_strategy(season, race_id, drivers, total_laps=70):
-    """Generate realistic tire strategy data when actual data is unavailable"""
-    import random
-    
-    strategies = {}
-    
-    # Base track info on race name
-    if 'monaco' in race_id.lower():
-        total_laps = 78
-        stops = random.choice([1, 1, 2])  # Monaco usually has 1 stop
-    elif 'monza' in race_id.lower():
-        total_laps = 53
-        stops = random.choice([1, 1, 2])  # Monza usually has 1 stop
-    elif 'spa' in race_id.lower() or 'belgium' in race_id.lower():
-        total_laps = 44
-        stops = random.choice([1, 2, 2])  # Spa usually has 2 stops
-    else:
-        # Default values for other tracks
-        if total_laps < 50:
-            total_laps = 70  # Standard race length
-        stops = random.choice([1, 2, 2, 3])  # Most races have 1-2 stops with occasional 3
-    
-    # Common pit stop windows (percentages of race distance)
-    one_stop_windows = [(0.3, 0.45)]
-    two_stop_windows = [(0.2, 0.3), (0.5, 0.7)]
-    three_stop_windows = [(0.15, 0.25), (0.4, 0.5), (0.65, 0.8)]
-    
-    # Tire compounds available
-    compounds = ['Soft', 'Medium', 'Hard']
-    
-    # For each driver
-    for driver in drivers:
-        driver_code = driver['code']
-        position = driver.get('position', 20)
-        
-        # Check if driver finished race
-        status = driver.get('status', '').lower()
-        finished = status == 'finished' or '+' in driver.get('gap', '')
-        
-        # Determine strategy quality based on position
-        # Top teams tend to have more optimal strategies
-        quality_factor = max(1, 11 - position) / 10  # 1.0 to 0.1
-        
-        # Determine strategy based on position
-        # Frontrunners usually have more optimized strategies
-        if position <= 3:
-            # Top positions usually have optimal strategies
-            stint_variation = 0.1  # Low variation in stint lengths
-        elif position <= 10:
-            # Midfield has more variation
-            stint_variation = 0.2  # Medium variation
-        else:
-            # Backmarkers have most variation
-            stint_variation = 0.3  # High variation
-        
-        # Select number of pit stops for this driver
-        driver_stops = stops
-        if not finished:
-            # DNF drivers might have fewer stops
-            driver_stops = random.randint(0, stops)
-        
-        # Get appropriate windows based on number of stops
-        if driver_stops == 1:
-            windows = one_stop_windows
-        elif driver_stops == 2:
-            windows = two_stop_windows
-        else:
-            windows = three_stop_windows
-        
-        # Generate pit stop laps
-        pit_laps = []
-        for i, window in enumerate(windows[:driver_stops]):
-            window_start = int(window[0] * total_laps)
-            window_end = int(window[1] * total_laps)
-            
-            # Add some variation based on strategy quality
-            variation = int((window_end - window_start) * (1 - quality_factor))
-            
-            min_lap = max(1, window_start - variation)
-            max_lap = min(total_laps - 1, window_end + variation)
-            
-            pit_lap = random.randint(min_lap, max_lap)
-            pit_laps.append(pit_lap)
-        
-        # Sort pit laps
-        pit_laps.sort()
-        
-        # Create stints
-        stints = []
-        
-        # Determine starting compound
-        if position <= 5:
-            # Top positions more likely to start on softs
-            start_compound = random.choice(['Soft', 'Soft', 'Medium'])
-        elif position <= 10:
-            # Midfield balanced
-            start_compound = random.choice(['Soft', 'Medium', 'Medium'])
-        else:
-            # Back of grid more likely to start on harder compounds
-            start_compound = random.choice(['Medium', 'Medium', 'Hard'])
-        
-        # First stint always starts at lap 1
-        first_stint_end = pit_laps[0] if pit_laps else total_laps
-        first_stint_length = first_stint_end - 1 + 1  # Inclusive lap count
-        
-        # Add first stint
-        stints.append({
-            'compound': start_compound,
-            'laps': first_stint_length,
-            'startLap': 1
-        })
-        
-        # Add middle stints based on pit stops
-        for i in range(len(pit_laps)):
-            start_lap = pit_laps[i] + 1
-            
-            # Determine end lap
-            if i < len(pit_laps) - 1:
-                end_lap = pit_laps[i+1]
-            else:
-                end_lap = total_laps if finished else pit_laps[i] + random.randint(5, 15)
-            
-            # Stint length
-            stint_length = end_lap - start_lap + 1  # Inclusive lap count
-            
-            # Determine compound
-            available = ['Soft', 'Medium', 'Hard']
-            previous = stints[-1]['compound']
-            
-            # Leaders tend to follow optimal tire progression
-            if position <= 3:
-                # Top positions usually follow Soft->Medium->Hard
-                if previous == 'Soft':
-                    compound = random.choice(['Medium', 'Medium', 'Hard'])
-                elif previous == 'Medium':
-                    compound = random.choice(['Hard', 'Hard', 'Medium'])
-                else:  # previous == 'Hard'
-                    compound = random.choice(['Hard', 'Medium'])
-            else:
-                # Others have more random strategies
-                available.remove(previous)  # Avoid same compound
-                compound = random.choice(available)
-            
-            stints.append({
-                'compound': compound,
-                'laps': stint_length,
-                'startLap': start_lap
-            })
-        
-        # Add to strategies
-        strategies[driver_code] = stints
-    
-    return strategies
-
-
 @app.route('/api/season/<int:season>/race/<string:race_id>/event_type', methods=['GET'])
 def get_event_type(season, race_id):
     """Determine if an event is a sprint weekend or regular weekend"""
@@ -553,60 +1495,25 @@ def get_event_type(season, race_id):
         if season not in AVAILABLE_SEASONS:
             return jsonify({"error": f"Season {season} not available"}), 404
         
-        logger.info(f"API: Getting event type for {season} {race_id}")
-        
-        # Convert race_id to event name format
-        event_name = race_id.replace('_', ' ').title()
+        logger.info("API: Getting event type", season=season, race=race_id)
         
         # Get race schedule from FastF1
         try:
-            schedule = fastf1.get_event_schedule(season)
-            
             # Find the exact event name from the schedule
-            exact_event_name = None
-            event_data = None
-            
-            for idx, row in schedule.iterrows():
-                if row['EventName'].lower() == event_name.lower():
-                    exact_event_name = row['EventName']
-                    event_data = row
-                    break
+            exact_event_name = find_event_name(season, race_id)
             
             if not exact_event_name:
-                logger.warning(f"Race not found in schedule: {race_id} in {season}")
+                logger.warning("Race not found in schedule", season=season, race=race_id)
                 return jsonify({"error": f"Race not found: {race_id}"}), 404
             
-            # Check if this is a sprint weekend
-            # We'll check by trying to load a Sprint session
-            try:
-                sprint_session = fastf1.get_session(season, exact_event_name, 'Sprint')
-                sprint_session.load(laps=False, telemetry=False, weather=False)
-                
-                # If we get here, the Sprint session exists
-                is_sprint_weekend = True
-                logger.info(f"Event {exact_event_name} in {season} is a sprint weekend")
-                
-                # Also check for Sprint Qualifying (SQ)
-                has_sprint_qualifying = False
-                try:
-                    sq_session = fastf1.get_session(season, exact_event_name, 'Sprint Qualifying')
-                    sq_session.load(laps=False, telemetry=False, weather=False)
-                    has_sprint_qualifying = True
-                except Exception:
-                    # Sprint Qualifying not found, might be called "Sprint Shootout" in some seasons
-                    try:
-                        sq_session = fastf1.get_session(season, exact_event_name, 'Sprint Shootout')
-                        sq_session.load(laps=False, telemetry=False, weather=False)
-                        has_sprint_qualifying = True
-                    except Exception:
-                        # No Sprint Qualifying found
-                        pass
-                
-            except Exception:
-                # If we get an error, the Sprint session doesn't exist
-                is_sprint_weekend = False
-                has_sprint_qualifying = False
-                logger.info(f"Event {exact_event_name} in {season} is a regular weekend")
+            # Sprint weekends are recognised from the sessions that exist, so each is loaded once
+            sessions = get_available_sessions_for_event(season, exact_event_name)
+            session_names = {session['name'] for session in sessions}
+            is_sprint_weekend = 'Sprint' in session_names
+            has_sprint_qualifying = is_sprint_weekend and bool(
+                session_names & {'Sprint Qualifying', 'Sprint Shootout'})
+            logger.info("Event type determined", season=season, event=exact_event_name,
+                        weekend='sprint' if is_sprint_weekend else 'regular')
             
             # Return the event type information
             return jsonify({
@@ -614,16 +1521,15 @@ def get_event_type(season, race_id):
                 "season": season,
                 "is_sprint_weekend": is_sprint_weekend,
                 "has_sprint_qualifying": has_sprint_qualifying,
-                "sessions": get_available_sessions_for_event(season, exact_event_name)
+                "sessions": sessions
             })
             
         except Exception as e:
-            logger.error(f"Error determining event type: {str(e)}")
-            logger.error(traceback.format_exc())
+            logger.error("Error determining event type", error=str(e), exc_info=True)
             return jsonify({"error": f"Error determining event type: {str(e)}"}), 500
     
     except Exception as e:
-        logger.error(f"Error in get_event_type: {str(e)}")
+        logger.error("Error in get_event_type", error=str(e))
         return jsonify({"error": str(e)}), 500
     
 
@@ -644,105 +1550,28 @@ def get_available_sessions_for_event(season, event_name):
     ]
     
     for session_type in session_types:
+        key = ('session', season, event_name, session_type)
         try:
-            session = fastf1.get_session(season, event_name, session_type)
-            session.load(laps=False, telemetry=False, weather=False)
-            
-            # If we get here, the session exists
-            session_info = {
-                'name': session_type,
-                'api_name': session_type.lower().replace(' ', '_')  # For API endpoints
-            }
-            available_sessions.append(session_info)
+            session = get_held_session(season, event_name, session_type)
         except Exception:
             # Session doesn't exist, continue to next one
             continue
-    
-    return available_sessions
-
-
-def process_lap_data(session):
-    """Process lap data for chart visualization"""
-    try:
-        # Get all laps
-        all_laps = session.laps
-        
-        if all_laps is None or len(all_laps) == 0:
-            logger.warning(f"No lap data available for {session.event}")
-            return jsonify({"error": "No lap data available"}), 404
-        
-        # Group laps by driver
-        drivers_laps = {}
-        
-        for idx, lap in all_laps.iterrows():
-            try:
-                driver_code = lap.get('Driver', 'UNK')
-                lap_time = lap.get('LapTime', None)
-                lap_number = lap.get('LapNumber', 0)
-                lap_compound = lap.get('Compound', 'Unknown')
-                tire_life = lap.get('TireLife', 0)
-                
-                # Skip invalid laps
-                if lap_time is None or pd.isna(lap_time) or lap_number is None or pd.isna(lap_number):
-                    continue
-                
-                # Format lap time as MM:SS.sss
-                if hasattr(lap_time, 'total_seconds'):
-                    total_seconds = lap_time.total_seconds()
-                    minutes = int(total_seconds // 60)
-                    seconds = total_seconds % 60
-                    lap_time_str = f"{minutes}:{seconds:.3f}"
-                else:
-                    lap_time_str = str(lap_time)
-                
-                # Add to driver's laps
-                if driver_code not in drivers_laps:
-                    drivers_laps[driver_code] = []
-                
-                # Map tire compound to known values
-                if lap_compound:
-                    compound_lower = str(lap_compound).lower()
-                    if 'soft' in compound_lower:
-                        compound = 'Soft'
-                    elif 'medium' in compound_lower:
-                        compound = 'Medium'
-                    elif 'hard' in compound_lower:
-                        compound = 'Hard'
-                    elif 'inter' in compound_lower:
-                        compound = 'Intermediate'
-                    elif 'wet' in compound_lower:
-                        compound = 'Wet'
-                    else:
-                        compound = 'Unknown'
-                else:
-                    compound = 'Unknown'
-                
-                drivers_laps[driver_code].append({
-                    "lap": int(lap_number),
-                    "time": lap_time_str,
-                    "compound": compound,
-                    "tireAge": int(tire_life) if tire_life is not None and not pd.isna(tire_life) else 0
-                })
-            except Exception as e:
-                # Skip problematic laps
-                logger.warning(f"Error processing lap: {str(e)}")
-                continue
         
-        # Sort each driver's laps by lap number
-        for driver, laps in drivers_laps.items():
-            drivers_laps[driver] = sorted(laps, key=lambda x: x['lap'])
+        try:
+            load_session(session, laps=False, telemetry=False, weather=False)
+        except Exception:
+            # Held but not loadable, which may change, so the miss expires even for past seasons
+            remember_missing(key, season, permanent=False)
+            continue
         
-        # Build the response
-        response = {
-            "lapsData": drivers_laps
+        # If we get here, the session exists
+        session_info = {
+            'name': session_type,
+            'api_name': session_type.lower().replace(' ', '_')  # For API endpoints
         }
-        
-        return jsonify(response)
+        available_sessions.append(session_info)
     
-    except Exception as e:
-        logger.error(f"Error processing lap data: {str(e)}")
-        logger.error(traceback.format_exc())
-        return jsonify({"error": str(e)}), 500
+    return available_sessions
 
 
 def process_race_data(session, season):
@@ -780,7 +1609,7 @@ def process_race_data(session, season):
                         else:
                             time_or_gap = f"+{time_delta}"
                 except Exception as e:
-                    logger.warning(f"Error formatting time gap: {str(e)}")
+                    logger.warning("Error formatting time gap", error=str(e))
                     time_or_gap = "Unknown"
                 status = 'Finished'
             
@@ -789,18 +1618,18 @@ def process_race_data(session, season):
             last_name = driver.get('LastName', '')
             
             # Build driver data
-            driver_data = {
-                "position": int(position),
-                "code": driver.get('Abbreviation', 'UNK'),
-                "name": f"{first_name} {last_name}".strip(),
-                "team": driver.get('TeamName', 'Unknown'),
-                "status": status,
-                "gap": time_or_gap
-            }
+            driver_data = session_models.ResultRecord(
+                position=int(position),
+                code=driver.get('Abbreviation', 'UNK'),
+                name=f"{first_name} {last_name}".strip(),
+                team=driver.get('TeamName', 'Unknown'),
+                status=status,
+                gap=time_or_gap
+            )
             drivers_data.append(driver_data)
         
         # Sort by position if needed
-        drivers_data.sort(key=lambda x: x['position'])
+        drivers_data.sort(key=lambda x: x.position)
         
         # Get fastest lap information
         fastest_lap_info = get_fastest_lap(session)
@@ -819,11 +1648,10 @@ def process_race_data(session, season):
             "results": drivers_data
         }
         
-        return jsonify(response)
+        return json_response(response)
     
     except Exception as e:
-        logger.error(f"Error processing race data: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.error("Error processing race data", error=str(e), exc_info=True)
         return jsonify({"error": str(e)}), 500
 
 def process_qualifying_data(session, season):
@@ -888,18 +1716,18 @@ def process_qualifying_data(session, season):
             last_name = driver.get('LastName', '')
             
             # Build driver data
-            driver_data = {
-                "position": int(position),
-                "code": driver.get('Abbreviation', 'UNK'),
-                "name": f"{first_name} {last_name}".strip(),
-                "team": driver.get('TeamName', 'Unknown'),
-                "status": status,
-                "gap": time_or_gap
-            }
+            driver_data = session_models.ResultRecord(
+                position=int(position),
+                code=driver.get('Abbreviation', 'UNK'),
+                name=f"{first_name} {last_name}".strip(),
+                team=driver.get('TeamName', 'Unknown'),
+                status=status,
+                gap=time_or_gap
+            )
             drivers_data.append(driver_data)
         
         # Sort by position if needed
-        drivers_data.sort(key=lambda x: x['position'])
+        drivers_data.sort(key=lambda x: x.position)
         
         # Get track information
         track_info = get_track_info(session)
@@ -926,11 +1754,10 @@ def process_qualifying_data(session, season):
             "results": drivers_data
         }
         
-        return jsonify(response)
+        return json_response(response)
     
     except Exception as e:
-        logger.error(f"Error processing qualifying data: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.error("Error processing qualifying data", error=str(e), exc_info=True)
         return jsonify({"error": str(e)}), 500
 
 def process_practice_data(session, season):
@@ -1000,14 +1827,14 @@ def process_practice_data(session, season):
                     gap = 'Unknown'
             
             # Build driver data
-            driver_data = {
-                "position": position,
-                "code": driver,
-                "name": driver_info.get(driver, {}).get('name', driver),
-                "team": driver_info.get(driver, {}).get('team', 'Unknown'),
-                "status": "Finished",
-                "gap": gap
-            }
+            driver_data = session_models.ResultRecord(
+                position=position,
+                code=driver,
+                name=driver_info.get(driver, {}).get('name', driver),
+                team=driver_info.get(driver, {}).get('team', 'Unknown'),
+                status="Finished",
+                gap=gap
+            )
             results_list.append(driver_data)
             position += 1
         
@@ -1015,7 +1842,7 @@ def process_practice_data(session, season):
         track_info = get_track_info(session)
         
         # Get fastest lap info
-        fastest_driver = results_list[0]['code'] if results_list else 'UNK'
+        fastest_driver = results_list[0].code if results_list else 'UNK'
         fastest_data = driver_fastest_laps.get(fastest_driver, {})
         
         fastest_lap_info = {
@@ -1037,16 +1864,15 @@ def process_practice_data(session, season):
             "results": results_list
         }
         
-        return jsonify(response)
+        return json_response(response)
     
     except Exception as e:
-        logger.error(f"Error processing practice data: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.error("Error processing practice data", error=str(e), exc_info=True)
         return jsonify({"error": str(e)}), 500
 
 def get_fastest_lap(session):
     """Extract fastest lap information from session"""
-    logger.info("Attempting to get fastest lap information...")
+    logger.debug("Attempting to get fastest lap information")
     
     try:
         # First approach: use pick_fastest()
@@ -1055,13 +1881,9 @@ def get_fastest_lap(session):
             if all_laps is None or len(all_laps) == 0:
                 logger.warning("No lap data available in session")
                 return None
-                
-            # Log the columns available in the laps DataFrame
-            logger.debug(f"Columns in laps DataFrame: {all_laps.columns.tolist()}")
             
             # Get the fastest lap by sorting directly
             fastest_lap = all_laps.sort_values(by='LapTime').iloc[0]
-            logger.debug(f"Found fastest lap: {fastest_lap}")
             
             # Extract driver code
             driver_code = str(fastest_lap['Driver']) if 'Driver' in fastest_lap else "UNK"
@@ -1093,11 +1915,11 @@ def get_fastest_lap(session):
                 "tireAge": tire_age
             }
             
-            logger.info(f"Successfully extracted fastest lap info: {fastest_lap_info}")
+            logger.debug("Found fastest lap", **fastest_lap_info)
             return fastest_lap_info
             
         except Exception as e:
-            logger.warning(f"Error getting fastest lap via first approach: {str(e)}")
+            logger.warning("Error getting fastest lap via first approach", error=str(e))
             
             # Fall back to alternative approach
             if hasattr(session, 'results') and session.results is not None:
@@ -1131,13 +1953,13 @@ def get_fastest_lap(session):
                                 "tireAge": 0
                             }
                             
-                            logger.info(f"Extracted fastest lap info using alternative method: {fastest_lap_info}")
+                            logger.debug("Found fastest lap in results", **fastest_lap_info)
                             return fastest_lap_info
                     except Exception as inner_e:
-                        logger.warning(f"Error getting fastest lap via alternative approach: {str(inner_e)}")
+                        logger.warning("Error getting fastest lap via alternative approach", error=str(inner_e))
 
     except Exception as e:
-        logger.warning(f"Error getting fastest lap info: {str(e)}")
+        logger.warning("Error getting fastest lap info", error=str(e))
     
     # Fallback when no data available or errors encountered
     logger.info("Using fallback fastest lap data")
@@ -1185,7 +2007,7 @@ def get_track_info(session):
         
         return track_info
     except Exception as e:
-        logger.warning(f"Error getting track info: {str(e)}")
+        logger.warning("Error getting track info", error=str(e))
         # Return default track info
         return {
             "name": "Unknown Circuit",
@@ -1267,27 +2089,21 @@ def get_full_throttle_percentage(session):
             return 60  # Default for unknown tracks
             
     except Exception as e:
-        logger.warning(f"Error calculating full throttle percentage: {str(e)}")
+        logger.warning("Error calculating full throttle percentage", error=str(e))
         return 60  # Default value
 
 def get_speed_trap(session):
     """Calculate speed trap from session data"""
     try:
-        # Try to get speed data from car telemetry
-        speed_data = session.car_data
-        
-        if speed_data is not None and len(speed_data) > 0:
-            # Find max speed across all drivers
-            max_speed = 0
-            for driver in speed_data.keys():
-                driver_data = speed_data[driver]
-                if 'Speed' in driver_data.columns:
-                    driver_max = driver_data['Speed'].max()
-                    if driver_max > max_speed:
-                        max_speed = driver_max
-            
+        # Max speed from the session's telemetry store, if a telemetry request already built it;
+        # building it here would load the full telemetry inside a results request
+        try:
+            store = get_telemetry_store(session.event.year, session.event['EventName'], session.name, build=False)
+            max_speed = telemetry_store.max_speed(store) if store is not None else 0
             if max_speed > 0:
                 return int(max_speed)
+        except Exception as e:
+            logger.warning("Telemetry not available for speed trap", error=str(e))
         
         # If telemetry not available, use track-specific estimates
         track_name = session.event.get('EventName', '').lower()
@@ -1307,7 +2123,7 @@ def get_speed_trap(session):
             # Default value
             return 325
     except Exception as e:
-        logger.warning(f"Error calculating speed trap: {str(e)}")
+        logger.warning("Error calculating speed trap", error=str(e))
         return 325  # Default value
 
 def get_race_sponsor(session):
@@ -1357,249 +2173,61 @@ def get_race_sponsor(session):
             return "Formula 1"
         
     except Exception as e:
-        logger.warning(f"Error determining race sponsor: {str(e)}")
+        logger.warning("Error determining race sponsor", error=str(e))
         return "Formula 1"  # Default sponsor
 
 
-def generate_session_results(season, race_id, session_type):
-    """Generate realistic race results for a given session and season"""
-    # Get drivers for the season
-    drivers = get_drivers_for_season(season)
-    
-    # Create a unique but consistent random seed for this race to ensure consistency
-    random.seed(f"{season}_{race_id}_{session_type}")
-    
-    # Group drivers by team
-    teams = {}
-    for code, info in drivers.items():
-        team = info['team']
-        if team not in teams:
-            teams[team] = []
-        teams[team].append((code, info))
-    
-    # Team performance tiers for the season
-    team_tiers = get_team_tiers_for_season(season)
-    
-    # Organize teams by performance tier
-    tier_teams = {}
-    for tier in range(1, 4):  # Tiers 1-3
-        tier_teams[tier] = []
-    
-    for team, members in teams.items():
-        tier = team_tiers.get(team, 3)  # Default to tier 3
-        tier_teams[tier].append((team, members))
-    
-    # Create results array
-    results = []
-    position = 1
-    
-    # For race sessions, have a % chance of DNF
-    dnf_percentage = 10 if session_type == 'race' else 0
-    
-    # Race-specific performance factors
-    race_factor = {}
-    for team in teams.keys():
-        # Random factor for this race (-0.5 to 0.5)
-        race_factor[team] = random.uniform(-0.5, 0.5)
-    
-    # Process teams by tier (best teams first)
-    for tier in range(1, 4):
-        # Shuffle teams within tier for some variability
-        random.shuffle(tier_teams[tier])
-        
-        for team, members in tier_teams[tier]:
-            # Sort team members (sometimes first driver does better)
-            if random.random() < 0.7:  # 70% chance first driver does better
-                members = sorted(members, key=lambda x: x[0])
-            else:
-                random.shuffle(members)
-            
-            for code, info in members:
-                # Determine status
-                if session_type == 'race' and random.random() * 100 < dnf_percentage:
-                    status = random.choice(["DNF", "Mechanical", "Collision", "Accident"])
-                else:
-                    status = "Finished"
-                
-                # Calculate gap
-                if position == 1:
-                    gap = "-"
-                elif status != "Finished":
-                    gap = status
-                else:
-                    # Calculate based on position
-                    if session_type == 'race':
-                        # Races have larger gaps
-                        base_gap = position * 2.5  # 2.5 seconds per position
-                        variation = random.uniform(-1.0, 1.0)  # Some random variation
-                        gap_seconds = base_gap + variation
-                        gap = f"+{gap_seconds:.3f}"
-                    else:
-                        # Qualifying has smaller gaps
-                        base_gap = position * 0.15  # 0.15 seconds per position
-                        variation = random.uniform(-0.05, 0.05)  # Less variation in quali
-                        gap_seconds = base_gap + variation
-                        gap = f"+{gap_seconds:.3f}"
-                
-                # Add driver to results
-                results.append({
-                    "position": position,
-                    "code": code,
-                    "name": info['name'],
-                    "team": info['team'],
-                    "status": status,
-                    "gap": gap
-                })
-                
-                position += 1
-    
-    return results
-
-# Create a function to generate lap data for the lap chart
-def generate_lap_data_for_session(season, race_id, session_type):
-    """Generate realistic lap data for the lap chart"""
-    # Get drivers for the season
-    drivers = get_drivers_for_season(season)
-    
-    # Create consistent seed
-    random.seed(f"{season}_{race_id}_{session_type}_laps")
-    
-    # Lap data container
-    laps_data = {}
-    driver_info = {}
-    
-    # Determine track characteristics based on race_id
-    if 'monaco' in race_id.lower():
-        base_time = 72.0  # ~1:12.000
-        max_laps = 78
-        lap_time_variance = 0.8  # Higher variance on street circuits
-    elif 'monza' in race_id.lower():
-        base_time = 80.0  # ~1:20.000
-        max_laps = 53
-        lap_time_variance = 0.5  # Lower variance on flowing circuits
-    elif 'spa' in race_id.lower():
-        base_time = 106.0  # ~1:46.000
-        max_laps = 44
-        lap_time_variance = 0.6
-    else:
-        base_time = 90.0  # ~1:30.000 default
-        max_laps = 60
-        lap_time_variance = 0.6
-    
-    # Adjust based on session type
-    if session_type == 'race':
-        lap_count = max_laps
-    elif session_type == 'sprint':
-        lap_count = max_laps // 3
-    elif session_type == 'qualifying':
-        lap_count = 15  # Fewer laps in qualifying
-    else:  # Practice sessions
-        lap_count = 25
-    
-    # Team performance tiers
-    team_tiers = get_team_tiers_for_season(season)
-    
-    # Process each driver
-    for code, driver_data in drivers.items():
-        team = driver_data['team']
-        
-        # Add to driver info
-        driver_info[code] = {
-            "name": driver_data['name'],
-            "team": team
-        }
-        
-        # Calculate team baseline performance
-        team_performance = team_tiers.get(team, 3)  # Default tier 3
-        team_factor = (team_performance - 1) * 0.7  # Tier 1 teams are fastest
-        
-        # Driver-specific factor (some variance between drivers)
-        driver_factor = random.uniform(-0.3, 0.3)
-        
-        # Create lap data for this driver
-        driver_laps = []
-        
-        # Determine compounds and stint strategy
-        compounds = ['Soft', 'Medium', 'Hard']
-        
-        # For race sessions, create realistic stint patterns
-        if session_type == 'race':
-            # 1 or 2 stop strategy typically
-            stop_count = random.randint(1, 2)
-            stop_laps = sorted([random.randint(lap_count//3, 2*lap_count//3) for _ in range(stop_count)])
-            
-            # Create stints
-            stints = []
-            last_stop = 0
-            for stop in stop_laps:
-                stints.append((last_stop + 1, stop, random.choice(compounds)))
-                last_stop = stop
-            stints.append((last_stop + 1, lap_count, random.choice(compounds)))
-        else:
-            # For non-race sessions, just use random compounds
-            stints = [(1, lap_count, random.choice(compounds))]
-        
-        # Generate laps
-        current_compound = stints[0][2]
-        tire_age = 0
-        
-        for lap_num in range(1, lap_count + 1):
-            # Check if we need to change stint
-            for stint_start, stint_end, stint_compound in stints:
-                if stint_start <= lap_num <= stint_end:
-                    if lap_num == stint_start:
-                        # New stint
-                        current_compound = stint_compound
-                        tire_age = 0
-                    break
-            
-            # Factors affecting lap time
-            # Fuel effect (for races - getting faster as fuel burns)
-            if session_type == 'race':
-                fuel_factor = max(0, 1.5 * (1 - lap_num / lap_count))
-            else:
-                fuel_factor = 0
-            
-            # Tire degradation
-            tire_factor = min(0.02 * tire_age, 1.2)
-            
-            # Track evolution (gets faster)
-            track_factor = max(0, 0.5 * (1 - lap_num / lap_count))
-            
-            # Random variation
-            random_factor = random.uniform(-lap_time_variance, lap_time_variance)
-            
-            # Calculate lap time
-            lap_time = base_time + team_factor + driver_factor + fuel_factor + tire_factor + track_factor + random_factor
-            
-            # Format lap time
-            minutes = int(lap_time // 60)
-            seconds = lap_time % 60
-            lap_time_str = f"{minutes}:{seconds:.3f}"
-            
-            # Add lap to driver's data
-            driver_laps.append({
-                "lap": lap_num,
-                "time": lap_time_str,
-                "compound": current_compound,
-                "tireAge": tire_age
-            })
-            
-            # Increment tire age
-            tire_age += 1
-        
-        # Add to laps data
-        laps_data[code] = driver_laps
-    
-    # Build response object
-    response = {
-        "lapsData": laps_data,
-        "driverInfo": driver_info
-    }
-    
-    return response
+# Metrics for Prometheus scrapes
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request phase timings, cache counters and load gauges in Prometheus text format"""
+    with _session_cache_lock:
+        request_metrics.gauge_set('session_cache_entries', len(_session_cache))
+        request_metrics.gauge_set('session_cache_bytes', sum(entry['bytes'] for entry in _session_cache.values()))
+        request_metrics.gauge_set('session_cache_budget_bytes', SESSION_CACHE_BUDGET)
+        request_metrics.labeled_gauge_set('session_bytes', {
+            (('season', key[0]), ('event', key[1]), ('session', key[2])): entry['bytes']
+            for key, entry in _session_cache.items()
+        })
+        for tier in session_refresher.TIERS:
+            request_metrics.gauge_set(f'session_cache_{tier}_entries',
+                                      sum(1 for entry in _session_cache.values() if entry['tier'] == tier))
+    with _missing_cache_lock:
+        request_metrics.gauge_set('missing_cache_entries', len(_missing_cache))
+    with _telemetry_store_lock:
+        request_metrics.gauge_set('telemetry_trace_cache_entries', len(_telemetry_trace_cache))
+    with _simulation_cache_lock:
+        request_metrics.gauge_set('simulation_cache_entries', len(_simulation_cache))
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Profiles kept by the opt-in request profiler
+def profiles_forbidden():
+    """Error response unless profiling is enabled and the client may read profiles, else None"""
+    if not request_profiler.enabled():
+        return jsonify({"error": "Profiling is disabled, set F1_PROFILE=sample or F1_PROFILE=cprofile"}), 404
+    if not request_profiler.authorized(request.remote_addr, request.headers.get('Authorization')):
+        return jsonify({"error": "Profiles need the F1_PROFILE_TOKEN bearer token or a loopback client"}), 403
+    return None
 
+@app.route('/admin/profiles', methods=['GET'])
+def list_request_profiles():
+    """Metadata of the kept request profiles, newest first"""
+    forbidden = profiles_forbidden()
+    if forbidden is not None:
+        return forbidden
+    return jsonify(request_profiler.list_profiles())
 
+@app.route('/admin/profiles/<string:filename>', methods=['GET'])
+def get_request_profile(filename):
+    """Download one profile file (.prof for pstats/snakeviz, .folded for flame graphs)"""
+    forbidden = profiles_forbidden()
+    if forbidden is not None:
+        return forbidden
+    location = request_profiler.profile_file(filename)
+    if location is None:
+        return jsonify({"error": f"Profile not found: {filename}"}), 404
+    directory, name = location
+    return send_from_directory(os.path.abspath(directory), name, as_attachment=True)
 
 # Add a test route to verify functionality
 @app.route('/api/test', methods=['GET'])
@@ -1607,17 +2235,11 @@ def test_api():
     """Simple test endpoint to verify API is working"""
     logger.info("Test API endpoint called")
     
-    # Check FastF1 package version
-    fastf1_version = "Unknown"
-    try:
-        fastf1_version = fastf1.__version__
-    except:
-        pass
-    
     return jsonify({
         "status": "ok",
         "message": "API is working correctly",
-        "fastf1_version": fastf1_version,
+        "data_source": data_source.name,
+        "fastf1_version": data_source.version(),
         "available_seasons": AVAILABLE_SEASONS
     })
 
@@ -0,0 +1,141 @@
+"""
+Compact records for lap and result payloads, encoded to JSON without intermediate dicts
+
+Laps stay in the struct-of-arrays lap table from lap_analysis.build_lap_table,
+and the stints of a session are derived from that table directly; results are
+ResultRecord objects with __slots__. encode_json() writes any of them, and
+plain values around them, as the same compact, key-sorted JSON that
+flask.jsonify produces; LapsPayload also encodes the lap table as binary.
+RawJSON splices JSON that was already encoded, such as a cached payload.
+"""
+import json
+
+import numpy as np
+from flask.json.provider import DefaultJSONProvider
+
+import lap_analysis
+import lap_binary
+
+
+def dumps(value):
+    """Plain value as compact, key-sorted JSON like flask.jsonify"""
+    return json.dumps(value, separators=(',', ':'), sort_keys=True, default=DefaultJSONProvider.default)
+
+
+class ResultRecord:
+    """One driver's classification in a race, qualifying or practice session"""
+
+    __slots__ = ('position', 'code', 'name', 'team', 'status', 'gap')
+
+    def __init__(self, position, code, name, team, status, gap):
+        self.position = position
+        self.code = code
+        self.name = name
+        self.team = team
+        self.status = status
+        self.gap = gap
+
+    def encode_json(self):
+        return (f'{{"code":{dumps(self.code)},"gap":{dumps(self.gap)},"name":{dumps(self.name)},'
+                f'"position":{dumps(self.position)},"status":{dumps(self.status)},"team":{dumps(self.team)}}}')
+
+
+def laps_json(table):
+    """The /laps payload {"lapsData": {driver: [lap, ...]}} of a lap table"""
+    compounds = [dumps(name) for name in lap_analysis.COMPOUNDS]
+    laps = table['lap'].tolist()
+    times = table['time'].tolist()
+    codes = table['compound'].tolist()
+    tire_ages = table['tire_age'].tolist()
+    offsets = table['offsets'].tolist()
+
+    drivers = []
+    for idx, driver in enumerate(table['drivers']):
+        rows = range(offsets[idx], offsets[idx + 1])
+        driver_laps = ','.join(
+            f'{{"compound":{compounds[codes[i]]},"lap":{laps[i]},"time":"{lap_analysis.format_lap_time(times[i])}",'
+            f'"tireAge":{max(tire_ages[i], 0)}}}'
+            for i in rows
+        )
+        drivers.append(f'{dumps(driver)}:[{driver_laps}]')
+
+    # Drivers are sorted in the lap table, as jsonify would sort them
+    return f'{{"lapsData":{{{",".join(drivers)}}}}}'
+
+
+def stints_json(table):
+    """The stints {driver: [{"compound", "laps", "startLap"}, ...]} of a lap table
+
+    A stint ends at a compound change or a gap in the lap numbers, as
+    server.extract_strategy_from_laps splits the /laps payload.
+    """
+    laps = table['lap'].astype(np.int64)
+    compounds = table['compound']
+    offsets = table['offsets']
+
+    # Rows that start a stint, each driver's first lap included
+    starts = np.ones(len(laps), dtype=bool)
+    starts[1:] = (compounds[1:] != compounds[:-1]) | (laps[1:] > laps[:-1] + 1)
+    starts[offsets[:-1][offsets[:-1] < len(laps)]] = True
+    start_rows = np.flatnonzero(starts)
+
+    # A stint runs to the next start or the end of its driver's rows
+    driver_ends = offsets[1:][table['driver'][start_rows]]
+    end_rows = np.minimum(np.append(start_rows[1:], len(laps)), driver_ends)
+
+    names = [dumps(name) for name in lap_analysis.COMPOUNDS]
+    stint_compounds = compounds[start_rows].tolist()
+    stint_laps = (end_rows - start_rows).tolist()
+    start_laps = laps[start_rows].tolist()
+    driver_starts = np.searchsorted(start_rows, offsets).tolist()
+
+    drivers = []
+    for idx, driver in enumerate(table['drivers']):
+        stints = ','.join(
+            f'{{"compound":{names[stint_compounds[i]]},"laps":{stint_laps[i]},"startLap":{start_laps[i]}}}'
+            for i in range(driver_starts[idx], driver_starts[idx + 1])
+        )
+        drivers.append(f'{dumps(driver)}:[{stints}]')
+    return f'{{{",".join(drivers)}}}'
+
+
+class RawJSON:
+    """JSON text encoded earlier, written as is"""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+    def encode_json(self):
+        return self.text
+
+
+class LapsPayload:
+    """The /laps payload of a lap table, in either encoding"""
+
+    __slots__ = ('table',)
+
+    def __init__(self, table):
+        self.table = table
+
+    def encode_json(self):
+        return laps_json(self.table)
+
+    def encode_binary(self):
+        return lap_binary.encode_lap_table(self.table)
+
+    def encode_stints_json(self):
+        return stints_json(self.table)
+
+
+def encode_json(value):
+    """JSON of a payload that may contain compact records, written directly rather than via dicts"""
+    if hasattr(value, 'encode_json'):
+        return value.encode_json()
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{dumps(str(key))}:{encode_json(value[key])}'
+                              for key in sorted(value, key=str)) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ','.join(encode_json(item) for item in value) + ']'
+    return dumps(value)
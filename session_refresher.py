@@ -0,0 +1,161 @@
+"""
+Background refresh of cached sessions, by how likely their data is to change
+
+Tiers:
+    live       - sessions of the current race weekend, reloaded every live
+                 interval whether or not a request asked for them
+    recent     - earlier events of the current season, reloaded once older
+                 than the recent TTL and requested again
+    historical - past seasons, immutable and never reloaded
+
+Request threads only ever read the cached snapshot and hand stale ones to
+request_refresh(); every reload happens on the refresher thread, and a
+failed reload keeps the last good snapshot.
+"""
+import threading
+import time
+from datetime import date, timedelta
+
+import structured_logging
+
+logger = structured_logging.get_logger(__name__)
+
+TIERS = ('live', 'recent', 'historical')
+
+LIVE_INTERVAL = 60.0  # seconds
+RECENT_TTL = 3600.0  # seconds
+SCHEDULE_TTL = 3600.0  # seconds, how often the current season's schedule is fetched again
+TICK = 15.0  # seconds between checks of the live weekend
+
+# Days around the event date that count as its race weekend
+WEEKEND_BEFORE = timedelta(days=3)
+WEEKEND_AFTER = timedelta(days=1)
+
+
+def session_tier(season, event_day, today=None):
+    """Tier of a session from its season and the date of its event, which may be unknown"""
+    today = today or date.today()
+    if season < today.year:
+        return 'historical'
+    if event_day is not None and event_day - WEEKEND_BEFORE <= today <= event_day + WEEKEND_AFTER:
+        return 'live'
+    return 'recent'
+
+
+def is_stale(tier, loaded_at, now=None):
+    """Whether a snapshot of the given tier loaded at loaded_at is due for a reload"""
+    if tier == 'historical':
+        return False
+    ttl = LIVE_INTERVAL if tier == 'live' else RECENT_TTL
+    return (now or time.time()) - loaded_at >= ttl
+
+
+class SessionRefresher:
+    """Keeps the current weekend's sessions loaded and reloads stale ones off the request threads
+
+    season_events(season) returns (event name, event date, session types) for
+    a season's events, loaded_at(key) when the cached snapshot of a (season,
+    event name, session type) key was loaded or None, and reload(key) loads
+    a key and replaces its snapshot. Only the current season is refreshed,
+    and only while it is one of the served seasons.
+    """
+
+    def __init__(self, season_events, loaded_at, reload, seasons):
+        self.season_events = season_events
+        self.loaded_at = loaded_at
+        self.reload = reload
+        self.seasons = seasons
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.pending = set()
+        self.thread = None
+
+        # Current season's events and when they were fetched
+        self.events = {}
+        self.events_fetched = 0.0
+
+    def current_season(self):
+        """This year's season, or None when it is not served"""
+        season = date.today().year
+        return season if season in self.seasons else None
+
+    def start(self):
+        """Start the refresher thread on first use, unless the current season is not served"""
+        if self.current_season() is None:
+            return
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='session-refresher', daemon=True)
+                self.thread.start()
+
+    def tier(self, season, event_name):
+        """Tier of a session, from the last fetched schedule without any I/O"""
+        event = self.events.get(event_name) if season == self.current_season() else None
+        return session_tier(season, event[0] if event else None)
+
+    def request_refresh(self, key):
+        """Queue a stale snapshot for a reload, returns at once"""
+        with self.lock:
+            if key in self.pending:
+                return
+            self.pending.add(key)
+        self.wake.set()
+
+    def live_sessions(self):
+        """Keys of the current weekend's sessions"""
+        season = self.current_season()
+        if season is None:
+            return []
+        return [
+            (season, event_name, session_type)
+            for event_name, (event_day, session_types) in self.events.items()
+            if session_tier(season, event_day) == 'live'
+            for session_type in session_types
+        ]
+
+    def refresh_schedule(self):
+        season = self.current_season()
+        if season is None or time.time() - self.events_fetched < SCHEDULE_TTL:
+            return
+        try:
+            self.events = {name: (day, types) for name, day, types in self.season_events(season)}
+        except Exception as e:
+            # Without a schedule nothing is live, the previous one is kept until the next try
+            logger.warning("Refresher could not fetch the schedule", season=season, error=str(e))
+        self.events_fetched = time.time()
+
+    def reload_key(self, key):
+        start_time = time.time()
+        try:
+            self.reload(key)
+        except Exception as e:
+            # Live sessions that have not started yet fail until they do
+            logger.debug("Session refresh failed, keeping the last snapshot", season=key[0], event=key[1],
+                         session=key[2], error=str(e))
+            return
+        logger.info("Session refreshed", season=key[0], event=key[1], session=key[2],
+                    seconds=round(time.time() - start_time, 2))
+
+    def run_once(self):
+        """One pass: reload due live sessions, then the queued stale ones"""
+        self.refresh_schedule()
+
+        for key in self.live_sessions():
+            loaded_at = self.loaded_at(key)
+            if loaded_at is None or is_stale('live', loaded_at):
+                self.reload_key(key)
+
+        with self.lock:
+            pending, self.pending = self.pending, set()
+        for key in pending:
+            self.reload_key(key)
+
+    def run(self):
+        while True:
+            # Cleared first, so refreshes requested during a pass start the next one at once
+            self.wake.clear()
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error("Error in session refresher", error=str(e))
+            self.wake.wait(TICK)
@@ -322,19 +322,26 @@ document.addEventListener('DOMContentLoaded', function() {
         console.log(`Loading ${session} data for ${season} ${race}...`);
         
         try {
-            // Set a timeout for the fetch operation
-            const controller = new AbortController();
-            const timeoutId = setTimeout(() => controller.abort(), 30000); // 30 second timeout
+            // Lap data goes to the lap chart in its binary encoding, start fetching it alongside the results
+            fetchSessionLaps(season, race, session).catch(() => {});
             
-            const response = await fetch(
-                `${API_BASE_URL}/season/${season}/race/${race}/${session}`,
-                { signal: controller.signal }
-            );
+            // One bundle request for the results and stints, shared with the strategy chart
+            let bundle = null;
+            let status = 200;
+            try {
+                bundle = await fetchSessionBundle(season, race, session, ['results', 'stints']);
+            } catch (error) {
+                if (!error.status) throw error;
+                status = error.status;
+                bundle = error.bundle;
+            }
             
-            // Clear the timeout
-            clearTimeout(timeoutId);
+            const resultsError = sessionBundlePartError(bundle, 'results');
+            if (resultsError) {
+                status = resultsError.status;
+            }
             
-            if (response.status === 404) {
+            if (status === 404) {
                 // No data available for this session
                 console.log(`No data available for ${season} ${race} ${session}`);
                 loadingIndicator.classList.remove('active');
@@ -348,22 +355,11 @@ document.addEventListener('DOMContentLoaded', function() {
                 return;
             }
             
-            if (!response.ok) {
-                throw new Error(`Failed to fetch ${session} data: ${response.status} ${response.statusText}`);
+            if (status !== 200) {
+                throw new Error(`Failed to fetch ${session} data: ${resultsError ? resultsError.message : status}`);
             }
             
-            // Read the response as text first
-            const responseText = await response.text();
-            
-            // Try to parse as JSON
-            let raceData;
-            try {
-                raceData = JSON.parse(responseText);
-            } catch (parseError) {
-                console.error('Error parsing race data JSON:', parseError);
-                console.log('Raw response:', responseText);
-                throw new Error('Invalid JSON response received for race data');
-            }
+            const raceData = bundle.results;
             
             console.log(`Loaded ${session} data for ${season} ${race}:`, raceData);
             
@@ -888,16 +884,9 @@ document.addEventListener('DOMContentLoaded', function() {
             errorElem.classList.remove('active');
         }
         
-        // Fetch event type to determine if this is a sprint weekend
+        // Fetch event type to determine if this is a sprint weekend,
+        // updateSessionTabs then loads the data for the first tab
         fetchEventType(currentSeason, currentRace)
-            .then(() => {
-                // After tabs are updated by fetchEventType, load data for the active tab
-                const activeTab = document.querySelector('.tab-btn.active');
-                if (activeTab) {
-                    currentSession = activeTab.getAttribute('data-tab');
-                    loadRaceData(currentSeason, currentRace, currentSession);
-                }
-            })
             .catch(error => {
                 console.error('Error fetching event type:', error);
                 
@@ -916,20 +905,14 @@ document.addEventListener('DOMContentLoaded', function() {
 
     async function fetchEventType(season, race) {
         try {
-            const controller = new AbortController();
-            const timeoutId = setTimeout(() => controller.abort(), 10000); // 10 second timeout
-            
-            const response = await fetch(`${API_BASE_URL}/season/${season}/race/${race}/event_type`, {
-                signal: controller.signal
-            });
-            
-            clearTimeout(timeoutId);
-            
-            if (!response.ok) {
-                throw new Error(`Failed to fetch event type: ${response.status} ${response.statusText}`);
+            // The race tab opens first, so its data comes in the same request as the event type
+            const bundle = await fetchSessionBundle(season, race, 'race', ['sessions', 'results', 'stints']);
+            const partError = sessionBundlePartError(bundle, 'sessions');
+            if (partError) {
+                throw new Error(`Failed to fetch event type: ${partError.status} ${partError.message}`);
             }
             
-            const eventType = await response.json();
+            const eventType = bundle.sessions;
             console.log(`Event type for ${season} ${race}:`, eventType);
             
             // Update the session tabs based on event type
@@ -0,0 +1,354 @@
+// Canvas rendering backend for LapChart
+//
+// Draws on three stacked canvases: grid and axes, driver lines and a hover
+// overlay. Scales are kept between redraws and every driver's line and markers
+// are built once as Path2D objects, so toggling a driver that does not change
+// the axes only fills and strokes the cached paths again. Paths hold only
+// their points, unlike a full-size offscreen canvas per driver. Tooltip
+// hit-testing goes through a uniform grid of the drawn points instead of
+// per-point DOM events.
+
+const CANVAS_HIT_CELL = 16;   // Spatial index cell size in CSS pixels
+const CANVAS_HIT_RADIUS = 8;  // Max distance in CSS pixels for a point hit
+const CANVAS_POINT_RADIUS = 3;
+
+class LapChartCanvasRenderer {
+    constructor(chart, host) {
+        this.chart = chart;
+        this.host = host;
+        this.series = {};
+        this.layers = new Map();   // driver -> { line, markers, xs, ys, index }
+        this.scale = null;
+        this.scaleKey = null;
+        this.width = 0;
+        this.height = 0;
+        this.dpr = window.devicePixelRatio || 1;
+        this.hoverLap = null;
+
+        this.host.classList.add('lap-chart-canvas-stack');
+        this.gridCanvas = this.createCanvas();
+        this.dataCanvas = this.createCanvas();
+        this.overlayCanvas = this.createCanvas();
+
+        this.overlayCanvas.addEventListener('mousemove', (e) => this.onMouseMove(e));
+        this.overlayCanvas.addEventListener('mouseleave', () => this.onMouseLeave());
+
+        // Redraw at the new size, the cached layers no longer fit
+        if (typeof ResizeObserver !== 'undefined') {
+            this.resizeObserver = new ResizeObserver(() => {
+                if (this.host.clientWidth !== this.width || this.host.clientHeight !== this.height) {
+                    this.chart.drawChart();
+                }
+            });
+            this.resizeObserver.observe(this.host);
+        }
+    }
+
+    static isSupported() {
+        const canvas = document.createElement('canvas');
+        return !!(canvas.getContext && canvas.getContext('2d')) && typeof Path2D !== 'undefined';
+    }
+
+    createCanvas() {
+        const canvas = document.createElement('canvas');
+        canvas.className = 'lap-chart-canvas';
+        this.host.appendChild(canvas);
+        return canvas;
+    }
+
+    // Lap data parsed by parseLapsData(), usually in the lap data worker
+    setData(parsed) {
+        this.series = parsed ? parsed.drivers : {};
+        this.layers.clear();
+        this.scaleKey = null;
+    }
+
+    resize() {
+        const width = this.host.clientWidth;
+        const height = this.host.clientHeight;
+        const dpr = window.devicePixelRatio || 1;
+        if (width === this.width && height === this.height && dpr === this.dpr) {
+            return false;
+        }
+
+        this.width = width;
+        this.height = height;
+        this.dpr = dpr;
+        [this.gridCanvas, this.dataCanvas, this.overlayCanvas].forEach(canvas => {
+            canvas.width = Math.round(width * dpr);
+            canvas.height = Math.round(height * dpr);
+            canvas.style.width = `${width}px`;
+            canvas.style.height = `${height}px`;
+        });
+        return true;
+    }
+
+    context(canvas) {
+        const ctx = canvas.getContext('2d');
+        ctx.setTransform(this.dpr, 0, 0, this.dpr, 0, 0);
+        return ctx;
+    }
+
+    // Axis domain of the selected drivers, from the per-driver extents
+    computeDomain(drivers) {
+        let minLap = Infinity, maxLap = -Infinity, minTime = Infinity, maxTime = -Infinity;
+        drivers.forEach(driver => {
+            const s = this.series[driver];
+            if (s.lapNumbers.length === 0) return;
+            minLap = Math.min(minLap, s.minLap);
+            maxLap = Math.max(maxLap, s.maxLap);
+            minTime = Math.min(minTime, s.minTime);
+            maxTime = Math.max(maxTime, s.maxTime);
+        });
+        if (minLap === Infinity) return null;
+        return { minLap, maxLap, minTime: minTime - 0.5, maxTime: maxTime + 0.5 };
+    }
+
+    makeScale(domain) {
+        const margin = this.chart.margin;
+        const chartWidth = this.width - margin.left - margin.right;
+        const chartHeight = this.height - margin.top - margin.bottom;
+        const lapSpan = (domain.maxLap - domain.minLap) || 1;
+        const timeSpan = (domain.maxTime - domain.minTime) || 1;
+
+        return {
+            ...domain,
+            chartWidth,
+            chartHeight,
+            x: lap => margin.left + chartWidth * (lap - domain.minLap) / lapSpan,
+            y: time => margin.top + chartHeight * (1 - (time - domain.minTime) / timeSpan),
+            lapAt: px => domain.minLap + (px - margin.left) / chartWidth * lapSpan
+        };
+    }
+
+    draw() {
+        const resized = this.resize();
+        const drivers = Array.from(this.chart.selectedDrivers).filter(driver => this.series[driver]);
+
+        if (resized) {
+            this.layers.clear();
+            this.scaleKey = null;
+        }
+
+        if (drivers.length === 0 || Object.keys(this.series).length === 0) {
+            this.drawMessage(this.chart.selectedDrivers.size === 0 ?
+                'Select drivers to display lap times' :
+                'No lap data available');
+            return;
+        }
+
+        const domain = this.computeDomain(drivers);
+        if (!domain) {
+            this.drawMessage('No valid lap data available');
+            return;
+        }
+
+        // Scales, grid and driver layers are only rebuilt when the axes change
+        const key = `${domain.minLap}|${domain.maxLap}|${domain.minTime}|${domain.maxTime}`;
+        if (key !== this.scaleKey) {
+            this.scaleKey = key;
+            this.scale = this.makeScale(domain);
+            this.layers.clear();
+            this.drawGrid();
+        }
+
+        this.chart.chartWidth = this.scale.chartWidth;
+        this.chart.chartHeight = this.scale.chartHeight;
+        this.chart.chartData = {
+            minLap: domain.minLap, maxLap: domain.maxLap,
+            minTime: domain.minTime, maxTime: domain.maxTime,
+            xScale: this.scale.x, yScale: this.scale.y
+        };
+
+        const ctx = this.context(this.dataCanvas);
+        ctx.clearRect(0, 0, this.width, this.height);
+        ctx.lineWidth = 2;
+        drivers.forEach(driver => {
+            const layer = this.driverLayer(driver);
+            ctx.strokeStyle = layer.color;
+            ctx.stroke(layer.line);
+            ctx.fillStyle = layer.color;
+            ctx.fill(layer.markers);
+            ctx.strokeStyle = '#1c1e24';
+            ctx.stroke(layer.markers);
+        });
+
+        this.drawHighlights(this.hoverLap);
+    }
+
+    drawMessage(message) {
+        this.scaleKey = null;
+        [this.gridCanvas, this.dataCanvas, this.overlayCanvas].forEach(canvas => {
+            canvas.getContext('2d').clearRect(0, 0, canvas.width, canvas.height);
+        });
+        const ctx = this.context(this.gridCanvas);
+        ctx.fillStyle = '#aaa';
+        ctx.font = '14px sans-serif';
+        ctx.textAlign = 'center';
+        ctx.fillText(message, this.width / 2, this.height / 2);
+    }
+
+    drawGrid() {
+        const s = this.scale;
+        const margin = this.chart.margin;
+        const ctx = this.context(this.gridCanvas);
+        ctx.clearRect(0, 0, this.width, this.height);
+
+        ctx.font = '12px sans-serif';
+        ctx.fillStyle = '#aaa';
+        ctx.lineWidth = 1;
+
+        // Same tick spacing as the SVG renderer
+        const lapRange = s.maxLap - s.minLap;
+        const lapStep = lapRange > 20 ? Math.ceil(lapRange / 10) : 5;
+        const timeRange = s.maxTime - s.minTime;
+        const timeInterval = timeRange <= 10 ? 2 : Math.ceil(timeRange / 6);
+        const bottom = margin.top + s.chartHeight;
+
+        ctx.strokeStyle = '#292c36';
+        ctx.setLineDash([2, 2]);
+        ctx.beginPath();
+        for (let lap = Math.ceil(s.minLap); lap <= Math.floor(s.maxLap); lap += lapStep) {
+            const x = Math.round(s.x(lap)) + 0.5;
+            ctx.moveTo(x, margin.top);
+            ctx.lineTo(x, bottom);
+        }
+        for (let time = Math.ceil(s.minTime); time <= Math.floor(s.maxTime); time += timeInterval) {
+            const y = Math.round(s.y(time)) + 0.5;
+            ctx.moveTo(margin.left, y);
+            ctx.lineTo(margin.left + s.chartWidth, y);
+        }
+        ctx.stroke();
+        ctx.setLineDash([]);
+
+        ctx.strokeStyle = '#444';
+        ctx.beginPath();
+        ctx.moveTo(margin.left + 0.5, margin.top);
+        ctx.lineTo(margin.left + 0.5, bottom + 0.5);
+        ctx.lineTo(margin.left + s.chartWidth, bottom + 0.5);
+        ctx.stroke();
+
+        ctx.textAlign = 'center';
+        for (let lap = Math.ceil(s.minLap); lap <= Math.floor(s.maxLap); lap += lapStep) {
+            ctx.fillText(String(lap), s.x(lap), bottom + 20);
+        }
+        ctx.textAlign = 'right';
+        for (let time = Math.ceil(s.minTime); time <= Math.floor(s.maxTime); time += timeInterval) {
+            ctx.fillText(this.chart.formatAxisTime(time), margin.left - 8, s.y(time) + 5);
+        }
+    }
+
+    // Paths and spatial index of one driver at the current scale, built once
+    driverLayer(driver) {
+        let layer = this.layers.get(driver);
+        if (layer) return layer;
+
+        const s = this.series[driver];
+        const color = this.chart.colors[driver] || '#ffffff';
+
+        const xs = new Float64Array(s.lapNumbers.length);
+        const ys = new Float64Array(s.lapNumbers.length);
+        for (let i = 0; i < xs.length; i++) {
+            xs[i] = this.scale.x(s.lapNumbers[i]);
+            ys[i] = this.scale.y(s.times[i]);
+        }
+
+        // Coordinates are in CSS pixels, the canvas transform scales them to the device
+        const line = new Path2D();
+        const markers = new Path2D();
+        for (let i = 0; i < xs.length; i++) {
+            if (i === 0) line.moveTo(xs[i], ys[i]);
+            else line.lineTo(xs[i], ys[i]);
+            // Each marker is its own closed subpath, so they fill and stroke as separate circles
+            markers.moveTo(xs[i] + CANVAS_POINT_RADIUS, ys[i]);
+            markers.arc(xs[i], ys[i], CANVAS_POINT_RADIUS, 0, Math.PI * 2);
+        }
+
+        // Uniform grid: cell key -> indices of the points inside it
+        const index = new Map();
+        for (let i = 0; i < xs.length; i++) {
+            const key = `${Math.floor(xs[i] / CANVAS_HIT_CELL)},${Math.floor(ys[i] / CANVAS_HIT_CELL)}`;
+            if (!index.has(key)) index.set(key, []);
+            index.get(key).push(i);
+        }
+
+        layer = { line, markers, color, xs, ys, index };
+        this.layers.set(driver, layer);
+        return layer;
+    }
+
+    // Nearest drawn point of a selected driver within the hit radius, or null
+    hitTest(px, py) {
+        const cx = Math.floor(px / CANVAS_HIT_CELL);
+        const cy = Math.floor(py / CANVAS_HIT_CELL);
+        let best = null;
+        let bestDistance = CANVAS_HIT_RADIUS * CANVAS_HIT_RADIUS;
+
+        this.chart.selectedDrivers.forEach(driver => {
+            const layer = this.layers.get(driver);
+            if (!layer) return;
+            for (let dx = -1; dx <= 1; dx++) {
+                for (let dy = -1; dy <= 1; dy++) {
+                    const cell = layer.index.get(`${cx + dx},${cy + dy}`);
+                    if (!cell) continue;
+                    cell.forEach(i => {
+                        const distance = (layer.xs[i] - px) ** 2 + (layer.ys[i] - py) ** 2;
+                        if (distance <= bestDistance) {
+                            bestDistance = distance;
+                            best = { driver, lap: this.series[driver].lapNumbers[i] };
+                        }
+                    });
+                }
+            }
+        });
+        return best;
+    }
+
+    onMouseMove(event) {
+        if (!this.scale) return;
+        const rect = this.overlayCanvas.getBoundingClientRect();
+        const px = event.clientX - rect.left;
+        const py = event.clientY - rect.top;
+        const margin = this.chart.margin;
+
+        if (px < margin.left || px > margin.left + this.scale.chartWidth ||
+            py < margin.top || py > margin.top + this.scale.chartHeight) {
+            this.onMouseLeave();
+            return;
+        }
+
+        // A point under the cursor wins, otherwise the lap column it is in
+        const hit = this.hitTest(px, py);
+        const lap = hit ? hit.lap : Math.round(this.scale.lapAt(px));
+        if (lap !== this.hoverLap) {
+            this.chart.showLapTooltip(event, lap);
+        }
+    }
+
+    onMouseLeave() {
+        this.chart.hideTooltip();
+        this.chart.unhighlightLapPoints();
+    }
+
+    drawHighlights(lapNumber) {
+        this.hoverLap = lapNumber;
+        const ctx = this.context(this.overlayCanvas);
+        ctx.clearRect(0, 0, this.width, this.height);
+        if (lapNumber === null || !this.scale) return;
+
+        ctx.lineWidth = 3;
+        ctx.strokeStyle = 'white';
+        this.chart.selectedDrivers.forEach(driver => {
+            const s = this.series[driver];
+            if (!s) return;
+            for (let i = 0; i < s.lapNumbers.length; i++) {
+                if (s.lapNumbers[i] !== lapNumber) continue;
+                ctx.fillStyle = this.chart.colors[driver] || '#ffffff';
+                ctx.beginPath();
+                ctx.arc(this.scale.x(s.lapNumbers[i]), this.scale.y(s.times[i]), 6, 0, Math.PI * 2);
+                ctx.fill();
+                ctx.stroke();
+            }
+        });
+    }
+}
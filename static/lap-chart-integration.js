@@ -212,40 +212,34 @@ function loadLapData(season, race, sessionType) {
         
         console.log(`Fetching lap data for ${season} ${race} ${sessionType}`);
         
-        // Fetch lap data from API with timeout
-        const controller = new AbortController();
-        const timeoutId = setTimeout(() => controller.abort(), 30000); // 30 second timeout
-        
-        fetch(`/api/season/${season}/race/${race}/${sessionType}/laps`, {
-            signal: controller.signal
-        })
-            .then(response => {
-                clearTimeout(timeoutId);
+        // Binary lap data, usually already requested by the race page
+        fetchSessionLaps(season, race, sessionType)
+            .then(data => {
+                if (typeof LapChart === 'undefined') {
+                    throw new Error('LapChart class or instance not found!');
+                }
+                if (!window.lapChart) {
+                    // If chart instance doesn't exist, create one
+                    console.log('Creating new chart instance');
+                    window.lapChart = new LapChart('lap-chart-container');
+                }
                 
-                if (!response.ok) {
-                    if (response.status === 404) {
-                        throw new Error('No lap data available for this session');
-                    }
-                    throw new Error(`HTTP error! Status: ${response.status}`);
+                if (data instanceof ArrayBuffer) {
+                    // Binary or JSON bytes are decoded in the lap data worker, the main thread only draws
+                    const chart = window.lapChart;
+                    return parseLapsPayloadAsync(data, { useWorker: chart.options.useWorker !== false })
+                        .then(parsed => {
+                            if (Object.keys(parsed.drivers).length === 0) {
+                                throw new Error('No lap data available or empty response');
+                            }
+                            console.log('Lap data received:', Object.keys(parsed.drivers).length, 'drivers');
+                            chart.setParsedLaps(parsed);
+                        });
                 }
-                return response.json();
-            })
-            .then(data => {
+                // JSON payloads kept by the session cache before laps were stored as bytes
                 if (data && data.lapsData && Object.keys(data.lapsData).length > 0) {
                     console.log('Lap data received:', Object.keys(data.lapsData).length, 'drivers');
-                    
-                    // Load the data into the chart
-                    if (window.lapChart && typeof window.lapChart.setLapsData === 'function') {
-                        window.lapChart.setLapsData(data.lapsData);
-                    } else if (typeof LapChart !== 'undefined') {
-                        // If chart instance doesn't exist, create one
-                        console.log('Creating new chart instance');
-                        window.lapChart = new LapChart('lap-chart-container');
-                        window.lapChart.setLapsData(data.lapsData);
-                    } else {
-                        console.error('LapChart class or instance not found!');
-                        useTestDataFallback(container);
-                    }
+                    window.lapChart.setLapsData(data.lapsData);
                 } else {
                     throw new Error('No lap data available or empty response');
                 }
@@ -3,7 +3,8 @@
 let chartInstance = null; // Global reference to chart instance
 
 class LapChart {
-    constructor(containerId) {
+    // options.renderer: 'canvas' or 'svg', defaults to canvas where supported
+    constructor(containerId, options = {}) {
         // Store global reference
         chartInstance = this;
         
@@ -19,6 +20,11 @@ class LapChart {
         this.chartHeight = 0;
         this.margin = { top: 30, right: 30, bottom: 80, left: 60 };
         this.hoverLap = null;
+        this.options = options;
+        this.parsing = false;
+        this.parsedLaps = null;
+        this.rendererType = this.chooseRenderer(options.renderer);
+        this.renderer = null;
         this.colors = {
             'VER': '#0600EF', // Red Bull
             'PER': '#0600EF', // Red Bull
@@ -68,6 +74,27 @@ class LapChart {
         }
     }
     
+    chooseRenderer(requested) {
+        // ?chartRenderer=svg or localStorage.lapChartRenderer switch backends for comparison
+        const params = new URLSearchParams(window.location.search);
+        let choice = requested || params.get('chartRenderer');
+        if (!choice) {
+            try {
+                choice = localStorage.getItem('lapChartRenderer');
+            } catch (e) {
+                choice = null;
+            }
+        }
+
+        if (choice === 'svg') return 'svg';
+        // The canvas renderer draws the typed arrays made by parseLapsData()
+        if (typeof LapChartCanvasRenderer !== 'undefined' && typeof parseLapsDataAsync === 'function' &&
+            LapChartCanvasRenderer.isSupported()) {
+            return 'canvas';
+        }
+        return 'svg';
+    }
+    
     initChart() {
         console.log('Initializing lap chart...');
         
@@ -92,7 +119,9 @@ class LapChart {
                 </div>
                 <div class="lap-chart-content">
                     <div id="lap-chart-tooltip" class="lap-chart-tooltip"></div>
-                    <svg id="lap-chart-svg"></svg>
+                    ${this.rendererType === 'canvas' ?
+                        '<div class="lap-chart-canvas-host"></div>' :
+                        '<svg id="lap-chart-svg"></svg>'}
                 </div>
                 <div class="lap-chart-drivers" id="lap-chart-drivers">
                     <!-- Driver buttons will be added here -->
@@ -103,14 +132,18 @@ class LapChart {
         // Add styles
         this.addStyles();
         
-        // Get elements
-        this.svg = document.getElementById('lap-chart-svg');
-        this.tooltip = document.getElementById('lap-chart-tooltip');
-        this.driversContainer = document.getElementById('lap-chart-drivers');
-        this.zoomOutBtn = document.getElementById('zoom-out-btn');
-        this.resetBtn = document.getElementById('reset-btn');
+        // Get elements, looked up inside the container so several charts can share a page
+        this.svg = this.container.querySelector('#lap-chart-svg');
+        this.tooltip = this.container.querySelector('#lap-chart-tooltip');
+        this.driversContainer = this.container.querySelector('#lap-chart-drivers');
+        this.zoomOutBtn = this.container.querySelector('#zoom-out-btn');
+        this.resetBtn = this.container.querySelector('#reset-btn');
+        
+        if (this.rendererType === 'canvas') {
+            this.renderer = new LapChartCanvasRenderer(this, this.container.querySelector('.lap-chart-canvas-host'));
+        }
         
-        if (!this.svg || !this.tooltip || !this.driversContainer) {
+        if (!(this.svg || this.renderer) || !this.tooltip || !this.driversContainer) {
             console.error('Failed to get all required chart elements!');
             console.log('SVG:', this.svg);
             console.log('Tooltip:', this.tooltip);
@@ -199,6 +232,19 @@ class LapChart {
                 display: block !important;
             }
             
+            .lap-chart-canvas-host {
+                position: relative;
+                width: 100%;
+                height: 100%;
+                background-color: #1c1e24;
+            }
+            
+            .lap-chart-canvas {
+                position: absolute;
+                top: 0;
+                left: 0;
+            }
+            
             .lap-chart-tooltip {
                 position: fixed; /* Changed from absolute to fixed for better positioning */
                 display: none;
@@ -340,8 +386,51 @@ class LapChart {
     setLapsData(data) {
         console.log('Setting lap data:', Object.keys(data));
         this.lapsData = data;
+        this.parsedLaps = null;
         this.drawDriverButtons();
         
+        if (typeof parseLapsDataAsync !== 'function') {
+            this.selectFastestDrivers();
+            this.drawChart();
+            return Promise.resolve();
+        }
+        
+        // Lap times are parsed in the lap data worker, the main thread only draws the result
+        this.parsing = true;
+        return parseLapsDataAsync(data, { useWorker: this.options.useWorker !== false })
+            .then(parsed => {
+                // Newer data arrived while this was parsing
+                if (this.lapsData !== data) return;
+                this.parsedLaps = parsed;
+                if (this.renderer) {
+                    this.renderer.setData(parsed);
+                }
+            })
+            .catch(error => console.error('Error parsing lap data:', error))
+            .finally(() => {
+                if (this.lapsData !== data) return;
+                this.parsing = false;
+                this.selectFastestDrivers();
+                this.drawChart();
+            });
+    }
+    
+    // Lap data already in parsed form, as decodeLapsBinary() returns it
+    setParsedLaps(parsed) {
+        console.log('Setting parsed lap data:', Object.keys(parsed.drivers));
+        // The canvas renderer draws the typed arrays directly, the SVG renderer needs lap objects
+        this.lapsData = this.renderer ? parsed.drivers : lapsDataFromParsed(parsed);
+        this.parsedLaps = parsed;
+        this.parsing = false;
+        if (this.renderer) {
+            this.renderer.setData(parsed);
+        }
+        this.drawDriverButtons();
+        this.selectFastestDrivers();
+        this.drawChart();
+    }
+    
+    selectFastestDrivers() {
         // Always find and select the top 3 fastest drivers
         try {
             const fastestDrivers = this.findTopFastestDrivers(3);
@@ -392,12 +481,14 @@ class LapChart {
             const firstDrivers = Object.keys(this.lapsData).slice(0, 3);
             firstDrivers.forEach(driver => this.selectedDrivers.add(driver));
         }
-        
-        // Draw the chart with the selected drivers
-        this.drawChart();
     }
     
     findTopFastestDrivers(count) {
+        // Ranked by the lap data worker when the data has been parsed there
+        if (this.parsedLaps) {
+            return this.parsedLaps.ranking.slice(0, count);
+        }
+        
         // Create an array to hold driver best lap times
         const driverBestLaps = [];
         
@@ -466,17 +557,9 @@ class LapChart {
         this.drawChart();
     }
     
-    drawChart() {
-        // Clear the SVG
-        if (!this.svg) {
-            console.error('SVG element not found!');
-            return;
-        }
-        
-        this.svg.innerHTML = '';
-        
+    ensureDefaultSelection() {
         // FAILSAFE: If no drivers are selected, try to select top 3
-        if (this.selectedDrivers.size === 0 && Object.keys(this.lapsData).length > 0) {
+        if (!this.parsing && this.selectedDrivers.size === 0 && Object.keys(this.lapsData).length > 0) {
             try {
                 const fastestDrivers = this.findTopFastestDrivers(3);
                 fastestDrivers.forEach(driver => this.selectedDrivers.add(driver));
@@ -498,6 +581,24 @@ class LapChart {
                 console.error('Error in failsafe driver selection:', e);
             }
         }
+    }
+    
+    drawChart() {
+        this.ensureDefaultSelection();
+        
+        // The canvas backend keeps its scales and driver layers between draws
+        if (this.renderer) {
+            this.renderer.draw();
+            return;
+        }
+        
+        // Clear the SVG
+        if (!this.svg) {
+            console.error('SVG element not found!');
+            return;
+        }
+        
+        this.svg.innerHTML = '';
         
         // Get SVG dimensions from its computed size (important for responsive display)
         const svgRect = this.svg.getBoundingClientRect();
@@ -806,6 +907,23 @@ class LapChart {
         });
     }
     
+    // { time, compound, tireAge } of a driver's lap, from the parsed arrays when available
+    findLap(driver, lapNumber) {
+        const series = this.parsedLaps && this.parsedLaps.drivers[driver];
+        if (series) {
+            const index = series.lapNumbers.indexOf(lapNumber);
+            if (index === -1) return null;
+            return {
+                time: formatLapTime(series.times[index]),
+                compound: this.parsedLaps.compounds[series.compounds[index]],
+                tireAge: series.tireAges[index]
+            };
+        }
+        
+        const driverLaps = this.lapsData[driver];
+        return Array.isArray(driverLaps) ? driverLaps.find(lap => lap.lap === lapNumber) || null : null;
+    }
+    
     showLapTooltip(event, lapNumber) {
         // Clear any previous highlight
         this.unhighlightLapPoints();
@@ -820,19 +938,15 @@ class LapChart {
         const lapData = [];
         
         this.selectedDrivers.forEach(driver => {
-            if (this.lapsData[driver]) {
-                const driverLaps = this.lapsData[driver];
-                const lapInfo = driverLaps.find(lap => lap.lap === lapNumber);
-                
-                if (lapInfo) {
-                    lapData.push({
-                        driver,
-                        color: this.colors[driver] || '#ffffff',
-                        time: lapInfo.time,
-                        compound: lapInfo.compound || 'Unknown',
-                        tireAge: lapInfo.tireAge || 0
-                    });
-                }
+            const lapInfo = this.findLap(driver, lapNumber);
+            if (lapInfo) {
+                lapData.push({
+                    driver,
+                    color: this.colors[driver] || '#ffffff',
+                    time: lapInfo.time,
+                    compound: lapInfo.compound || 'Unknown',
+                    tireAge: lapInfo.tireAge || 0
+                });
             }
         });
         
@@ -901,6 +1015,11 @@ class LapChart {
     }
     
     highlightLapPoints(lapNumber) {
+        if (this.renderer) {
+            this.renderer.drawHighlights(lapNumber);
+            return;
+        }
+        
         // Get all points for this lap
         const points = this.svg.querySelectorAll(`.lap-point[data-lap="${lapNumber}"]`);
         
@@ -912,6 +1031,12 @@ class LapChart {
     
     unhighlightLapPoints() {
         if (this.hoverLap !== null) {
+            if (this.renderer) {
+                this.renderer.drawHighlights(null);
+                this.hoverLap = null;
+                return;
+            }
+            
             // Get all highlighted points
             const points = this.svg.querySelectorAll(`.lap-point.hover-highlight`);
             
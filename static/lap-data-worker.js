@@ -0,0 +1,256 @@
+// Lap data parsing off the main thread
+//
+// Loaded twice: as a Web Worker, where it answers parse requests, and as a
+// regular script, where parseLapsPayloadAsync() hands the raw bytes of a
+// /laps response to that worker and falls back to parsing in place when
+// workers are unavailable. The worker decodes the bytes itself, JSON.parse
+// for the JSON encoding or decodeLapsBinary() for the binary one, so the
+// main thread neither parses nor structured-clones the payload. Parsed lap
+// numbers and times come back as typed arrays whose buffers are transferred
+// rather than copied.
+
+// This script's own URL, so a built page starts the worker from the same hashed file
+const LAP_DATA_WORKER_URL = (typeof document !== 'undefined' && document.currentScript &&
+    document.currentScript.src) || 'lap-data-worker.js';
+
+// Compound codes, the same list the server uses
+const LAP_COMPOUNDS = ['Soft', 'Medium', 'Hard', 'Intermediate', 'Wet', 'Unknown'];
+const LAPS_BINARY_MAGIC = 'F1LP';
+const LITTLE_ENDIAN_HOST = new Uint8Array(new Uint16Array([1]).buffer)[0] === 1;
+
+// Seconds from "M:SS.sss" or "SS.sss", NaN when the text is not a lap time
+function parseLapTime(text) {
+    if (typeof text !== 'string' || text === '') return NaN;
+    const colon = text.indexOf(':');
+    if (colon === -1) return parseFloat(text);
+    return parseInt(text.slice(0, colon), 10) * 60 + parseFloat(text.slice(colon + 1));
+}
+
+// "M:SS.sss" like the /laps endpoint
+function formatLapTime(seconds) {
+    const minutes = Math.floor(seconds / 60);
+    return `${minutes}:${(seconds - minutes * 60).toFixed(3).padStart(6, '0')}`;
+}
+
+// Per-driver typed arrays of valid laps with their extents, and drivers ranked by best lap
+function parseLapsData(lapsData) {
+    const drivers = {};
+    const ranking = [];
+
+    Object.entries(lapsData).forEach(([driver, laps]) => {
+        const lapNumbers = new Float64Array(laps.length);
+        const times = new Float64Array(laps.length);
+        const compounds = new Uint8Array(laps.length);
+        const tireAges = new Uint16Array(laps.length);
+        let count = 0;
+        let minLap = Infinity, maxLap = -Infinity, minTime = Infinity, maxTime = -Infinity;
+
+        for (const lap of laps) {
+            const time = parseLapTime(lap.time);
+            if (!(time > 0)) continue;
+            lapNumbers[count] = lap.lap;
+            times[count] = time;
+            const compound = LAP_COMPOUNDS.indexOf(lap.compound);
+            compounds[count] = compound === -1 ? LAP_COMPOUNDS.length - 1 : compound;
+            tireAges[count] = lap.tireAge || 0;
+            count++;
+            if (lap.lap < minLap) minLap = lap.lap;
+            if (lap.lap > maxLap) maxLap = lap.lap;
+            if (time < minTime) minTime = time;
+            if (time > maxTime) maxTime = time;
+        }
+
+        drivers[driver] = {
+            lapNumbers: lapNumbers.slice(0, count),
+            times: times.slice(0, count),
+            compounds: compounds.slice(0, count),
+            tireAges: tireAges.slice(0, count),
+            minLap, maxLap, minTime, maxTime
+        };
+        if (count > 0) {
+            ranking.push({ driver, bestTime: minTime });
+        }
+    });
+
+    ranking.sort((a, b) => a.bestTime - b.bestTime);
+    return { drivers, ranking: ranking.map(entry => entry.driver), compounds: LAP_COMPOUNDS };
+}
+
+// Buffers behind the parsed typed arrays, each listed once since decoded columns share the payload's
+function parsedLapBuffers(parsed) {
+    const buffers = new Set();
+    Object.values(parsed.drivers).forEach(series => {
+        [series.lapNumbers, series.times, series.compounds, series.tireAges].forEach(values => buffers.add(values.buffer));
+    });
+    return Array.from(buffers);
+}
+
+// Column of a binary laps payload, viewed in place on little-endian hosts
+function lapsBinaryColumn(buffer, view, column) {
+    const types = { Uint32Array, Uint16Array, Uint8Array };
+    const Type = types[column.type];
+    if (LITTLE_ENDIAN_HOST || Type.BYTES_PER_ELEMENT === 1) {
+        return new Type(buffer, column.offset, column.length);
+    }
+
+    // Big-endian hosts read each value through the DataView
+    const values = new Type(column.length);
+    const getter = Type === Uint32Array ? 'getUint32' : 'getUint16';
+    for (let i = 0; i < column.length; i++) {
+        values[i] = view[getter](column.offset + i * Type.BYTES_PER_ELEMENT, true);
+    }
+    return values;
+}
+
+// The structure parseLapsData() returns, from the binary /laps encoding
+function decodeLapsBinary(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== LAPS_BINARY_MAGIC) {
+        throw new Error('Not a binary laps payload');
+    }
+
+    const headerLength = view.getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+    const columns = {};
+    header.columns.forEach(column => {
+        columns[column.name] = lapsBinaryColumn(buffer, view, column);
+    });
+
+    // Rows are sorted by driver, so every driver is one contiguous range
+    const drivers = {};
+    const ranking = [];
+    let start = 0;
+    header.drivers.forEach((driver, index) => {
+        let end = start;
+        while (end < header.count && columns.driver[end] === index) end++;
+
+        const times = new Float64Array(end - start);
+        let minTime = Infinity, maxTime = -Infinity;
+        for (let i = 0; i < times.length; i++) {
+            times[i] = columns.lapTimeMs[start + i] / 1000;
+            if (times[i] < minTime) minTime = times[i];
+            if (times[i] > maxTime) maxTime = times[i];
+        }
+
+        const lapNumbers = columns.lap.subarray(start, end);
+        drivers[driver] = {
+            lapNumbers,
+            times,
+            compounds: columns.compound.subarray(start, end),
+            tireAges: columns.tireAge.subarray(start, end),
+            minLap: lapNumbers.length ? lapNumbers[0] : Infinity,
+            maxLap: lapNumbers.length ? lapNumbers[lapNumbers.length - 1] : -Infinity,
+            minTime, maxTime
+        };
+        if (times.length > 0) {
+            ranking.push({ driver, bestTime: minTime });
+        }
+        start = end;
+    });
+
+    ranking.sort((a, b) => a.bestTime - b.bestTime);
+    return { drivers, ranking: ranking.map(entry => entry.driver), compounds: header.compounds };
+}
+
+// parseLapsData() of the bytes of a /laps response, in either encoding
+function parseLapsPayload(buffer) {
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, Math.min(4, buffer.byteLength)));
+    if (magic === LAPS_BINARY_MAGIC) {
+        return decodeLapsBinary(buffer);
+    }
+    const payload = JSON.parse(new TextDecoder().decode(buffer));
+    return parseLapsData((payload && payload.lapsData) || {});
+}
+
+// Lap objects as in the JSON /laps payload, for the SVG renderer
+function lapsDataFromParsed(parsed) {
+    const lapsData = {};
+    Object.entries(parsed.drivers).forEach(([driver, series]) => {
+        lapsData[driver] = Array.from(series.lapNumbers, (lap, i) => ({
+            lap,
+            time: formatLapTime(series.times[i]),
+            compound: parsed.compounds[series.compounds[i]],
+            tireAge: series.tireAges[i]
+        }));
+    });
+    return lapsData;
+}
+
+if (typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope) {
+    self.onmessage = event => {
+        const { id, lapsData, buffer } = event.data;
+        try {
+            const parsed = buffer ? parseLapsPayload(buffer) : parseLapsData(lapsData);
+            self.postMessage({ id, parsed }, parsedLapBuffers(parsed));
+        } catch (e) {
+            self.postMessage({ id, error: e.message });
+        }
+    };
+} else {
+    let lapDataWorker = null;
+    let lapDataRequestId = 0;
+    const lapDataPending = new Map();
+
+    function getLapDataWorker() {
+        if (lapDataWorker === null && typeof Worker !== 'undefined') {
+            try {
+                lapDataWorker = new Worker(LAP_DATA_WORKER_URL);
+                lapDataWorker.onmessage = event => {
+                    const { id, parsed, error } = event.data;
+                    const pending = lapDataPending.get(id);
+                    lapDataPending.delete(id);
+                    if (!pending) return;
+                    if (error) pending.reject(new Error(error));
+                    else pending.resolve(parsed);
+                };
+                lapDataWorker.onerror = event => {
+                    // A worker that fails to start is dropped, pending work is parsed in place
+                    console.warn('Lap data worker failed, parsing on the main thread:', event.message);
+                    event.preventDefault();
+                    lapDataWorker.terminate();
+                    lapDataWorker = false;
+                    lapDataPending.forEach(pending => {
+                        try {
+                            pending.resolve(pending.parse());
+                        } catch (e) {
+                            pending.reject(e);
+                        }
+                    });
+                    lapDataPending.clear();
+                };
+            } catch (e) {
+                console.warn('Lap data worker unavailable, parsing on the main thread:', e);
+                lapDataWorker = false;
+            }
+        }
+        return lapDataWorker;
+    }
+
+    // Promise of parse(), sent to the worker as message when possible
+    function requestLapDataParse(message, transfer, parse, useWorker) {
+        const worker = useWorker ? getLapDataWorker() : null;
+        if (!worker) {
+            return new Promise(resolve => resolve(parse()));
+        }
+
+        return new Promise((resolve, reject) => {
+            const id = ++lapDataRequestId;
+            lapDataPending.set(id, { resolve, reject, parse });
+            worker.postMessage({ id, ...message }, transfer);
+        });
+    }
+
+    // Promise of parseLapsData(lapsData), computed in the worker when possible.
+    // lapsData is structured-cloned on the way, use parseLapsPayloadAsync() for fetched data.
+    window.parseLapsDataAsync = function(lapsData, { useWorker = true } = {}) {
+        return requestLapDataParse({ lapsData }, [], () => parseLapsData(lapsData), useWorker);
+    };
+
+    // Promise of parseLapsPayload(buffer), decoded in the worker when possible.
+    // A copy of the bytes is transferred, buffer stays usable for other callers and the cache.
+    window.parseLapsPayloadAsync = function(buffer, { useWorker = true } = {}) {
+        const copy = useWorker ? buffer.slice(0) : null;
+        return requestLapDataParse({ buffer: copy }, [copy], () => parseLapsPayload(buffer), useWorker);
+    };
+}
@@ -0,0 +1,201 @@
+// Shared client for the session bundle endpoint
+//
+// The race page, lap chart and tire strategy chart all need data for the same
+// session. They ask for it through fetchSessionBundle(), which sends one
+// /bundle request per session and hands the same pending result to every
+// caller whose parts it covers. Complete bundles are kept in the IndexedDB
+// session cache, served from there at once and revalidated in the background;
+// bundles where some part failed are never kept, so the next caller retries.
+// fetchSessionLaps() does the same for the raw bytes of /laps.
+
+const SESSION_BUNDLE_API = '/api';
+const SESSION_BUNDLE_PARTS = ['sessions', 'results', 'laps', 'stints'];
+const SESSION_BUNDLE_TIMEOUT = 30000; // ms
+const SESSION_BUNDLE_MAX_ENTRIES = 8;
+const LAPS_BINARY_TYPE = 'application/vnd.f1.laps';
+
+// `${season}/${race}/${session}` -> list of { parts, promise }, most recent last
+const sessionBundleRequests = new Map();
+
+function fetchSessionBundle(season, race, session, parts = SESSION_BUNDLE_PARTS) {
+    const key = `${season}/${race}/${session}`;
+    const entries = sessionBundleRequests.get(key) || [];
+
+    // Reuse a request that already covers every requested part
+    const existing = entries.find(entry => !entry.binaryLaps && parts.every(part => entry.parts.includes(part)));
+    if (existing) {
+        return existing.promise;
+    }
+
+    // Same order whatever the caller passed, so the cache key is stable
+    const orderedParts = SESSION_BUNDLE_PARTS.filter(part => parts.includes(part));
+    const endpoint = `bundle?parts=${orderedParts.join(',')}`;
+    const promise = loadCachedPayload(season, race, session, endpoint, 'json')
+        .then(bundle => {
+            // Parts that failed may have been transient, later callers ask again
+            if (hasPartErrors(bundle)) {
+                forgetSessionBundle(key, promise);
+            }
+            return bundle;
+        })
+        .catch(error => {
+            // Failed requests are not reused, the next caller tries again
+            forgetSessionBundle(key, promise);
+            throw error;
+        });
+
+    rememberSessionBundle(key, { parts: orderedParts, promise });
+    return promise;
+}
+
+// Lap data of a session as the raw bytes of the /laps response (an ArrayBuffer),
+// in the binary encoding or as JSON when the server answered with JSON. The
+// bytes are decoded by parseLapsPayloadAsync(), off the main thread.
+function fetchSessionLaps(season, race, session) {
+    const key = `${season}/${race}/${session}`;
+    const existing = (sessionBundleRequests.get(key) || []).find(entry => entry.binaryLaps);
+    if (existing) {
+        return existing.promise;
+    }
+
+    const promise = loadCachedPayload(season, race, session, 'laps', 'binary')
+        .catch(error => {
+            forgetSessionBundle(key, promise);
+            throw error;
+        });
+
+    rememberSessionBundle(key, { parts: [], binaryLaps: true, promise });
+    return promise;
+}
+
+function rememberSessionBundle(key, entry) {
+    const entries = sessionBundleRequests.get(key) || [];
+    entries.push(entry);
+    sessionBundleRequests.delete(key);
+    sessionBundleRequests.set(key, entries);
+
+    // Keep only the most recently used sessions
+    while (sessionBundleRequests.size > SESSION_BUNDLE_MAX_ENTRIES) {
+        sessionBundleRequests.delete(sessionBundleRequests.keys().next().value);
+    }
+}
+
+function forgetSessionBundle(key, promise) {
+    const entries = (sessionBundleRequests.get(key) || []).filter(entry => entry.promise !== promise);
+    if (entries.length > 0) {
+        sessionBundleRequests.set(key, entries);
+    } else {
+        sessionBundleRequests.delete(key);
+    }
+}
+
+async function loadCachedPayload(season, race, session, endpoint, format) {
+    const url = `${SESSION_BUNDLE_API}/season/${season}/race/${race}/${session}/${endpoint}`;
+    const cacheKey = SessionCache.key(season, race, session, format === 'binary' ? `${endpoint}.bin` : endpoint);
+
+    let record = null;
+    if (sessionCache) {
+        try {
+            record = await sessionCache.get(cacheKey);
+        } catch (e) {
+            console.warn('Session cache unavailable, using the network:', e);
+        }
+    }
+
+    if (record) {
+        if (sessionCache.needsRevalidation(record)) {
+            revalidatePayload(season, race, session, url, format, cacheKey, record);
+        }
+        return record.data;
+    }
+
+    const result = await requestPayload(url, format);
+    if (sessionCache && !hasPartErrors(result.data)) {
+        sessionCache.put(cacheKey, result.data, result.etag, result.size)
+            .catch(e => console.warn('Failed to store session payload:', e));
+    }
+    return result.data;
+}
+
+// Conditional request for a cached payload, stores and announces a changed one
+function revalidatePayload(season, race, session, url, format, cacheKey, record) {
+    requestPayload(url, format, record.etag)
+        .then(result => {
+            if (result.notModified) {
+                return sessionCache.touch(cacheKey);
+            }
+            if (hasPartErrors(result.data)) {
+                // Keep serving the complete cached bundle rather than a partly failed one
+                return undefined;
+            }
+
+            // Later callers read the new payload from the cache
+            sessionBundleRequests.delete(`${season}/${race}/${session}`);
+            window.dispatchEvent(new CustomEvent('sessionbundleupdate', {
+                detail: { season, race, session, url, data: result.data }
+            }));
+            return sessionCache.put(cacheKey, result.data, result.etag, result.size);
+        })
+        .catch(error => console.warn('Failed to revalidate session payload:', error));
+}
+
+// { data, etag, size }, or { notModified: true } when the etag still matches.
+// format 'binary' asks for the binary laps encoding and returns the response's ArrayBuffer,
+// also when the server answered with JSON.
+async function requestPayload(url, format, etag = null) {
+    const controller = new AbortController();
+    const timeoutId = setTimeout(() => controller.abort(), SESSION_BUNDLE_TIMEOUT);
+
+    try {
+        const headers = { 'Accept': format === 'binary' ? `${LAPS_BINARY_TYPE}, application/json;q=0.5` : 'application/json' };
+        if (etag) {
+            headers['If-None-Match'] = etag;
+        }
+        const response = await fetch(url, { signal: controller.signal, headers });
+        if (response.status === 304) {
+            return { notModified: true };
+        }
+
+        if (response.ok && format === 'binary') {
+            const buffer = await response.arrayBuffer();
+            return { data: buffer, etag: response.headers.get('ETag'), size: buffer.byteLength };
+        }
+
+        const text = await response.text();
+        let data = null;
+        try {
+            data = JSON.parse(text);
+        } catch (e) {
+            data = null;
+        }
+
+        if (!response.ok) {
+            const error = new Error((data && data.error) ||
+                `Failed to fetch session data: ${response.status} ${response.statusText}`);
+            error.status = response.status;
+            error.bundle = data;
+            throw error;
+        }
+        if (data === null) {
+            throw new Error('Invalid JSON response received for session data');
+        }
+
+        return { data, etag: response.headers.get('ETag'), size: text.length };
+    } finally {
+        clearTimeout(timeoutId);
+    }
+}
+
+// Whether a payload is a bundle where some part failed
+function hasPartErrors(data) {
+    return Boolean(data && !(data instanceof ArrayBuffer) && data.errors && Object.keys(data.errors).length > 0);
+}
+
+// Error of one part of a bundle as an Error with its HTTP status, or null
+function sessionBundlePartError(bundle, part) {
+    const partError = bundle && bundle.errors && bundle.errors[part];
+    if (!partError) return null;
+    const error = new Error(partError.error);
+    error.status = partError.status;
+    return error;
+}
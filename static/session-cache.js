@@ -0,0 +1,134 @@
+// Persistent browser cache of session payloads in IndexedDB
+//
+// Records are keyed by season, race, session, endpoint and schema version and
+// keep the server's ETag, so they can be served at once and revalidated in the
+// background with a conditional request. The least recently used records are
+// evicted once the stored payloads exceed the quota.
+
+const SESSION_CACHE_DB = 'f1-session-cache';
+const SESSION_CACHE_STORE = 'payloads';
+const SESSION_CACHE_SCHEMA = 1;                       // Bump when payload formats change
+const SESSION_CACHE_QUOTA = 50 * 1024 * 1024;         // Bytes of JSON kept at most
+const SESSION_CACHE_REVALIDATE_AFTER = 15 * 60 * 1000; // ms between background checks of a record
+
+class SessionCache {
+    constructor(quota = SESSION_CACHE_QUOTA) {
+        this.quota = quota;
+        this.dbPromise = null;
+    }
+
+    static isSupported() {
+        try {
+            return typeof indexedDB !== 'undefined' && indexedDB !== null;
+        } catch (e) {
+            return false;
+        }
+    }
+
+    static key(season, race, session, endpoint) {
+        return `${season}/${race}/${session}/${endpoint}/v${SESSION_CACHE_SCHEMA}`;
+    }
+
+    open() {
+        if (!this.dbPromise) {
+            this.dbPromise = new Promise((resolve, reject) => {
+                const request = indexedDB.open(SESSION_CACHE_DB, SESSION_CACHE_SCHEMA);
+                request.onupgradeneeded = () => {
+                    const db = request.result;
+                    // Records of an older schema are useless, start over
+                    if (db.objectStoreNames.contains(SESSION_CACHE_STORE)) {
+                        db.deleteObjectStore(SESSION_CACHE_STORE);
+                    }
+                    const store = db.createObjectStore(SESSION_CACHE_STORE, { keyPath: 'key' });
+                    store.createIndex('lastAccess', 'lastAccess');
+                };
+                request.onsuccess = () => resolve(request.result);
+                request.onerror = () => reject(request.error);
+                request.onblocked = () => reject(new Error('Session cache database is blocked'));
+            }).catch(error => {
+                // Let a later call try again, e.g. after another tab released the database
+                this.dbPromise = null;
+                throw error;
+            });
+        }
+        return this.dbPromise;
+    }
+
+    // Run fn(store) in a transaction, resolves with the request result fn returns
+    async transaction(mode, fn) {
+        const db = await this.open();
+        return new Promise((resolve, reject) => {
+            const tx = db.transaction(SESSION_CACHE_STORE, mode);
+            const request = fn(tx.objectStore(SESSION_CACHE_STORE));
+            tx.oncomplete = () => resolve(request ? request.result : undefined);
+            tx.onerror = () => reject(tx.error);
+            tx.onabort = () => reject(tx.error);
+        });
+    }
+
+    // Cached record { key, data, etag, size, storedAt, checkedAt, lastAccess } or undefined
+    async get(key) {
+        const record = await this.transaction('readonly', store => store.get(key));
+        if (record) {
+            record.lastAccess = Date.now();
+            this.transaction('readwrite', store => store.put(record)).catch(() => {});
+        }
+        return record;
+    }
+
+    async put(key, data, etag, size) {
+        const now = Date.now();
+        await this.transaction('readwrite', store => store.put({
+            key, data, etag, size, storedAt: now, checkedAt: now, lastAccess: now
+        }));
+        await this.evict();
+    }
+
+    // Record a successful revalidation without rewriting the payload
+    async touch(key) {
+        const record = await this.transaction('readonly', store => store.get(key));
+        if (record) {
+            record.checkedAt = Date.now();
+            await this.transaction('readwrite', store => store.put(record));
+        }
+    }
+
+    needsRevalidation(record) {
+        return Date.now() - record.checkedAt > SESSION_CACHE_REVALIDATE_AFTER;
+    }
+
+    // Delete least recently used records until the payloads fit the quota
+    async evict() {
+        const db = await this.open();
+        return new Promise((resolve, reject) => {
+            const tx = db.transaction(SESSION_CACHE_STORE, 'readwrite');
+            const index = tx.objectStore(SESSION_CACHE_STORE).index('lastAccess');
+            const records = [];
+
+            index.openCursor().onsuccess = event => {
+                const cursor = event.target.result;
+                if (cursor) {
+                    records.push({ primaryKey: cursor.primaryKey, size: cursor.value.size || 0 });
+                    cursor.continue();
+                    return;
+                }
+
+                // Oldest first, so drop from the front
+                let total = records.reduce((sum, record) => sum + record.size, 0);
+                for (const record of records) {
+                    if (total <= this.quota) break;
+                    tx.objectStore(SESSION_CACHE_STORE).delete(record.primaryKey);
+                    total -= record.size;
+                }
+            };
+            tx.oncomplete = () => resolve();
+            tx.onerror = () => reject(tx.error);
+        });
+    }
+
+    async clear() {
+        await this.transaction('readwrite', store => store.clear());
+    }
+}
+
+const sessionCache = SessionCache.isSupported() ? new SessionCache() : null;
@@ -111,112 +111,36 @@ function loadStrategyData(season, race, sessionType) {
     const raceId = typeof race === 'string' ? 
         race.toLowerCase().replace(/\s+/g, '_') : race;
     
-    // First, get the race data
-    fetch(`/api/season/${season}/race/${raceId}/${sessionType}`)
-        .then(response => {
-            if (!response.ok) throw new Error(`Failed to load race data (${response.status})`);
-            return response.json();
-        })
-        .then(raceData => {
-            console.log('Race data received for strategy:', raceData);
+    // Results and stints come from the session bundle, usually already fetched by the race page
+    fetchSessionBundle(season, raceId, sessionType, ['results', 'stints'])
+        .then(bundle => {
+            const partError = sessionBundlePartError(bundle, 'results') || sessionBundlePartError(bundle, 'stints');
+            if (partError) throw new Error(`Failed to load strategy data (${partError.status})`);
             
-            // Then get the lap data
-            return fetch(`/api/season/${season}/race/${raceId}/${sessionType}/laps`)
-                .then(response => {
-                    if (!response.ok) throw new Error(`Failed to load laps data (${response.status})`);
-                    return response.json();
-                })
-                .then(lapsData => {
-                    console.log('Laps data received for strategy:', lapsData);
-                    
-                    // Build a proper strategy data object from race and laps data
-                    const strategies = extractStrategyFromLaps(lapsData.lapsData);
-                    
-                    // Combine race data with strategies
-                    const strategyData = {
-                        ...raceData,
-                        strategies: strategies
-                    };
-                    
-                    console.log('Combined strategy data:', strategyData);
-                    
-                    // Render the strategy chart
-                    try {
-                        const chart = new TireStrategy('tire-strategy-container');
-                        chart.setData(strategyData);
-                        console.log('Strategy chart rendered successfully');
-                    } catch (e) {
-                        console.error('Error rendering strategy chart:', e);
-                        container.innerHTML = `<div class="error">Error rendering chart: ${e.message}</div>`;
-                    }
-                });
-        })
-        .catch(error => {
-            console.error('Error loading strategy data:', error);
-            container.innerHTML = `<div class="error">Error loading strategy data: ${error.message}</div>`;
-        });
-}
-
-function extractStrategyFromLaps(lapsData) {
-    const strategies = {};
-    
-    // For each driver
-    Object.entries(lapsData).forEach(([driverCode, laps]) => {
-        strategies[driverCode] = [];
-        
-        // Skip if no laps
-        if (!laps || laps.length === 0) return;
-        
-        // Sort laps by lap number
-        const sortedLaps = [...laps].sort((a, b) => a.lap - b.lap);
-        
-        let currentStint = null;
-        let previousLapNumber = 0;
-        
-        // Process each lap to identify stints
-        sortedLaps.forEach((lap, index) => {
-            const compound = lap.compound || 'Unknown';
-            const lapNum = lap.lap;
+            console.log('Session bundle received for strategy:', bundle);
             
-            // Check for pit stops (gap in lap numbers larger than 1)
-            const hasPitStop = index > 0 && lapNum > previousLapNumber + 1;
+            // Combine race data with strategies
+            const strategyData = {
+                ...bundle.results,
+                strategies: bundle.stints
+            };
             
-            // Start a new stint if:
-            // 1. This is the first lap
-            // 2. The compound has changed
-            // 3. There's a gap in lap numbers (pit stop)
-            const isNewStint = !currentStint || 
-                               currentStint.compound !== compound ||
-                               hasPitStop;
+            console.log('Combined strategy data:', strategyData);
             
-            if (isNewStint) {
-                // Add the previous stint if it exists
-                if (currentStint) {
-                    strategies[driverCode].push(currentStint);
-                }
-                
-                // Start a new stint
-                currentStint = {
-                    compound: compound,
-                    laps: 1,
-                    startLap: lapNum
-                };
-            } else {
-                // Continue current stint
-                currentStint.laps++;
+            // Render the strategy chart
+            try {
+                const chart = new TireStrategy('tire-strategy-container');
+                chart.setData(strategyData);
+                console.log('Strategy chart rendered successfully');
+            } catch (e) {
+                console.error('Error rendering strategy chart:', e);
+                container.innerHTML = `<div class="error">Error rendering chart: ${e.message}</div>`;
             }
-            
-            // Remember this lap number for the next iteration
-            previousLapNumber = lapNum;
+        })
+        .catch(error => {
+            console.error('Error loading strategy data:', error);
+            container.innerHTML = `<div class="error">Error loading strategy data: ${error.message}</div>`;
         });
-        
-        // Add the final stint
-        if (currentStint) {
-            strategies[driverCode].push(currentStint);
-        }
-    });
-    
-    return strategies;
 }
 
 function generateStrategiesFromLaps(lapsData, raceData) {
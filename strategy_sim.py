@@ -0,0 +1,195 @@
+"""
+Monte Carlo pit stop strategy simulator
+
+Candidate 1, 2 and 3 stop plans are enumerated as arrays of stint lengths and
+compounds. Because a stint on fresh tires of n laps accumulates n(n+1)/2 laps of
+tire age, every plan's race time reduces to a dot product with per-compound
+pace and degradation, so thousands of plans times hundreds of sampled race
+conditions are evaluated as a handful of matrix operations.
+"""
+import itertools
+import time
+
+import numpy as np
+
+import lap_analysis
+
+DRY_COMPOUNDS = ['Soft', 'Medium', 'Hard']
+
+DEFAULT_PIT_LOSS = 22.0
+# Accepted pit losses, in steps of PIT_LOSS_STEP seconds
+MAX_PIT_LOSS = 60.0
+PIT_LOSS_STEP = 0.1
+DEFAULT_PIT_LOSS_SPREAD = 1.5
+DEFAULT_LAP_NOISE = 0.4
+DEFAULT_DEGRADATION_SPREAD = 0.02
+DEFAULT_SAMPLES = 200
+DEFAULT_MIN_STINT = 5
+
+# Pit lap grid step per stop count, keeping the 3 stop search space bounded
+PIT_LAP_STEP = {1: 1, 2: 2, 3: 4}
+
+# Bytes of one plans x samples float64 matrix per batch; a batch holds a few of them at once
+CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def chunk_rows(samples):
+    """Plans evaluated per batch, so each plans x samples matrix stays within CHUNK_BYTES"""
+    return max(1, CHUNK_BYTES // (samples * 8))
+
+
+def derive_inputs(table, fuel_effect=lap_analysis.DEFAULT_FUEL_EFFECT):
+    """Race length, pace and degradation per dry compound derived from a session's laps"""
+    stints = lap_analysis.fit_degradation(table, fuel_effect)
+
+    intercepts = {}
+    slopes = {}
+    for stint in stints:
+        if stint['compound'] in DRY_COMPOUNDS:
+            intercepts.setdefault(stint['compound'], []).append(stint['coefficients'][0])
+            slopes.setdefault(stint['compound'], []).append(stint['degradation'])
+
+    if not intercepts:
+        return None
+
+    # Pace of each compound on fresh tires relative to the fastest compound
+    fresh_pace = {compound: float(np.median(values)) for compound, values in intercepts.items()}
+    base_time = min(fresh_pace.values())
+
+    compounds = {}
+    for compound in DRY_COMPOUNDS:
+        if compound not in fresh_pace:
+            continue
+        compounds[compound] = {
+            "offset": round(fresh_pace[compound] - base_time, 4),
+            "degradation": round(float(np.median(slopes[compound])), 4),
+            "spread": round(float(np.std(slopes[compound])), 4) if len(slopes[compound]) > 1
+            else DEFAULT_DEGRADATION_SPREAD
+        }
+
+    return {
+        "totalLaps": int(table['lap'].max()),
+        "baseTime": round(base_time, 3),
+        "fuelEffect": fuel_effect,
+        "compounds": compounds
+    }
+
+
+def enumerate_plans(total_laps, n_compounds, max_stops=3, min_stint=DEFAULT_MIN_STINT):
+    """Stint lengths, compound codes and stop counts of every candidate plan"""
+    width = max_stops + 1
+    all_lengths = []
+    all_compounds = []
+    all_stops = []
+
+    for stops in range(1, max_stops + 1):
+        pit_grid = np.arange(min_stint, total_laps - min_stint + 1, PIT_LAP_STEP.get(stops, 1))
+        if len(pit_grid) < stops:
+            continue
+
+        pit_laps = np.array(list(itertools.combinations(pit_grid, stops)), dtype=np.int64)
+        bounds = np.concatenate([
+            np.zeros((len(pit_laps), 1), dtype=np.int64),
+            pit_laps,
+            np.full((len(pit_laps), 1), total_laps, dtype=np.int64)
+        ], axis=1)
+        lengths = np.diff(bounds, axis=1)
+        lengths = lengths[(lengths >= min_stint).all(axis=1)]
+
+        # Dry races require at least two different compounds
+        sequences = np.array(list(itertools.product(range(n_compounds), repeat=stops + 1)), dtype=np.int64)
+        if n_compounds > 1:
+            sequences = sequences[(sequences != sequences[:, :1]).any(axis=1)]
+
+        if len(lengths) == 0 or len(sequences) == 0:
+            continue
+
+        # Every pit lap combination with every compound sequence, padded to max_stops + 1 stints
+        plan_lengths = np.zeros((len(lengths) * len(sequences), width), dtype=np.int64)
+        plan_compounds = np.zeros_like(plan_lengths)
+        plan_lengths[:, :stops + 1] = np.repeat(lengths, len(sequences), axis=0)
+        plan_compounds[:, :stops + 1] = np.tile(sequences, (len(lengths), 1))
+
+        all_lengths.append(plan_lengths)
+        all_compounds.append(plan_compounds)
+        all_stops.append(np.full(len(plan_lengths), stops, dtype=np.int64))
+
+    if not all_lengths:
+        empty = np.zeros((0, width), dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=np.int64)
+
+    return np.concatenate(all_lengths), np.concatenate(all_compounds), np.concatenate(all_stops)
+
+
+def simulate(inputs, pit_loss=DEFAULT_PIT_LOSS, samples=DEFAULT_SAMPLES, max_stops=3,
+             min_stint=DEFAULT_MIN_STINT, lap_noise=DEFAULT_LAP_NOISE, top=10, seed=None):
+    """Evaluate every candidate plan under sampled race conditions and rank by mean race time"""
+    start_time = time.perf_counter()
+    rng = np.random.default_rng(seed)
+
+    names = list(inputs['compounds'])
+    offsets = np.array([inputs['compounds'][c]['offset'] for c in names])
+    degradation = np.array([inputs['compounds'][c]['degradation'] for c in names])
+    spread = np.array([inputs['compounds'][c]['spread'] for c in names])
+    total_laps = inputs['totalLaps']
+
+    lengths, compounds, stops = enumerate_plans(total_laps, len(names), max_stops, min_stint)
+
+    # Race conditions shared by all plans: degradation rates, pit loss and summed lap noise per sample,
+    # so plans are compared under the same conditions and only their differences rank them
+    degradation_samples = rng.normal(degradation, spread, size=(samples, len(names)))
+    pit_loss_samples = rng.normal(pit_loss, DEFAULT_PIT_LOSS_SPREAD, size=samples)
+    noise_samples = rng.normal(0.0, lap_noise * np.sqrt(total_laps), size=samples)
+
+    # Base pace and fuel burn are identical for every plan
+    constant = inputs['baseTime'] * total_laps + inputs['fuelEffect'] * total_laps * (total_laps - 1) / 2
+
+    means = np.empty(len(lengths))
+    low = np.empty(len(lengths))
+    high = np.empty(len(lengths))
+
+    rows = chunk_rows(samples)
+    for start in range(0, len(lengths), rows):
+        chunk = slice(start, start + rows)
+        one_hot = compounds[chunk, :, None] == np.arange(len(names))
+        chunk_lengths = lengths[chunk, :, None]
+
+        # Laps and accumulated tire age run on each compound
+        laps_on = (one_hot * chunk_lengths).sum(axis=1)
+        age_on = (one_hot * (chunk_lengths * (chunk_lengths + 1) / 2)).sum(axis=1)
+
+        # Summed in place, so the batch holds one more matrix than the product it adds
+        totals = age_on @ degradation_samples.T
+        totals += stops[chunk, None] * pit_loss_samples[None, :]
+        totals += noise_samples[None, :]
+        totals += (constant + laps_on @ offsets)[:, None]
+
+        means[chunk] = totals.mean(axis=1)
+        low[chunk], high[chunk] = np.percentile(totals, [5, 95], axis=1)
+
+    elapsed = time.perf_counter() - start_time
+    ranked = np.argsort(means)[:top]
+    best = means[ranked[0]] if len(ranked) else 0.0
+
+    plans = []
+    for i in ranked:
+        n_stints = stops[i] + 1
+        stint_lengths = lengths[i, :n_stints]
+        plans.append({
+            "stops": int(stops[i]),
+            "pitLaps": np.cumsum(stint_lengths)[:-1].tolist(),
+            "compounds": [names[c] for c in compounds[i, :n_stints]],
+            "meanTime": round(float(means[i]), 3),
+            "ci90": [round(float(low[i]), 3), round(float(high[i]), 3)],
+            "deltaToBest": round(float(means[i] - best), 3)
+        })
+
+    return {
+        "plans": plans,
+        "stats": {
+            "plansEvaluated": int(len(lengths)),
+            "samples": samples,
+            "elapsedMs": round(elapsed * 1000, 1),
+            "strategiesPerSecond": int(len(lengths) / elapsed) if elapsed > 0 else None
+        }
+    }
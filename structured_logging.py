@@ -0,0 +1,209 @@
+"""
+Structured logging with lazily formatted fields, per-module levels, rate limiting
+of repeated warnings and a queue handler that keeps log I/O off request threads
+
+Configured from environment variables:
+    F1_LOG_LEVEL       root level, default INFO
+    F1_LOG_LEVELS      per-logger levels, e.g. "server=DEBUG,fastf1=WARNING"
+    F1_LOG_FORMAT      text (default) or json
+    F1_LOG_RATE_LIMIT  warnings per call site and window, e.g. "5/60"; 0 disables
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DEFAULT_RATE_LIMIT = '5/60'
+QUEUE_SIZE = 10000
+
+# Keyword arguments of Logger methods, everything else passed to a StructuredLogger is a field
+LOGGER_KWARGS = ('exc_info', 'stack_info', 'stacklevel', 'extra')
+
+_listener = None
+_configure_lock = threading.Lock()
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger accepting fields as keyword arguments, e.g. logger.info("Session loaded", seconds=1.2)
+
+    Fields are stored on the record unformatted and only rendered by the
+    formatter on the queue listener thread. Callable field values are called at
+    that point, so expensive values cost nothing when the level is disabled.
+    """
+
+    def __init__(self, logger):
+        super().__init__(logger, {})
+
+    def process(self, msg, kwargs):
+        fields = {key: kwargs.pop(key) for key in list(kwargs) if key not in LOGGER_KWARGS}
+        if fields:
+            extra = dict(kwargs.get('extra') or {})
+            extra['fields'] = fields
+            kwargs['extra'] = extra
+        return msg, kwargs
+
+
+def get_logger(name):
+    """Structured logger for a module"""
+    return StructuredLogger(logging.getLogger(name))
+
+
+def render_value(value):
+    """Field value as text, calling lazy values first"""
+    if callable(value):
+        value = value()
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    text = str(value)
+    return f'"{text}"' if ' ' in text else text
+
+
+class StructuredFormatter(logging.Formatter):
+    """Appends record fields as key=value pairs, or renders the whole record as JSON"""
+
+    def __init__(self, fmt=DEFAULT_FORMAT, json_output=False):
+        super().__init__(fmt)
+        self.json_output = json_output
+
+    def record_fields(self, record):
+        """Fields of a record, plus the suppressed count added by rate limiting"""
+        fields = dict(getattr(record, 'fields', None) or {})
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            fields['suppressed'] = suppressed
+        return fields
+
+    def formatMessage(self, record):
+        # Fields go on the message line, ahead of any traceback
+        text = super().formatMessage(record)
+        fields = self.record_fields(record)
+        if fields:
+            text += ' ' + ' '.join(f"{key}={render_value(value)}" for key, value in fields.items())
+        return text
+
+    def format(self, record):
+        if not self.json_output:
+            return super().format(record)
+
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in self.record_fields(record).items():
+            entry[key] = value() if callable(value) else value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most `burst` warnings per call site and window
+
+    Only records of exactly the given level are limited: errors always pass, and
+    so do INFO and DEBUG lines such as the one logged for every request. The
+    next record let through from a call site carries the number of records
+    suppressed since, so repeated per-lap warnings collapse into one line.
+    """
+
+    def __init__(self, burst, window, level=logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.level = level
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno != self.level:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            state = self._sites.get(key)
+            if state is None or now - state[0] >= self.window:
+                # New window: [start, records let through, records suppressed]
+                self._sites[key] = [now, 1, 0]
+                if state is not None and state[2]:
+                    record.suppressed = state[2]
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never formats on the calling thread and drops records when the queue is full"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens on the listener thread; only make the record safe to hand over
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def parse_levels(text):
+    """{logger name: level} from "name=LEVEL,name=LEVEL" """
+    levels = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        name, _, level = item.partition('=')
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def parse_rate_limit(text):
+    """(burst, window seconds) from "burst/window", or None when disabled"""
+    if not text or text.strip() == '0':
+        return None
+    burst, _, window = text.partition('/')
+    return int(burst), float(window or 60)
+
+
+def configure_logging():
+    """Route all logging through a queue to a stderr listener thread, configured from the environment"""
+    global _listener
+
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(StructuredFormatter(
+            json_output=os.environ.get('F1_LOG_FORMAT', 'text').lower() == 'json'))
+
+        queue_handler = DroppingQueueHandler(queue.Queue(QUEUE_SIZE))
+        rate_limit = parse_rate_limit(os.environ.get('F1_LOG_RATE_LIMIT', DEFAULT_RATE_LIMIT))
+        if rate_limit is not None:
+            queue_handler.addFilter(RateLimitFilter(*rate_limit))
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(os.environ.get('F1_LOG_LEVEL', 'INFO').upper())
+
+        for name, level in parse_levels(os.environ.get('F1_LOG_LEVELS', '')).items():
+            logging.getLogger(name).setLevel(level)
+
+        _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
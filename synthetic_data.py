@@ -0,0 +1,368 @@
+"""
+Deterministic synthetic F1 session data
+
+Generates laps, results and tire stints for any (season, race, session) without
+network access or FastF1. Every call builds its own numpy.random.Generator seeded
+from the session key, so output is reproducible and safe under concurrent
+requests. Used as the API fallback and as a fixture source for load testing:
+
+    python synthetic_data.py --season 2023 --out fixtures/synthetic
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import lap_analysis
+
+# Driver lineups per season: code -> (full name, team)
+SEASON_DRIVERS = {
+    2018: {
+        'HAM': ('Lewis Hamilton', 'Mercedes'), 'BOT': ('Valtteri Bottas', 'Mercedes'),
+        'VET': ('Sebastian Vettel', 'Ferrari'), 'RAI': ('Kimi Räikkönen', 'Ferrari'),
+        'VER': ('Max Verstappen', 'Red Bull Racing'), 'RIC': ('Daniel Ricciardo', 'Red Bull Racing'),
+        'HUL': ('Nico Hulkenberg', 'Renault'), 'SAI': ('Carlos Sainz', 'Renault'),
+        'GAS': ('Pierre Gasly', 'Toro Rosso'), 'HAR': ('Brendon Hartley', 'Toro Rosso'),
+        'PER': ('Sergio Perez', 'Force India'), 'OCO': ('Esteban Ocon', 'Force India'),
+        'MAG': ('Kevin Magnussen', 'Haas F1 Team'), 'GRO': ('Romain Grosjean', 'Haas F1 Team'),
+        'ALO': ('Fernando Alonso', 'McLaren'), 'VAN': ('Stoffel Vandoorne', 'McLaren'),
+        'ERI': ('Marcus Ericsson', 'Sauber'), 'LEC': ('Charles Leclerc', 'Sauber'),
+        'STR': ('Lance Stroll', 'Williams'), 'SIR': ('Sergey Sirotkin', 'Williams')
+    },
+    2019: {
+        'HAM': ('Lewis Hamilton', 'Mercedes'), 'BOT': ('Valtteri Bottas', 'Mercedes'),
+        'VET': ('Sebastian Vettel', 'Ferrari'), 'LEC': ('Charles Leclerc', 'Ferrari'),
+        'VER': ('Max Verstappen', 'Red Bull Racing'), 'GAS': ('Pierre Gasly', 'Red Bull Racing'),
+        'RIC': ('Daniel Ricciardo', 'Renault'), 'HUL': ('Nico Hulkenberg', 'Renault'),
+        'KVY': ('Daniil Kvyat', 'Toro Rosso'), 'ALB': ('Alexander Albon', 'Toro Rosso'),
+        'PER': ('Sergio Perez', 'Racing Point'), 'STR': ('Lance Stroll', 'Racing Point'),
+        'MAG': ('Kevin Magnussen', 'Haas F1 Team'), 'GRO': ('Romain Grosjean', 'Haas F1 Team'),
+        'SAI': ('Carlos Sainz', 'McLaren'), 'NOR': ('Lando Norris', 'McLaren'),
+        'RAI': ('Kimi Räikkönen', 'Alfa Romeo'), 'GIO': ('Antonio Giovinazzi', 'Alfa Romeo'),
+        'RUS': ('George Russell', 'Williams'), 'KUB': ('Robert Kubica', 'Williams')
+    },
+    2020: {
+        'HAM': ('Lewis Hamilton', 'Mercedes'), 'BOT': ('Valtteri Bottas', 'Mercedes'),
+        'VET': ('Sebastian Vettel', 'Ferrari'), 'LEC': ('Charles Leclerc', 'Ferrari'),
+        'VER': ('Max Verstappen', 'Red Bull Racing'), 'ALB': ('Alexander Albon', 'Red Bull Racing'),
+        'RIC': ('Daniel Ricciardo', 'Renault'), 'OCO': ('Esteban Ocon', 'Renault'),
+        'GAS': ('Pierre Gasly', 'AlphaTauri'), 'KVY': ('Daniil Kvyat', 'AlphaTauri'),
+        'PER': ('Sergio Perez', 'Racing Point'), 'STR': ('Lance Stroll', 'Racing Point'),
+        'MAG': ('Kevin Magnussen', 'Haas F1 Team'), 'GRO': ('Romain Grosjean', 'Haas F1 Team'),
+        'SAI': ('Carlos Sainz', 'McLaren'), 'NOR': ('Lando Norris', 'McLaren'),
+        'RAI': ('Kimi Räikkönen', 'Alfa Romeo'), 'GIO': ('Antonio Giovinazzi', 'Alfa Romeo'),
+        'RUS': ('George Russell', 'Williams'), 'LAT': ('Nicholas Latifi', 'Williams')
+    },
+    2021: {
+        'HAM': ('Lewis Hamilton', 'Mercedes'), 'BOT': ('Valtteri Bottas', 'Mercedes'),
+        'VER': ('Max Verstappen', 'Red Bull Racing'), 'PER': ('Sergio Perez', 'Red Bull Racing'),
+        'LEC': ('Charles Leclerc', 'Ferrari'), 'SAI': ('Carlos Sainz', 'Ferrari'),
+        'NOR': ('Lando Norris', 'McLaren'), 'RIC': ('Daniel Ricciardo', 'McLaren'),
+        'ALO': ('Fernando Alonso', 'Alpine'), 'OCO': ('Esteban Ocon', 'Alpine'),
+        'GAS': ('Pierre Gasly', 'AlphaTauri'), 'TSU': ('Yuki Tsunoda', 'AlphaTauri'),
+        'VET': ('Sebastian Vettel', 'Aston Martin'), 'STR': ('Lance Stroll', 'Aston Martin'),
+        'RAI': ('Kimi Räikkönen', 'Alfa Romeo'), 'GIO': ('Antonio Giovinazzi', 'Alfa Romeo'),
+        'RUS': ('George Russell', 'Williams'), 'LAT': ('Nicholas Latifi', 'Williams'),
+        'MSC': ('Mick Schumacher', 'Haas F1 Team'), 'MAZ': ('Nikita Mazepin', 'Haas F1 Team')
+    },
+    2022: {
+        'HAM': ('Lewis Hamilton', 'Mercedes'), 'RUS': ('George Russell', 'Mercedes'),
+        'VER': ('Max Verstappen', 'Red Bull Racing'), 'PER': ('Sergio Perez', 'Red Bull Racing'),
+        'LEC': ('Charles Leclerc', 'Ferrari'), 'SAI': ('Carlos Sainz', 'Ferrari'),
+        'NOR': ('Lando Norris', 'McLaren'), 'RIC': ('Daniel Ricciardo', 'McLaren'),
+        'ALO': ('Fernando Alonso', 'Alpine'), 'OCO': ('Esteban Ocon', 'Alpine'),
+        'GAS': ('Pierre Gasly', 'AlphaTauri'), 'TSU': ('Yuki Tsunoda', 'AlphaTauri'),
+        'VET': ('Sebastian Vettel', 'Aston Martin'), 'STR': ('Lance Stroll', 'Aston Martin'),
+        'BOT': ('Valtteri Bottas', 'Alfa Romeo'), 'ZHO': ('Guanyu Zhou', 'Alfa Romeo'),
+        'ALB': ('Alexander Albon', 'Williams'), 'LAT': ('Nicholas Latifi', 'Williams'),
+        'MAG': ('Kevin Magnussen', 'Haas F1 Team'), 'MSC': ('Mick Schumacher', 'Haas F1 Team')
+    },
+    2023: {
+        'HAM': ('Lewis Hamilton', 'Mercedes'), 'RUS': ('George Russell', 'Mercedes'),
+        'VER': ('Max Verstappen', 'Red Bull Racing'), 'PER': ('Sergio Perez', 'Red Bull Racing'),
+        'LEC': ('Charles Leclerc', 'Ferrari'), 'SAI': ('Carlos Sainz', 'Ferrari'),
+        'NOR': ('Lando Norris', 'McLaren'), 'PIA': ('Oscar Piastri', 'McLaren'),
+        'GAS': ('Pierre Gasly', 'Alpine'), 'OCO': ('Esteban Ocon', 'Alpine'),
+        'TSU': ('Yuki Tsunoda', 'AlphaTauri'), 'DEV': ('Nyck de Vries', 'AlphaTauri'),
+        'ALO': ('Fernando Alonso', 'Aston Martin'), 'STR': ('Lance Stroll', 'Aston Martin'),
+        'BOT': ('Valtteri Bottas', 'Alfa Romeo'), 'ZHO': ('Guanyu Zhou', 'Alfa Romeo'),
+        'ALB': ('Alexander Albon', 'Williams'), 'SAR': ('Logan Sargeant', 'Williams'),
+        'MAG': ('Kevin Magnussen', 'Haas F1 Team'), 'HUL': ('Nico Hulkenberg', 'Haas F1 Team')
+    },
+    2024: {
+        'HAM': ('Lewis Hamilton', 'Mercedes'), 'RUS': ('George Russell', 'Mercedes'),
+        'VER': ('Max Verstappen', 'Red Bull Racing'), 'PER': ('Sergio Perez', 'Red Bull Racing'),
+        'LEC': ('Charles Leclerc', 'Ferrari'), 'SAI': ('Carlos Sainz', 'Ferrari'),
+        'NOR': ('Lando Norris', 'McLaren'), 'PIA': ('Oscar Piastri', 'McLaren'),
+        'GAS': ('Pierre Gasly', 'Alpine'), 'OCO': ('Esteban Ocon', 'Alpine'),
+        'TSU': ('Yuki Tsunoda', 'RB'), 'RIC': ('Daniel Ricciardo', 'RB'),
+        'ALO': ('Fernando Alonso', 'Aston Martin'), 'STR': ('Lance Stroll', 'Aston Martin'),
+        'BOT': ('Valtteri Bottas', 'Kick Sauber'), 'ZHO': ('Guanyu Zhou', 'Kick Sauber'),
+        'ALB': ('Alexander Albon', 'Williams'), 'SAR': ('Logan Sargeant', 'Williams'),
+        'MAG': ('Kevin Magnussen', 'Haas F1 Team'), 'HUL': ('Nico Hulkenberg', 'Haas F1 Team')
+    },
+    2025: {
+        'RUS': ('George Russell', 'Mercedes'), 'ANT': ('Andrea Kimi Antonelli', 'Mercedes'),
+        'VER': ('Max Verstappen', 'Red Bull Racing'), 'LAW': ('Liam Lawson', 'Red Bull Racing'),
+        'LEC': ('Charles Leclerc', 'Ferrari'), 'HAM': ('Lewis Hamilton', 'Ferrari'),
+        'NOR': ('Lando Norris', 'McLaren'), 'PIA': ('Oscar Piastri', 'McLaren'),
+        'GAS': ('Pierre Gasly', 'Alpine'), 'DOO': ('Jack Doohan', 'Alpine'),
+        'TSU': ('Yuki Tsunoda', 'Racing Bulls'), 'HAD': ('Isack Hadjar', 'Racing Bulls'),
+        'ALO': ('Fernando Alonso', 'Aston Martin'), 'STR': ('Lance Stroll', 'Aston Martin'),
+        'HUL': ('Nico Hulkenberg', 'Kick Sauber'), 'BOR': ('Gabriel Bortoleto', 'Kick Sauber'),
+        'ALB': ('Alexander Albon', 'Williams'), 'SAI': ('Carlos Sainz', 'Williams'),
+        'OCO': ('Esteban Ocon', 'Haas F1 Team'), 'BEA': ('Oliver Bearman', 'Haas F1 Team')
+    }
+}
+
+# Team performance tiers per season, 1 is the fastest
+SEASON_TEAM_TIERS = {
+    2018: {'Mercedes': 1, 'Ferrari': 1, 'Red Bull Racing': 1, 'Renault': 2, 'Haas F1 Team': 2,
+           'Force India': 2, 'McLaren': 2},
+    2019: {'Mercedes': 1, 'Ferrari': 1, 'Red Bull Racing': 1, 'McLaren': 2, 'Renault': 2,
+           'Toro Rosso': 2, 'Racing Point': 2},
+    2020: {'Mercedes': 1, 'Red Bull Racing': 1, 'McLaren': 2, 'Racing Point': 2, 'Renault': 2,
+           'Ferrari': 2, 'AlphaTauri': 2},
+    2021: {'Mercedes': 1, 'Red Bull Racing': 1, 'Ferrari': 2, 'McLaren': 2, 'Alpine': 2,
+           'AlphaTauri': 2},
+    2022: {'Red Bull Racing': 1, 'Ferrari': 1, 'Mercedes': 1, 'Alpine': 2, 'McLaren': 2},
+    2023: {'Red Bull Racing': 1, 'Mercedes': 1, 'Ferrari': 1, 'Aston Martin': 1, 'McLaren': 2,
+           'Alpine': 2},
+    2024: {'McLaren': 1, 'Ferrari': 1, 'Red Bull Racing': 1, 'Mercedes': 1, 'Aston Martin': 2,
+           'RB': 2, 'Haas F1 Team': 2, 'Alpine': 2},
+    2025: {'McLaren': 1, 'Ferrari': 1, 'Mercedes': 1, 'Red Bull Racing': 1, 'Williams': 2,
+           'Racing Bulls': 2, 'Aston Martin': 2}
+}
+
+# Calendar used when generating whole seasons without a FastF1 schedule
+SYNTHETIC_CALENDAR = [
+    'bahrain_grand_prix', 'saudi_arabian_grand_prix', 'australian_grand_prix', 'japanese_grand_prix',
+    'chinese_grand_prix', 'miami_grand_prix', 'emilia_romagna_grand_prix', 'monaco_grand_prix',
+    'canadian_grand_prix', 'spanish_grand_prix', 'austrian_grand_prix', 'british_grand_prix',
+    'hungarian_grand_prix', 'belgian_grand_prix', 'dutch_grand_prix', 'italian_grand_prix',
+    'azerbaijan_grand_prix', 'singapore_grand_prix', 'united_states_grand_prix',
+    'mexico_city_grand_prix', 'são_paulo_grand_prix', 'las_vegas_grand_prix', 'qatar_grand_prix',
+    'abu_dhabi_grand_prix'
+]
+
+SESSION_TYPES = ['practice1', 'practice2', 'practice3', 'qualifying', 'race']
+
+COMPOUNDS = ['Soft', 'Medium', 'Hard']
+DNF_STATUSES = ['DNF', 'Mechanical', 'Collision', 'Accident']
+
+
+def session_rng(season, race_id, session_type, salt=''):
+    """Generator seeded from the session key, independent of PYTHONHASHSEED and other requests"""
+    key = f"{season}_{race_id}_{session_type}_{salt}".encode('utf-8')
+    seed = int.from_bytes(hashlib.sha256(key).digest()[:8], 'little')
+    return np.random.default_rng(seed)
+
+
+def get_drivers_for_season(season):
+    """Drivers of a season as code -> {'name', 'team'}, nearest known season if not listed"""
+    known = min(SEASON_DRIVERS, key=lambda s: abs(s - season))
+    return {code: {'name': name, 'team': team} for code, (name, team) in SEASON_DRIVERS[known].items()}
+
+
+def get_team_tiers_for_season(season):
+    """Team performance tiers of a season, teams not listed are tier 3"""
+    known = min(SEASON_TEAM_TIERS, key=lambda s: abs(s - season))
+    return dict(SEASON_TEAM_TIERS[known])
+
+
+def track_profile(race_id):
+    """Base lap time, race distance in laps and lap time variance for a track"""
+    race_id = race_id.lower()
+    if 'monaco' in race_id:
+        return 72.0, 78, 0.8  # Higher variance on street circuits
+    elif 'monza' in race_id or 'italian' in race_id:
+        return 80.0, 53, 0.5  # Lower variance on flowing circuits
+    elif 'spa' in race_id or 'belgian' in race_id:
+        return 106.0, 44, 0.6
+    return 90.0, 60, 0.6
+
+
+def session_lap_count(session_type, max_laps):
+    """Number of laps driven in a session type"""
+    if session_type == 'race':
+        return max_laps
+    elif session_type == 'sprint':
+        return max_laps // 3
+    elif session_type == 'qualifying':
+        return 15
+    return 25
+
+
+def generate_lap_arrays(season, race_id, session_type):
+    """Lap times, compounds and tire ages for every driver as (drivers x laps) arrays"""
+    rng = session_rng(season, race_id, session_type, 'laps')
+    drivers = get_drivers_for_season(season)
+    team_tiers = get_team_tiers_for_season(season)
+
+    codes = list(drivers)
+    base_time, max_laps, variance = track_profile(race_id)
+    lap_count = session_lap_count(session_type, max_laps)
+    n = len(codes)
+
+    laps = np.arange(1, lap_count + 1)
+    tiers = np.array([team_tiers.get(drivers[c]['team'], 3) for c in codes])
+    team_factor = (tiers - 1) * 0.7  # Tier 1 teams are fastest
+    driver_factor = rng.uniform(-0.3, 0.3, n)
+
+    if session_type == 'race':
+        # 1 or 2 stops, a single stop is modelled as a second stop after the flag
+        stop_laps = np.sort(rng.integers(lap_count // 3, 2 * lap_count // 3 + 1, (n, 2)), axis=1)
+        one_stop = rng.integers(1, 3, n) == 1
+        stop_laps[one_stop, 1] = lap_count + 1
+        stint = (laps[None, :] > stop_laps[:, :1]).astype(np.int64) + (laps[None, :] > stop_laps[:, 1:])
+        stint_starts = np.concatenate([np.ones((n, 1), dtype=np.int64), stop_laps + 1], axis=1)
+        fuel_factor = np.maximum(0, 1.5 * (1 - laps / lap_count))
+    else:
+        stint = np.zeros((n, lap_count), dtype=np.int64)
+        stint_starts = np.ones((n, 1), dtype=np.int64)
+        fuel_factor = np.zeros(lap_count)
+
+    stint_compounds = rng.integers(0, len(COMPOUNDS), (n, stint_starts.shape[1]))
+    compound = np.take_along_axis(stint_compounds, stint, axis=1)
+    tire_age = laps[None, :] - np.take_along_axis(stint_starts, stint, axis=1)
+
+    tire_factor = np.minimum(0.02 * tire_age, 1.2)
+    track_factor = np.maximum(0, 0.5 * (1 - laps / lap_count))
+    noise = rng.uniform(-variance, variance, (n, lap_count))
+
+    times = base_time + (team_factor + driver_factor)[:, None] + fuel_factor[None, :] \
+        + tire_factor + track_factor[None, :] + noise
+
+    return {
+        'drivers': codes,
+        'driverInfo': drivers,
+        'lap': laps,
+        'time': times,
+        'compound': compound,
+        'tire_age': tire_age,
+        'stint': stint
+    }
+
+
+def generate_lap_data_for_session(season, race_id, session_type):
+    """Synthetic lap data in the /laps response format"""
+    arrays = generate_lap_arrays(season, race_id, session_type)
+    laps = arrays['lap'].tolist()
+
+    laps_data = {}
+    for i, code in enumerate(arrays['drivers']):
+        laps_data[code] = [
+            {"lap": lap, "time": lap_analysis.format_lap_time(t), "compound": COMPOUNDS[c], "tireAge": age}
+            for lap, t, c, age in zip(laps, arrays['time'][i].tolist(), arrays['compound'][i].tolist(),
+                                      arrays['tire_age'][i].tolist())
+        ]
+
+    return {
+        "lapsData": laps_data,
+        "driverInfo": arrays['driverInfo']
+    }
+
+
+def generate_stints(season, race_id, session_type):
+    """Synthetic tire stints in the /strategy response format"""
+    arrays = generate_lap_arrays(season, race_id, session_type)
+    laps = arrays['lap']
+
+    strategies = {}
+    for i, code in enumerate(arrays['drivers']):
+        # Stint boundaries are where the stint index changes
+        starts = np.flatnonzero(np.diff(arrays['stint'][i], prepend=-1))
+        lengths = np.diff(np.append(starts, len(laps)))
+        strategies[code] = [
+            {'compound': COMPOUNDS[arrays['compound'][i, s]], 'laps': int(length), 'startLap': int(laps[s])}
+            for s, length in zip(starts, lengths)
+        ]
+
+    return strategies
+
+
+def generate_session_results(season, race_id, session_type):
+    """Synthetic classification in the session results format"""
+    rng = session_rng(season, race_id, session_type, 'results')
+    drivers = get_drivers_for_season(season)
+    team_tiers = get_team_tiers_for_season(season)
+
+    codes = list(drivers)
+    teams = sorted({info['team'] for info in drivers.values()})
+    team_idx = np.array([teams.index(drivers[c]['team']) for c in codes])
+    tiers = np.array([team_tiers.get(drivers[c]['team'], 3) for c in codes])
+
+    # Tier sets the order, a per-race team factor and driver noise shuffle it
+    race_factor = rng.uniform(-0.5, 0.5, len(teams))
+    score = tiers * 1.0 + race_factor[team_idx] + rng.uniform(-0.4, 0.4, len(codes))
+
+    if session_type == 'race':
+        dnf = rng.random(len(codes)) < 0.10
+        dnf_status = rng.integers(0, len(DNF_STATUSES), len(codes))
+    else:
+        dnf = np.zeros(len(codes), dtype=bool)
+        dnf_status = np.zeros(len(codes), dtype=np.int64)
+
+    # Retirements are classified behind all finishers
+    order = np.lexsort((score, dnf))
+    positions = np.arange(1, len(codes) + 1)
+
+    if session_type == 'race':
+        gaps = positions * 2.5 + rng.uniform(-1.0, 1.0, len(codes))
+    else:
+        gaps = positions * 0.15 + rng.uniform(-0.05, 0.05, len(codes))
+
+    results = []
+    for position, i, gap in zip(positions.tolist(), order.tolist(), gaps.tolist()):
+        status = DNF_STATUSES[dnf_status[i]] if dnf[i] else "Finished"
+        results.append({
+            "position": position,
+            "code": codes[i],
+            "name": drivers[codes[i]]['name'],
+            "team": drivers[codes[i]]['team'],
+            "status": status,
+            "gap": "-" if position == 1 else (status if dnf[i] else f"+{gap:.3f}")
+        })
+
+    return results
+
+
+def generate_session(season, race_id, session_type):
+    """Results, laps and stints of one synthetic session"""
+    return {
+        "results": generate_session_results(season, race_id, session_type),
+        "lapsData": generate_lap_data_for_session(season, race_id, session_type)['lapsData'],
+        "strategies": generate_stints(season, race_id, session_type)
+    }
+
+
+def generate_season(season, session_types=SESSION_TYPES, calendar=SYNTHETIC_CALENDAR):
+    """Yield (race_id, session_type, session) for every session of a synthetic season"""
+    for race_id in calendar:
+        for session_type in session_types:
+            yield race_id, session_type, generate_session(season, race_id, session_type)
+
+
+def write_season_fixtures(season, out_dir, session_types=SESSION_TYPES):
+    """Write a synthetic season as one JSON file per session, returns the number of files"""
+    count = 0
+    for race_id, session_type, session in generate_season(season, session_types):
+        path = os.path.join(out_dir, str(season), race_id, f"{session_type}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(session, f)
+        count += 1
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write synthetic season fixtures as JSON")
+    parser.add_argument('--season', type=int, action='append', required=True)
+    parser.add_argument('--out', default=os.path.join('fixtures', 'synthetic'))
+    args = parser.parse_args()
+
+    for season in args.season:
+        written = write_season_fixtures(season, args.out)
+        print(f"Wrote {written} synthetic sessions for {season} to {args.out}")
@@ -0,0 +1,66 @@
+"""
+Largest-Triangle-Three-Buckets downsampling of lap telemetry
+"""
+import numpy as np
+
+DEFAULT_POINTS = 500
+MAX_POINTS = 5000
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket edges for the points between the fixed first and last point
+    edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(np.int64)
+    starts = edges[:-1]
+    ends = np.maximum(edges[1:], starts + 1)
+
+    # Average point of every bucket, computed for all buckets at once
+    cum_x = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y, dtype=np.float64)))
+    counts = ends - starts
+    avg_x = (cum_x[ends] - cum_x[starts]) / counts
+    avg_y = (cum_y[ends] - cum_y[starts]) / counts
+
+    # The third triangle vertex is the next bucket's average, the last point for the last bucket
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Each choice depends on the previous one, so only the bucket loop stays in Python
+    a = 0
+    for i in range(len(starts)):
+        bx = x[starts[i]:ends[i]]
+        by = y[starts[i]:ends[i]]
+        areas = np.abs((x[a] - next_x[i]) * (by - y[a]) - (x[a] - bx) * (next_y[i] - y[a]))
+        a = starts[i] + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_telemetry(channels, points):
+    """Downsample all channels to the same LTTB selected samples, chosen on the speed trace"""
+    distance = channels['distance']
+    shape_channel = channels.get('speed', distance)
+    keep = lttb_indices(distance, np.nan_to_num(shape_channel), points)
+
+    result = {
+        "rawPoints": int(len(distance)),
+        "points": int(len(keep))
+    }
+    for name, values in channels.items():
+        # float32 channels are widened first so rounding survives the conversion to Python floats
+        rounded = np.round(values[keep].astype(np.float64), 1).tolist()
+        if name in ('gear', 'brake'):
+            result[name] = [None if v != v else int(v) for v in rounded]
+        else:
+            result[name] = [None if v != v else v for v in rounded]
+
+    return result
@@ -0,0 +1,209 @@
+"""
+Memory-mapped per-session telemetry cache
+
+Each session's car data is converted once into fixed-dtype NumPy arrays saved as
+.npy files, one per channel, with every driver's samples stored back to back.
+An index.json file records the row range of every driver and lap, so requests
+read zero-copy slices of the memory maps and worker processes share the pages
+through the OS page cache instead of each holding its own pandas frames. It also
+records when the session data the store was built from was loaded, so stores of
+sessions that have since been reloaded can be told apart and rebuilt.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import structured_logging
+
+logger = structured_logging.get_logger(__name__)
+
+# Stored channels: FastF1 car data column and on-disk dtype
+CHANNELS = {
+    'speed': ('Speed', np.float32),
+    'throttle': ('Throttle', np.float32),
+    'brake': ('Brake', np.int8),
+    'gear': ('nGear', np.int8),
+    'rpm': ('RPM', np.float32)
+}
+
+INDEX_FILE = 'index.json'
+
+
+def store_path(cache_dir, season, event_name, session_type):
+    """Directory holding the telemetry store for a session"""
+    safe_event = event_name.lower().replace(' ', '_')
+    safe_session = session_type.lower().replace(' ', '_')
+    return os.path.join(cache_dir, str(season), safe_event, safe_session)
+
+
+def store_exists(path):
+    """Whether a complete telemetry store has been written at path"""
+    return os.path.exists(os.path.join(path, INDEX_FILE))
+
+
+def remove_store(path):
+    """Delete the telemetry store at path, open memory maps stay readable until closed"""
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def build_store(session, path, loaded_at):
+    """Convert a loaded session's car data into a memory-mappable telemetry store
+
+    loaded_at is when the session was loaded; a store already at path is only
+    replaced when it was built from an older load.
+    """
+    laps = session.laps
+    car_data = session.car_data
+
+    columns = {name: [] for name in CHANNELS}
+    columns['session_time'] = []
+    columns['distance'] = []
+    index = {'loaded_at': loaded_at, 'drivers': {}}
+    row = 0
+
+    for driver_number, data in car_data.items():
+        driver_laps = laps[laps['DriverNumber'] == driver_number]
+        if len(data) == 0 or len(driver_laps) == 0:
+            continue
+
+        driver_code = str(driver_laps['Driver'].iloc[0])
+        session_time = data['SessionTime'].dt.total_seconds().to_numpy(dtype=np.float64)
+
+        # Distance driven since the start of the session, integrated from speed
+        speed = data['Speed'].to_numpy(dtype=np.float64)
+        dt = np.diff(session_time, prepend=session_time[0])
+        distance = np.cumsum(speed / 3.6 * dt)
+
+        columns['session_time'].append(session_time)
+        columns['distance'].append(distance)
+        for name, (column, dtype) in CHANNELS.items():
+            if column in data.columns:
+                values = pd.to_numeric(data[column], errors='coerce').fillna(0).to_numpy()
+            else:
+                values = np.zeros(len(data))
+            columns[name].append(values.astype(dtype))
+
+        # Lap boundaries as row offsets into this driver's samples
+        starts = driver_laps['LapStartTime'].dt.total_seconds().to_numpy(dtype=np.float64)
+        ends = driver_laps['Time'].dt.total_seconds().to_numpy(dtype=np.float64)
+        lap_numbers = driver_laps['LapNumber'].to_numpy(dtype=np.float64)
+        valid = ~(np.isnan(starts) | np.isnan(ends) | np.isnan(lap_numbers))
+
+        start_rows = np.searchsorted(session_time, starts[valid], side='left') + row
+        end_rows = np.searchsorted(session_time, ends[valid], side='right') + row
+
+        index['drivers'][driver_code] = {
+            'start': row,
+            'end': row + len(session_time),
+            'laps': {
+                str(int(lap)): [int(s), int(e)]
+                for lap, s, e in zip(lap_numbers[valid], start_rows, end_rows)
+            }
+        }
+        row += len(session_time)
+
+    # Write to a private directory first and rename it into place, so concurrent
+    # workers never see a half written store
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    os.makedirs(tmp_path, exist_ok=True)
+
+    for name, parts in columns.items():
+        if name == 'session_time' or name == 'distance':
+            dtype = np.float64
+        else:
+            dtype = CHANNELS[name][1]
+        values = np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+        np.save(os.path.join(tmp_path, f"{name}.npy"), values)
+
+    with open(os.path.join(tmp_path, INDEX_FILE), 'w') as f:
+        json.dump(index, f)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if store_exists(path) and store_loaded_at(path) < loaded_at:
+        # Move the outdated store aside, readers still holding its memory maps keep them
+        old_path = f"{path}.old-{os.getpid()}"
+        try:
+            os.rename(path, old_path)
+        except OSError:
+            pass  # Another worker replaced it first
+        remove_store(old_path)
+
+    try:
+        os.rename(tmp_path, path)
+        logger.info("Telemetry store written", path=path, samples=row)
+    except OSError:
+        # Another worker finished the same store first
+        remove_store(tmp_path)
+
+
+def store_loaded_at(path):
+    """When the session data of the store at path was loaded, 0 for stores written before this was recorded"""
+    with open(os.path.join(path, INDEX_FILE)) as f:
+        return json.load(f).get('loaded_at', 0.0)
+
+
+def open_store(path):
+    """Open a telemetry store with every channel memory-mapped read-only"""
+    with open(os.path.join(path, INDEX_FILE)) as f:
+        index = json.load(f)
+
+    arrays = {}
+    for name in list(CHANNELS) + ['session_time', 'distance']:
+        arrays[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+
+    return {'path': path, 'index': index, 'arrays': arrays, 'loaded_at': index.get('loaded_at', 0.0)}
+
+
+def lap_rows(store, driver_code, lap_number):
+    """Row slice of one lap in the store, or None if the lap is not indexed"""
+    driver = store['index']['drivers'].get(driver_code)
+    if driver is None:
+        return None
+
+    bounds = driver['laps'].get(str(lap_number))
+    if bounds is None or bounds[1] <= bounds[0]:
+        return None
+
+    return slice(bounds[0], bounds[1])
+
+
+def driver_rows(store, driver_code):
+    """Row slice of all of a driver's samples, or None if the driver is not stored"""
+    driver = store['index']['drivers'].get(driver_code)
+    if driver is None:
+        return None
+    return slice(driver['start'], driver['end'])
+
+
+def lap_channels(store, driver_code, lap_number):
+    """Channels of one lap as views into the memory maps, with distance from the lap start"""
+    return row_channels(store, lap_rows(store, driver_code, lap_number))
+
+
+def driver_channels(store, driver_code):
+    """Channels of a driver's whole session as views into the memory maps, with distance from its start"""
+    return row_channels(store, driver_rows(store, driver_code))
+
+
+def row_channels(store, rows):
+    """Channels of a row slice as views into the memory maps, None for no slice or an empty one"""
+    if rows is None or rows.stop <= rows.start:
+        return None
+
+    arrays = store['arrays']
+    distance = arrays['distance'][rows]
+
+    channels = {'distance': distance - distance[0]}
+    for name in ('speed', 'throttle', 'brake', 'gear'):
+        channels[name] = arrays[name][rows]
+
+    return channels
+
+
+def max_speed(store):
+    """Highest speed recorded by any driver in the session"""
+    speed = store['arrays']['speed']
+    return float(speed.max()) if len(speed) > 0 else 0.0
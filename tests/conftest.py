@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# The modules under test live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def server(tmp_path_factory):
+    """The server module on generated local sessions, with its disk caches in a scratch directory"""
+    work_dir = tmp_path_factory.mktemp('server')
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('F1_DATA_SOURCE', 'local')
+        patch.setenv('F1_LOCAL_DATA_DIR', str(work_dir / 'recorded_sessions'))
+        patch.setenv('F1_SESSION_REFRESH', '0')
+        # Telemetry stores and sketches are written relative to the working directory
+        patch.chdir(work_dir)
+        import server
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
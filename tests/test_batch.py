@@ -0,0 +1,91 @@
+import json
+import threading
+
+BATCH = '/api/batch'
+
+
+def batch_lines(client, sessions):
+    response = client.post(BATCH, json={'sessions': sessions})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_batch_items_match_the_race_data_route(client):
+    sessions = [{'season': 2023, 'raceId': 'bahrain_grand_prix', 'sessionType': 'race'},
+                {'season': 2023, 'raceId': 'monaco_grand_prix', 'sessionType': 'qualifying'}]
+    lines = batch_lines(client, sessions)
+
+    assert sorted(line['index'] for line in lines) == [0, 1]
+    for line in lines:
+        item = sessions[line['index']]
+        assert {key: line[key] for key in item} == item
+        assert line['status'] == 200
+        assert line['data'] == client.get(f"/api/season/2023/race/{item['raceId']}/{item['sessionType']}").get_json()
+
+
+def test_bad_items_fail_alone_and_come_first(client):
+    sessions = [{'season': 2023, 'raceId': 'bahrain_grand_prix', 'sessionType': 'race'},
+                {'season': '2023', 'raceId': 'bahrain_grand_prix', 'sessionType': 'race'},
+                {'season': 1900, 'raceId': 'bahrain_grand_prix', 'sessionType': 'race'},
+                {'season': 2023, 'raceId': 'bahrain_grand_prix', 'sessionType': 'fp9'},
+                {'season': 2023, 'raceId': 'no_such_grand_prix', 'sessionType': 'race'},
+                'race']
+    lines = batch_lines(client, sessions)
+
+    # Items rejected before any session load are written ahead of the loaded ones, in request order
+    assert [(line['index'], line['status']) for line in lines] == [(1, 400), (2, 404), (3, 400), (4, 404), (5, 400),
+                                                                  (0, 200)]
+    assert lines[3]['error'] == 'Race not found: no_such_grand_prix'
+    assert all('data' not in line for line in lines[:-1])
+    assert 'error' not in lines[-1]
+
+
+def test_lines_arrive_in_completion_order(server, client, monkeypatch):
+    # The first session only finishes once the second one has
+    second_done = threading.Event()
+    batch_race_data = server.batch_race_data
+
+    def ordered_race_data(season, event_name, session_type):
+        if event_name == 'Bahrain Grand Prix':
+            assert second_done.wait(10)
+            return batch_race_data(season, event_name, session_type)
+        try:
+            return batch_race_data(season, event_name, session_type)
+        finally:
+            second_done.set()
+
+    monkeypatch.setattr(server, 'batch_race_data', ordered_race_data)
+    lines = batch_lines(client, [{'season': 2023, 'raceId': 'bahrain_grand_prix', 'sessionType': 'race'},
+                                 {'season': 2023, 'raceId': 'monaco_grand_prix', 'sessionType': 'race'}])
+
+    assert [line['index'] for line in lines] == [1, 0]
+    assert [line['raceId'] for line in lines] == ['monaco_grand_prix', 'bahrain_grand_prix']
+
+
+def test_failed_sessions_are_reported_per_item(server, client, monkeypatch):
+    batch_race_data = server.batch_race_data
+
+    def failing_race_data(season, event_name, session_type):
+        if event_name == 'Monaco Grand Prix':
+            raise RuntimeError('timing feed unavailable')
+        return batch_race_data(season, event_name, session_type)
+
+    monkeypatch.setattr(server, 'batch_race_data', failing_race_data)
+    lines = batch_lines(client, [{'season': 2023, 'raceId': 'bahrain_grand_prix', 'sessionType': 'race'},
+                                 {'season': 2023, 'raceId': 'monaco_grand_prix', 'sessionType': 'race'}])
+
+    by_index = {line['index']: line for line in lines}
+    assert by_index[0]['status'] == 200
+    assert by_index[1]['status'] == 500 and by_index[1]['error'] == 'timing feed unavailable'
+
+
+def test_malformed_batches_are_rejected(server, client):
+    assert client.post(BATCH, json={}).status_code == 400
+    assert client.post(BATCH, json={'sessions': []}).status_code == 400
+    assert client.post(BATCH, data='not json', content_type='application/json').status_code == 400
+
+    item = {'season': 2023, 'raceId': 'bahrain_grand_prix', 'sessionType': 'race'}
+    response = client.post(BATCH, json={'sessions': [item] * (server.BATCH_MAX_SESSIONS + 1)})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": f"At most {server.BATCH_MAX_SESSIONS} sessions per batch"}
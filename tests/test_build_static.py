@@ -0,0 +1,113 @@
+import glob
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import build_static
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+SHIPPED_SCRIPTS = sorted(glob.glob(os.path.join(STATIC_DIR, '*.js')))
+
+needs_node = pytest.mark.skipif(shutil.which('node') is None, reason="node is not installed")
+
+# Snippets where '/' has to be told apart as division, regex or comment, each ending in an expression
+EDGE_CASES = [
+    "const a = 10, b = 2, c = 5;\n(a) / b / c",
+    "const x = [8]; x[0] / 2 / 2",
+    "function f(s) { return /ab+c/g.test(s) }\nf('xabbc')",
+    "const s = 'a // not a comment /* nor this */'; s",
+    "const r = /[/\\]]+/; r.source",
+    "const n = 3; `n=${ /3/.test(String(n)) ? n / 1 : 0 } ${ `${n}/${n}` }`",
+    "let y = 4\n/* block */\ny = y / 2 /* trailing */ / 2\ny",
+    "const o = { a: 1 }; typeof /x/ + ' ' + (o.a / 1)",
+    "const t = `line\n  kept   as is`; t",
+    "var i = 1; i++ / 1",
+]
+
+
+def node_eval(source):
+    result = subprocess.run(['node', '-e', f"console.log(JSON.stringify(eval({json.dumps(source)})))"],
+                            capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_minify_js_strips_comments_and_spaces():
+    source = "// header\nfunction add(a, b) {\n    /* sum */\n    return a + b;  // done\n}\n"
+    assert build_static.minify_js(source) == "function add(a,b){\nreturn a + b;\n}"
+
+
+def test_minify_js_keeps_literals_verbatim():
+    source = "const s = \"a  ,  b\";\nconst t = `x  ${ y }  z`;\nconst r = /a  b/g;"
+    assert build_static.minify_js(source) == "const s=\"a  ,  b\";\nconst t=`x  ${ y }  z`;\nconst r=/a  b/g;"
+
+
+def test_minify_js_division_after_paren_and_regex_after_return():
+    assert build_static.minify_js("x = (a) / 2 / 3") == "x=(a)/ 2 / 3"
+    assert build_static.minify_js("return /ab+c/g.test(x)") == "return /ab+c/g.test(x)"
+
+
+@pytest.mark.parametrize('source', ["x = 'abc", "x = \"abc\ny\"", "x = /abc", "r = /[/", "x = 1 /* open", "t = `a ${b"])
+def test_minify_js_rejects_unterminated_literals(source):
+    with pytest.raises(ValueError):
+        build_static.minify_js(source)
+
+
+@needs_node
+@pytest.mark.parametrize('source', EDGE_CASES)
+def test_minify_js_preserves_behaviour(source):
+    assert node_eval(build_static.minify_js(source)) == node_eval(source)
+
+
+@needs_node
+@pytest.mark.parametrize('path', SHIPPED_SCRIPTS, ids=os.path.basename)
+def test_minify_js_shipped_scripts_stay_valid(path, tmp_path):
+    with open(path) as f:
+        minified = build_static.minify_js(f.read())
+
+    target = tmp_path / os.path.basename(path)
+    target.write_text(minified)
+    result = subprocess.run(['node', '--check', str(target)], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.parametrize('path', SHIPPED_SCRIPTS, ids=os.path.basename)
+def test_minify_js_is_idempotent(path):
+    with open(path) as f:
+        minified = build_static.minify_js(f.read())
+    assert build_static.minify_js(minified) == minified
+
+
+def test_minify_css():
+    source = "/* theme */\n.a  >  .b {\n    color: red;\n    content: \"a ; b\";\n}\n"
+    assert build_static.minify_css(source) == ".a>.b{color:red;content:\"a ; b\"}"
+
+
+def test_build_keeps_workers_out_of_the_bundle(tmp_path):
+    (tmp_path / 'index.html').write_text(
+        '<link rel="stylesheet" href="styles.css">\n'
+        '<script src="first.js"></script>\n'
+        '<script src="lap-data-worker.js"></script>\n'
+        '<script src="second.js"></script>\n'
+    )
+    (tmp_path / 'styles.css').write_text('body { margin: 0; }')
+    (tmp_path / 'first.js').write_text('const first = 1;')
+    (tmp_path / 'lap-data-worker.js').write_text('const worker = 2;')
+    (tmp_path / 'second.js').write_text('const second = 3;')
+
+    manifest = build_static.build(str(tmp_path))
+
+    dist = tmp_path / build_static.DIST_DIR_NAME
+    assert manifest['scripts'] == ['first.js', 'second.js']
+    worker = manifest['workers']['lap-data-worker.js']
+    assert worker.startswith('lap-data-worker.') and worker.endswith('.js')
+    assert 'worker' not in (dist / manifest['bundle']).read_text()
+    assert (dist / worker).read_text() == 'const worker=2;'
+    assert (dist / f"{worker}.gz").exists()
+
+    index = (dist / 'index.html').read_text()
+    assert index.index(f'dist/{worker}') < index.index(f'dist/{manifest["bundle"]}')
+    assert 'src="first.js"' not in index and 'src="lap-data-worker.js"' not in index
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+import data_sources
+
+
+class RecordedSession:
+    """Session as a source hands it to record_session"""
+
+    def __init__(self, laps, results, car_data):
+        self.laps = laps
+        self.results = results
+        self.car_data = car_data
+
+    def load(self):
+        pass
+
+
+class FixedSource(data_sources.DataSource):
+    """Source serving one prepared session, like FastF1 would for a sprint weekend"""
+
+    def __init__(self, schedule, session):
+        self.schedule = schedule
+        self.session = session
+
+    def get_event_schedule(self, season):
+        return self.schedule
+
+    def get_session(self, season, event_name, session_type):
+        return self.session
+
+
+def assert_same_session(session, expected):
+    pd.testing.assert_frame_equal(session.laps, expected.laps)
+    pd.testing.assert_frame_equal(session.results, expected.results)
+    assert set(session.car_data) == set(expected.car_data)
+    for driver, data in expected.car_data.items():
+        pd.testing.assert_frame_equal(session.car_data[driver], data)
+
+
+def test_recorded_session_round_trips_through_get_session(tmp_path):
+    # Only a few laps of two drivers, so the recording cannot be mistaken for a generated session
+    laps = data_sources.synthetic_laps_frame(2023, 'bahrain_grand_prix', 'race')
+    results = data_sources.synthetic_results_frame(2023, 'bahrain_grand_prix', 'race', laps).head(2)
+    laps = laps[laps['Driver'].isin(results['Abbreviation']) & (laps['LapNumber'] <= 5)].reset_index(drop=True)
+    laps['LapTime'] += pd.to_timedelta(1.5, unit='s')
+    recorded = RecordedSession(laps, results, data_sources.synthetic_car_data(laps))
+    schedule = data_sources.synthetic_schedule(2023)
+    source = FixedSource(schedule, recorded)
+
+    path = data_sources.record_session(source, 2023, 'Bahrain Grand Prix', 'Sprint', root=str(tmp_path))
+    assert path == str(tmp_path / '2023' / 'bahrain_grand_prix' / 'sprint')
+
+    local = data_sources.LocalSource(root=str(tmp_path))
+    pd.testing.assert_frame_equal(local.get_event_schedule(2023), schedule)
+
+    # Event names match regardless of case
+    session = local.get_session(2023, 'bahrain grand prix', 'Sprint')
+    session.load()
+    assert session.name == 'Sprint'
+    assert session.event['EventName'] == 'Bahrain Grand Prix'
+    assert session.event.year == 2023
+    assert_same_session(session, recorded)
+
+
+def test_recording_a_synthetic_session_reads_back_the_same(tmp_path):
+    generated = data_sources.LocalSource(root=str(tmp_path / 'empty'))
+    data_sources.record_session(generated, 2023, 'Monaco Grand Prix', 'Qualifying', root=str(tmp_path / 'recorded'))
+
+    expected = generated.get_session(2023, 'Monaco Grand Prix', 'Qualifying')
+    expected.load()
+    session = data_sources.LocalSource(root=str(tmp_path / 'recorded')).get_session(2023, 'Monaco Grand Prix',
+                                                                                     'Qualifying')
+    session.load()
+    assert_same_session(session, expected)
+
+
+def test_get_session_rejects_unknown_events_and_sessions(tmp_path):
+    local = data_sources.LocalSource(root=str(tmp_path))
+
+    with pytest.raises(ValueError, match='No event named'):
+        local.get_session(2023, 'Atlantis Grand Prix', 'Race')
+    # Nothing recorded and no generator for it, as for an event without a sprint
+    with pytest.raises(ValueError, match='does not exist for this event'):
+        local.get_session(2023, 'Bahrain Grand Prix', 'Sprint')
@@ -0,0 +1,41 @@
+import pytest
+
+import lap_analysis
+
+DEGRADATION = '/api/season/2023/race/monaco_grand_prix/race/degradation'
+
+
+def degradation_keys(server):
+    entry = server.get_cached_entry(2023, 'Monaco Grand Prix', 'Race')
+    return {name for name in entry['artifacts'] if isinstance(name, tuple) and name[0] == 'degradation'}
+
+
+def test_fuel_effects_share_artifacts_on_a_bounded_grid(server, client):
+    server.clear_caches()
+    values = ['0.0301', '0.03049', '0.0299999', '5', '1e9', '-3', '0.2']
+    fuel_effects = [client.get(f'{DEGRADATION}?fuelEffect={value}').get_json()['fuelEffect'] for value in values]
+
+    assert fuel_effects == [0.03, 0.03, 0.03, 0.2, 0.2, 0.0, 0.2]
+    assert degradation_keys(server) == {('degradation', 0.03, 1), ('degradation', 0.2, 1), ('degradation', 0.0, 1)}
+
+
+@pytest.mark.parametrize('value', ['nan', 'inf', '-inf'])
+def test_non_finite_fuel_effects_are_rejected(client, value):
+    assert client.get(f'{DEGRADATION}?fuelEffect={value}').status_code == 400
+
+
+def test_fits_come_from_the_cached_session(server, client):
+    server.clear_caches()
+    body = client.get(f'{DEGRADATION}?fuelEffect=0.05&degree=2').get_json()
+
+    session = server.get_cached_entry(2023, 'Monaco Grand Prix', 'Race')['session']
+    assert body['stints'] == lap_analysis.fit_degradation(lap_analysis.build_lap_table(session.laps), 0.05, 2)
+
+
+def test_quantize_fuel_effect():
+    assert lap_analysis.quantize_fuel_effect(0.0314) == 0.031
+    assert lap_analysis.quantize_fuel_effect(0.0315) == 0.032
+    assert lap_analysis.quantize_fuel_effect(-1.0) == 0.0
+    assert lap_analysis.quantize_fuel_effect(1.0) == lap_analysis.MAX_FUEL_EFFECT
+    grid = {lap_analysis.quantize_fuel_effect(value / 10**5) for value in range(-1000, 30000)}
+    assert len(grid) == round(lap_analysis.MAX_FUEL_EFFECT / lap_analysis.FUEL_EFFECT_STEP) + 1
@@ -0,0 +1,29 @@
+import lap_analysis
+
+DISTRIBUTION = '/api/season/2023/race/bahrain_grand_prix/race/distribution'
+
+
+def session_table(server):
+    return server.get_session_lap_table(2023, 'Bahrain Grand Prix', 'Race')
+
+
+def test_distribution_by_stint_with_min_stint_laps(server, client):
+    body = client.get(f'{DISTRIBUTION}?by=stint&minStintLaps=15').get_json()
+
+    table = session_table(server)
+    assert body['by'] == 'stint' and body['minStintLaps'] == 15
+    assert body['groups'] == lap_analysis.distribution_stats(table, 'stint', 15)
+    lengths = lap_analysis.stint_lengths(table)
+    assert sum(group['count'] for group in body['groups'].values()) == int((lengths >= 15).sum())
+
+
+def test_distribution_of_one_driver(server, client):
+    table = session_table(server)
+    driver = table['drivers'][0]
+
+    body = client.get(f'{DISTRIBUTION}?by=compound&driver={driver.lower()}').get_json()
+    assert body['groups'] == lap_analysis.distribution_stats(table, 'compound', driver_code=driver)
+
+
+def test_distribution_rejects_unknown_groupings(client):
+    assert client.get(f'{DISTRIBUTION}?by=team').status_code == 400
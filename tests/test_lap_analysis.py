@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import lap_analysis
+
+
+def stint_laps(driver, compound, stint, first_lap, base, slope, count):
+    """Laps of one stint whose fuel corrected time grows by slope per lap of tire age"""
+    laps = np.arange(first_lap, first_lap + count)
+    tire_age = np.arange(1, count + 1)
+    return pd.DataFrame({
+        'Driver': driver,
+        'LapNumber': laps.astype(np.float64),
+        'LapTime': pd.to_timedelta(base + slope * tire_age, unit='s'),
+        'Compound': compound,
+        'TyreLife': tire_age.astype(np.float64),
+        'Stint': float(stint)
+    })
+
+
+def lap_table(*stints):
+    return lap_analysis.build_lap_table(pd.concat(stints, ignore_index=True))
+
+
+def test_fit_degradation_recovers_the_slope_of_each_stint():
+    table = lap_table(stint_laps('VER', 'SOFT', 1, 1, 90.0, 0.08, 15),
+                      stint_laps('VER', 'HARD', 2, 16, 91.0, 0.03, 25),
+                      stint_laps('LEC', 'MEDIUM', 1, 1, 90.5, 0.05, 20))
+
+    stints = lap_analysis.fit_degradation(table, fuel_effect=0.0)
+    by_key = {(s['driver'], s['stint']): s for s in stints}
+
+    assert set(by_key) == {('VER', 1), ('VER', 2), ('LEC', 1)}
+    assert by_key[('VER', 1)]['degradation'] == 0.08
+    assert by_key[('VER', 2)]['degradation'] == 0.03
+    assert by_key[('LEC', 1)]['degradation'] == 0.05
+    assert by_key[('VER', 2)]['compound'] == 'Hard'
+    assert by_key[('VER', 2)]['startLap'] == 16
+    assert by_key[('VER', 2)]['laps'] == 25
+    # The out lap of each stint is not fitted
+    assert by_key[('VER', 2)]['lapsFitted'] == 24
+    assert by_key[('VER', 1)]['r2'] == 1.0
+
+
+def test_fit_degradation_removes_the_fuel_effect():
+    fuel_effect = 0.06
+    stint = stint_laps('VER', 'HARD', 1, 1, 90.0, 0.04, 30)
+    # Heavier early laps are slower by the fuel effect per remaining lap
+    stint['LapTime'] += pd.to_timedelta(fuel_effect * (30 - stint['LapNumber']), unit='s')
+
+    stints = lap_analysis.fit_degradation(lap_table(stint), fuel_effect=fuel_effect)
+    assert stints[0]['degradation'] == 0.04
+
+
+def test_fit_degradation_skips_short_stints_and_outliers():
+    stint = stint_laps('VER', 'SOFT', 1, 1, 90.0, 0.05, 12)
+    stint.loc[6, 'LapTime'] = pd.to_timedelta(150, unit='s')  # A lap behind the safety car
+    table = lap_table(stint, stint_laps('LEC', 'SOFT', 1, 1, 90.0, 0.05, 3))
+
+    stints = lap_analysis.fit_degradation(table, fuel_effect=0.0)
+    assert [s['driver'] for s in stints] == ['VER']
+    assert stints[0]['degradation'] == 0.05
+    assert stints[0]['lapsFitted'] == 10
+
+
+def test_fit_degradation_of_no_laps():
+    assert lap_analysis.fit_degradation(lap_analysis.empty_lap_table()) == []
+
+
+def driver_laps(driver, laps, times, stints):
+    return pd.DataFrame({
+        'Driver': driver,
+        'LapNumber': np.asarray(laps, dtype=np.float64),
+        'LapTime': pd.to_timedelta(times, unit='s'),
+        'Compound': 'MEDIUM',
+        'Stint': np.asarray(stints, dtype=np.float64)
+    })
+
+
+def test_compare_drivers_aligns_laps_both_drivers_completed():
+    # VER has no time for lap 4 and pitted on lap 6, LEC started on lap 2 and ran to lap 12
+    ver_laps = [1, 2, 3, 5, 6, 7, 8, 9, 10]
+    ver_times = [95.0, 92.0, 91.8, 91.9, 112.4, 92.2, 92.0, 91.7, 91.6]
+    lec_laps = list(range(2, 13))
+    lec_times = [92.3, 92.1, 92.0, 92.2, 92.4, 110.9, 92.5, 92.1, 91.9, 91.8, 91.7]
+    table = lap_table(driver_laps('VER', ver_laps + [4], ver_times + [np.nan], [1] * 5 + [2] * 4 + [1]),
+                      driver_laps('LEC', lec_laps, lec_times, [1] * 6 + [2] * 5))
+
+    comparison = lap_analysis.compare_drivers(table, 'VER', 'LEC', window=3)
+
+    # A pandas merge on the lap number is the reference
+    ver = pd.DataFrame({'lap': ver_laps, 'a': ver_times, 'stint': [1] * 5 + [2] * 4})
+    lec = pd.DataFrame({'lap': lec_laps, 'b': lec_times, 'stint': [1] * 6 + [2] * 5})
+    ver['norm_a'] = ver['a'] - ver.groupby('stint')['a'].transform('median')
+    lec['norm_b'] = lec['b'] - lec.groupby('stint')['b'].transform('median')
+    merged = ver.merge(lec, on='lap').sort_values('lap')
+    delta = merged['a'] - merged['b']
+
+    assert comparison['laps'] == [2, 3, 5, 6, 7, 8, 9, 10]
+    assert comparison['delta'] == np.round(delta, 3).tolist()
+    assert comparison['cumulativeGap'] == np.round(delta.cumsum(), 3).tolist()
+    assert comparison['stintDelta'] == np.round(merged['norm_a'] - merged['norm_b'], 3).tolist()
+    for driver, column in (('VER', 'a'), ('LEC', 'b')):
+        expected = merged[column].rolling(3).median().round(3)
+        assert comparison['rollingPace'][driver] == [None if np.isnan(v) else v for v in expected]
+    assert comparison['summary'] == {
+        'lapsCompared': 8,
+        'meanDelta': round(float(delta.mean()), 3),
+        'medianDelta': round(float(delta.median()), 3),
+        'lapsFasterA': int((delta < 0).sum())
+    }
+
+
+def test_compare_drivers_without_common_laps():
+    table = lap_table(driver_laps('VER', [1, 2], [91.0, 91.5], [1, 1]),
+                      driver_laps('LEC', [3, 4], [92.0, 92.5], [1, 1]))
+
+    comparison = lap_analysis.compare_drivers(table, 'VER', 'LEC')
+    assert comparison['laps'] == [] and comparison['delta'] == []
+    assert comparison['rollingPace'] == {'VER': [], 'LEC': []}
+    assert comparison['summary'] == {'lapsCompared': 0, 'meanDelta': None, 'medianDelta': None, 'lapsFasterA': 0}
+
+
+def test_compare_drivers_rejects_unknown_drivers():
+    table = lap_table(driver_laps('VER', [1, 2], [91.0, 91.5], [1, 1]))
+    with pytest.raises(KeyError):
+        lap_analysis.compare_drivers(table, 'VER', 'HAM')
+
+
+def stint_of(driver, compound, stint, first_lap, times):
+    return pd.DataFrame({
+        'Driver': driver,
+        'LapNumber': np.arange(first_lap, first_lap + len(times), dtype=np.float64),
+        'LapTime': pd.to_timedelta(times, unit='s'),
+        'Compound': compound,
+        'Stint': float(stint)
+    })
+
+
+def distribution_table():
+    # VER: 6 soft laps with a slow outlier then 3 hard laps, LEC: 5 medium laps
+    return lap_table(stint_of('VER', 'SOFT', 1, 1, [90.0, 90.2, 90.4, 90.6, 90.8, 99.0]),
+                     stint_of('VER', 'HARD', 2, 7, [91.0, 91.1, 91.2]),
+                     stint_of('LEC', 'MEDIUM', 1, 1, [90.5, 90.5, 90.7, 90.9, 91.1]))
+
+
+def test_distribution_stats_groups_laps_by_driver_compound_and_stint():
+    table = distribution_table()
+
+    by_driver = lap_analysis.distribution_stats(table, 'driver')
+    assert {name: s['count'] for name, s in by_driver.items()} == {'LEC': 5, 'VER': 9}
+
+    by_compound = lap_analysis.distribution_stats(table, 'compound')
+    assert {name: s['count'] for name, s in by_compound.items()} == {'Soft': 6, 'Medium': 5, 'Hard': 3}
+
+    by_stint = lap_analysis.distribution_stats(table, 'stint')
+    assert {name: s['count'] for name, s in by_stint.items()} == {'LEC-1': 5, 'VER-1': 6, 'VER-2': 3}
+
+    with pytest.raises(ValueError):
+        lap_analysis.distribution_stats(table, 'team')
+
+
+def test_distribution_stats_matches_numpy_quantiles():
+    soft = np.array([90.0, 90.2, 90.4, 90.6, 90.8, 99.0])
+    stats = lap_analysis.distribution_stats(distribution_table(), 'compound')['Soft']
+
+    expected = np.quantile(soft, lap_analysis.DISTRIBUTION_QUANTILES)
+    assert list(stats['quantiles']) == ['p5', 'p10', 'p25', 'p50', 'p75', 'p90', 'p95']
+    assert list(stats['quantiles'].values()) == np.round(expected, 3).tolist()
+    q1, q3 = np.quantile(soft, [0.25, 0.75])
+    assert stats['iqr'] == round(q3 - q1, 3)
+    assert stats['mean'] == round(soft.mean(), 3)
+    # The 99.0 lap lies outside the Tukey fences and is left out of the filtered mean
+    assert stats['filteredMean'] == round(soft[:-1].mean(), 3)
+
+
+def test_distribution_stats_filters_short_stints_and_drivers():
+    table = distribution_table()
+
+    stats = lap_analysis.distribution_stats(table, 'stint', min_stint_laps=5)
+    assert {name: s['count'] for name, s in stats.items()} == {'LEC-1': 5, 'VER-1': 6}
+
+    stats = lap_analysis.distribution_stats(table, 'compound', min_stint_laps=4, driver_code='VER')
+    assert {name: s['count'] for name, s in stats.items()} == {'Soft': 6}
+
+    assert lap_analysis.distribution_stats(table, 'driver', min_stint_laps=7) == {}
+    assert lap_analysis.distribution_stats(table, 'driver', driver_code='HAM') == {}
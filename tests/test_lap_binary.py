@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import lap_analysis
+import lap_binary
+from data_sources import synthetic_laps_frame
+
+
+def test_lap_table_round_trip():
+    table = lap_analysis.build_lap_table(synthetic_laps_frame(2023, 'bahrain_grand_prix', 'race'))
+    data = lap_binary.encode_lap_table(table)
+    header, columns = lap_binary.decode(data)
+
+    assert header['count'] == len(table['lap'])
+    assert header['drivers'] == table['drivers']
+    assert header['compounds'] == lap_analysis.COMPOUNDS
+    assert np.array_equal(columns['lap'], table['lap'])
+    assert np.array_equal(columns['driver'], table['driver'])
+    assert np.array_equal(columns['compound'], table['compound'])
+    assert np.array_equal(columns['tireAge'], np.clip(table['tire_age'], 0, None))
+    assert np.array_equal(columns['lapTimeMs'], np.rint(table['time'] * 1000))
+
+
+def test_columns_are_aligned_for_typed_array_views():
+    data = lap_binary.encode_laps_data({'VER': [{'lap': 1, 'time': '1:32.456', 'compound': 'SOFT', 'tireAge': 1}]})
+    header, _ = lap_binary.decode(data)
+    assert len(data) % lap_binary.ALIGNMENT == 0
+    assert all(column['offset'] % lap_binary.ALIGNMENT == 0 for column in header['columns'])
+
+
+def test_laps_data_round_trip():
+    laps_data = {
+        'LEC': [{'lap': 2, 'time': '1:33.001', 'compound': 'Hard', 'tireAge': 3},
+                {'lap': 1, 'time': '95.5', 'compound': None, 'tireAge': None}],
+        'ALB': [{'lap': 1, 'time': '1:40.000', 'compound': 'Intermediate', 'tireAge': -1}]
+    }
+    header, columns = lap_binary.decode(lap_binary.encode_laps_data(laps_data))
+
+    assert header['drivers'] == ['ALB', 'LEC']
+    assert columns['driver'].tolist() == [0, 1, 1]
+    assert columns['lap'].tolist() == [1, 1, 2]
+    assert columns['lapTimeMs'].tolist() == [100000, 95500, 93001]
+    assert columns['tireAge'].tolist() == [0, 0, 3]
+    assert [header['compounds'][c] for c in columns['compound']] == ['Intermediate', 'Unknown', 'Hard']
+
+
+def test_empty_payload():
+    header, columns = lap_binary.decode(lap_binary.encode_laps_data({}))
+    assert header['count'] == 0
+    assert all(len(column) == 0 for column in columns.values())
+
+
+def test_decode_rejects_other_data():
+    with pytest.raises(ValueError):
+        lap_binary.decode(b'{"lapsData": {}}')
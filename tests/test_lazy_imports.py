@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+
+import lazy_imports
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Requests a fresh fast-startup server through its light endpoints, then one that is not light
+PROBE = """
+import json
+import lazy_imports, server
+
+client = server.app.test_client()
+status = {}
+for path in ('/api/test', '/api/seasons', '/metrics', '/admin/profiles', '/', '/index.html', '/static/index.html'):
+    status[path] = client.get(path).status_code
+status['POST /api/seasons'] = client.post('/api/seasons').status_code
+light = {name: lazy_imports.is_loaded(name) for name in ('pandas', 'numpy', 'fastf1', 'lap_analysis')}
+light_endpoints = sorted(server.app.view_functions.keys() & server.LIGHT_ENDPOINTS)
+
+status['distribution'] = client.get('/api/season/2023/race/bahrain_grand_prix/fp9/distribution').status_code
+heavy = {name: lazy_imports.is_loaded(name) for name in ('pandas', 'lap_analysis')}
+print(json.dumps({'status': status, 'light': light, 'heavy': heavy, 'endpoints': light_endpoints}))
+"""
+
+
+def run_probe(tmp_path):
+    # The FastF1 source, which must not import FastF1 before a session is needed
+    env = dict(os.environ, F1_FAST_STARTUP='1', F1_DATA_SOURCE='fastf1', F1_SESSION_REFRESH='0',
+               PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get('PYTHONPATH')])))
+    env.pop('F1_PROFILE', None)
+    result = subprocess.run([sys.executable, '-c', PROBE], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_light_endpoints_do_not_import_pandas_or_fastf1(tmp_path):
+    probe = run_probe(tmp_path)
+
+    assert probe['endpoints'] == sorted(['static', 'serve_static', 'get_seasons', 'test_api', 'get_metrics',
+                                         'list_request_profiles', 'get_request_profile'])
+    assert probe['status']['/api/test'] == 200
+    assert probe['status']['/api/seasons'] == 200
+    assert probe['status']['/metrics'] == 200
+    assert probe['status']['/'] == 200
+    # Routing answers these without an endpoint
+    assert probe['status']['/index.html'] == 308
+    assert probe['status']['POST /api/seasons'] == 405
+    assert probe['light'] == {'pandas': False, 'numpy': False, 'fastf1': False, 'lap_analysis': False}
+
+    # Any other request loads the deferred modules before its handler runs, even one it rejects
+    assert probe['status']['distribution'] == 400
+    assert probe['heavy'] == {'pandas': True, 'lap_analysis': True}
+
+
+def test_import_module_without_fast_startup_imports_now(monkeypatch):
+    monkeypatch.setattr(lazy_imports, 'FAST_STARTUP', False)
+    module = lazy_imports.import_module('json')
+    assert module is json and lazy_imports.is_loaded('json')
@@ -0,0 +1,41 @@
+import types
+
+import numpy as np
+import pandas as pd
+
+import memory_governor
+
+
+def test_downcast_column():
+    assert memory_governor.downcast_column(pd.Series([1.0, 2.0, 70.0])).dtype == np.int16
+    assert memory_governor.downcast_column(pd.Series([1.0, np.nan])).dtype == np.float32
+    assert memory_governor.downcast_column(pd.Series([0.5, 1e5])).dtype == np.float32
+    assert memory_governor.downcast_column(pd.Series([1e6])).dtype == np.float32
+    assert memory_governor.downcast_column(pd.Series([0.1])).dtype == np.float64
+    assert memory_governor.downcast_column(pd.Series(['SOFT', 'HARD'], name='Compound')).dtype == 'category'
+    assert memory_governor.downcast_column(pd.Series(['Finished'], name='Notes')).dtype != 'category'
+
+
+def test_slim_session_keeps_values_and_drops_unused_columns():
+    laps = pd.DataFrame({
+        'Driver': ['VER', 'VER', 'LEC'],
+        'LapNumber': [1.0, 2.0, 1.0],
+        'LapTime': pd.to_timedelta([92.1, 91.8, 92.4], unit='s'),
+        'Compound': ['SOFT', 'SOFT', 'MEDIUM'],
+        'SpeedI1': [300.1, 301.2, 299.9]
+    })
+    session = types.SimpleNamespace(_laps=laps.copy(), _results=pd.DataFrame())
+    before = memory_governor.session_bytes(session)
+    memory_governor.slim_session(session)
+
+    assert list(session._laps.columns) == ['Driver', 'LapNumber', 'LapTime', 'Compound']
+    assert session._laps['LapNumber'].dtype == np.int16
+    assert session._laps['Driver'].tolist() == laps['Driver'].tolist()
+    assert session._laps['LapTime'].equals(laps['LapTime'])
+    assert memory_governor.session_bytes(session) < before
+
+
+def test_deep_bytes_counts_shared_values_once():
+    array = np.zeros(1000)
+    assert memory_governor.deep_bytes({'a': array, 'b': array}) < 2 * array.nbytes
+    assert memory_governor.deep_bytes([array]) >= array.nbytes
@@ -0,0 +1,80 @@
+import time
+from datetime import date
+
+import pytest
+
+CURRENT_SEASON = date.today().year
+
+
+@pytest.fixture
+def missing(server, monkeypatch):
+    """The server module with an empty missing cache and a clock the test moves"""
+    # Starts at the real time, date.today() reads the same clock
+    clock = [time.time()]
+    monkeypatch.setattr(server.time, 'time', lambda: clock[0])
+    server.clear_caches()
+    yield server, clock
+    server.clear_caches()
+
+
+def test_historical_misses_are_permanent(missing):
+    server, clock = missing
+    key = ('event', 2019, 'atlantis_grand_prix')
+    assert not server.is_known_missing(key)
+
+    server.remember_missing(key, 2019)
+    clock[0] += 10 * server.MISSING_TTL
+    assert server.is_known_missing(key)
+
+
+@pytest.mark.parametrize('season, permanent', [(2019, False), (CURRENT_SEASON, True), (CURRENT_SEASON, False)])
+def test_other_misses_expire_after_the_ttl(missing, season, permanent):
+    server, clock = missing
+    key = ('session', season, 'Monaco Grand Prix', 'Sprint')
+    server.remember_missing(key, season, permanent=permanent)
+
+    clock[0] += server.MISSING_TTL - 1
+    assert server.is_known_missing(key)
+    clock[0] += 1
+    assert not server.is_known_missing(key)
+    assert key not in server._missing_cache
+
+
+def failing_get_session(message, calls):
+    def get_session(season, event_name, session_type):
+        calls.append(session_type)
+        raise ValueError(message)
+    return get_session
+
+
+def test_sessions_not_held_are_remembered_for_good(missing, monkeypatch):
+    server, clock = missing
+    calls = []
+    message = "Session type 'Sprint' does not exist for this event"
+    monkeypatch.setattr(server.data_source, 'get_session', failing_get_session(message, calls))
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match='does not exist'):
+            server.get_held_session(2019, 'Monaco Grand Prix', 'Sprint')
+    clock[0] += 10 * server.MISSING_TTL
+    with pytest.raises(ValueError, match='does not exist'):
+        server.get_held_session(2019, 'Monaco Grand Prix', 'Sprint')
+    assert calls == ['Sprint']
+
+
+def test_other_lookup_errors_are_retried_after_the_ttl(missing, monkeypatch):
+    server, clock = missing
+    calls = []
+    get_session = server.data_source.get_session
+    monkeypatch.setattr(server.data_source, 'get_session', failing_get_session("Failed to load schedule", calls))
+
+    with pytest.raises(ValueError, match='Failed to load schedule'):
+        server.get_held_session(2019, 'Monaco Grand Prix', 'Race')
+    with pytest.raises(ValueError):
+        server.get_held_session(2019, 'Monaco Grand Prix', 'Race')
+    assert calls == ['Race']
+
+    # Once the schedule loads again the session is found
+    monkeypatch.setattr(server.data_source, 'get_session', get_session)
+    clock[0] += server.MISSING_TTL
+    assert server.get_held_session(2019, 'Monaco Grand Prix', 'Race') is not None
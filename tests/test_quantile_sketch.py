@@ -0,0 +1,53 @@
+import numpy as np
+
+import quantile_sketch
+
+
+def test_quantiles_of_small_input_are_exact():
+    sketch = quantile_sketch.sketch_from_values([4.0, 1.0, 3.0, 2.0, np.nan])
+    assert quantile_sketch.sketch_count(sketch) == 4
+    assert sketch['min'] == 1.0 and sketch['max'] == 4.0
+    assert quantile_sketch.sketch_quantiles(sketch, [0.0, 1.0]).tolist() == [1.0, 4.0]
+
+
+def test_quantiles_track_numpy_within_tolerance():
+    values = np.random.default_rng(1).normal(90.0, 2.0, 20000)
+    sketch = quantile_sketch.sketch_from_values(values)
+    assert len(sketch['means']) <= quantile_sketch.DEFAULT_COMPRESSION
+
+    quantiles = [0.01, 0.1, 0.5, 0.9, 0.99]
+    estimated = quantile_sketch.sketch_quantiles(sketch, quantiles)
+    assert np.allclose(estimated, np.quantile(values, quantiles), atol=0.05)
+
+
+def test_merged_sketches_match_a_sketch_of_all_values():
+    rng = np.random.default_rng(2)
+    parts = [rng.normal(88.0 + i, 1.5, 3000) for i in range(4)]
+    merged = quantile_sketch.merge_sketches([quantile_sketch.sketch_from_values(p) for p in parts])
+    values = np.concatenate(parts)
+
+    assert quantile_sketch.sketch_count(merged) == len(values)
+    assert merged['min'] == values.min() and merged['max'] == values.max()
+    assert np.allclose(quantile_sketch.sketch_quantiles(merged, [0.25, 0.5, 0.75]),
+                       np.quantile(values, [0.25, 0.5, 0.75]), atol=0.05)
+
+
+def test_empty_sketches():
+    empty = quantile_sketch.sketch_from_values([np.nan])
+    assert quantile_sketch.sketch_count(empty) == 0
+    assert np.isnan(quantile_sketch.sketch_quantiles(empty, [0.5])).all()
+    assert quantile_sketch.sketch_count(quantile_sketch.merge_sketches([empty, empty])) == 0
+    assert np.isnan(quantile_sketch.sketch_filtered_mean(empty, 0, 100))
+
+
+def test_filtered_mean_ignores_centroids_outside_the_range():
+    sketch = quantile_sketch.sketch_from_values([90.0, 91.0, 92.0, 150.0])
+    assert quantile_sketch.sketch_filtered_mean(sketch, 80, 100) == 91.0
+
+
+def test_json_round_trip():
+    for sketch in (quantile_sketch.sketch_from_values([1.5, 2.5, 9.0]), quantile_sketch.empty_sketch()):
+        restored = quantile_sketch.sketch_from_json(quantile_sketch.sketch_to_json(sketch))
+        assert np.array_equal(restored['means'], sketch['means'])
+        assert np.array_equal(restored['weights'], sketch['weights'])
+        assert np.array_equal([restored['min'], restored['max']], [sketch['min'], sketch['max']], equal_nan=True)
@@ -0,0 +1,106 @@
+import pytest
+
+import request_metrics
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """perf_counter under the test's control, in seconds"""
+    now = [100.0]
+    monkeypatch.setattr(request_metrics.time, 'perf_counter', lambda: now[0])
+    request_metrics.reset()
+    yield now
+    request_metrics.reset()
+
+
+def metric_lines(prefix):
+    return [line for line in request_metrics.render().splitlines() if line.startswith(prefix)]
+
+
+def gauge(name):
+    lines = metric_lines(f'f1_{name} ')
+    return float(lines[0].split()[1]) if lines else 0.0
+
+
+def test_request_phases_server_timing_and_histograms(clock):
+    in_flight = gauge('requests_in_flight')
+    timer = request_metrics.begin_request()
+    assert gauge('requests_in_flight') == in_flight + 1
+
+    with request_metrics.phase('load'):
+        clock[0] += 0.3
+    with timer.phase('serialize'):
+        clock[0] += 0.02
+    clock[0] += 0.01
+
+    phases = request_metrics.finish_handler(timer)
+    assert list(phases) == ['load', 'processing', 'serialize', 'total']
+    assert request_metrics.server_timing(phases) == \
+        'load;dur=300.0, processing;dur=10.0, serialize;dur=20.0, total;dur=330.0'
+
+    clock[0] += 0.004
+    request_metrics.end_request(timer, '/api/x', 200)
+    request_metrics.end_request(timer, '/api/x', 200)  # Only the first call counts
+    assert gauge('requests_in_flight') == in_flight
+
+    assert metric_lines('f1_requests_total{route="/api/x"') == ['f1_requests_total{route="/api/x",status="200"} 1']
+    load = metric_lines('f1_request_phase_seconds_bucket{route="/api/x",phase="load"')
+    assert load[5:8] == [
+        'f1_request_phase_seconds_bucket{route="/api/x",phase="load",le="0.25"} 0',
+        'f1_request_phase_seconds_bucket{route="/api/x",phase="load",le="0.5"} 1',
+        'f1_request_phase_seconds_bucket{route="/api/x",phase="load",le="1.0"} 1'
+    ]
+    assert load[-1] == 'f1_request_phase_seconds_bucket{route="/api/x",phase="load",le="+Inf"} 1'
+    assert metric_lines('f1_request_phase_seconds_sum{route="/api/x",phase="response"}') == \
+        ['f1_request_phase_seconds_sum{route="/api/x",phase="response"} 0.004000']
+    assert metric_lines('f1_request_phase_seconds_sum{route="/api/x",phase="total"}') == \
+        ['f1_request_phase_seconds_sum{route="/api/x",phase="total"} 0.334000']
+
+
+def test_the_thread_lets_go_of_a_finished_request(clock):
+    timer = request_metrics.begin_request()
+    request_metrics.finish_handler(timer)
+    assert request_metrics.current_timer() is None
+
+    # Work the thread does next, such as a streamed body, is not added to the request
+    with request_metrics.phase('serialize'):
+        clock[0] += 1.0
+    assert 'serialize' not in timer.phases
+    request_metrics.end_request(timer, '/api/x', 200)
+
+
+def test_reset_keeps_requests_in_flight(clock):
+    in_flight = gauge('requests_in_flight')
+    timer = request_metrics.begin_request()
+    request_metrics.reset()
+    assert gauge('requests_in_flight') == in_flight + 1
+
+    request_metrics.finish_handler(timer)
+    request_metrics.end_request(timer, '/api/x', 200)
+    assert gauge('requests_in_flight') == in_flight
+
+
+def test_responses_carry_server_timing_and_are_counted_once_sent(client):
+    request_metrics.reset()
+    response = client.get('/api/seasons')
+    assert 'total;dur=' in response.headers['Server-Timing']
+    response.close()
+
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert 'f1_requests_total{route="/api/seasons",status="200"} 1' in metrics
+    assert 'f1_request_phase_seconds_count{route="/api/seasons",phase="response"} 1' in metrics
+
+
+def test_streamed_batch_is_timed_as_one_request(client):
+    request_metrics.reset()
+    response = client.post('/api/batch', json={"sessions": [
+        {"season": 2023, "raceId": "bahrain_grand_prix", "sessionType": "race"},
+        {"season": 2023, "raceId": "monaco_grand_prix", "sessionType": "qualifying"}
+    ]})
+    assert len(response.get_data(as_text=True).splitlines()) == 2
+    response.close()
+
+    metrics = request_metrics.render()
+    assert 'f1_requests_total{route="/api/batch",status="200"} 1' in metrics
+    assert 'f1_request_phase_seconds_count{route="/api/batch",phase="serialize"} 1' in metrics
+    assert 'f1_request_phase_seconds_count{route="/api/batch",phase="response"} 1' in metrics
@@ -0,0 +1,33 @@
+import json
+
+BUNDLE = '/api/season/2023/race/bahrain_grand_prix/race/bundle'
+
+
+def test_bundle_parts_match_their_routes(client):
+    bundle = client.get(BUNDLE).get_json()
+    assert set(bundle) == {'season', 'raceId', 'sessionType', 'sessions', 'results', 'laps', 'stints'}
+    assert bundle['results'] == client.get('/api/season/2023/race/bahrain_grand_prix/race').get_json()
+    assert bundle['laps'] == client.get('/api/season/2023/race/bahrain_grand_prix/race/laps').get_json()
+
+
+def test_repeated_and_blank_parts_are_dropped(client):
+    response = client.get(f'{BUNDLE}?parts=laps,,laps, results')
+    assert response.status_code == 200
+    assert set(response.get_json()) == {'season', 'raceId', 'sessionType', 'laps', 'results'}
+
+
+def test_repeated_parts_that_all_fail_fail_the_request(client):
+    response = client.get('/api/season/2023/race/no_such_grand_prix/race/bundle?parts=results,results')
+    assert response.status_code == 404
+    assert set(response.get_json()['errors']) == {'results'}
+
+
+def test_bundle_without_parts_is_rejected(client):
+    for parts in (',', ' , ', ''):
+        response = client.get(f'{BUNDLE}?parts={parts}')
+        assert response.status_code == 400
+        assert json.loads(response.data) == {"error": "Expected at least one bundle part"}
+
+
+def test_unknown_parts_are_rejected(client):
+    assert client.get(f'{BUNDLE}?parts=laps,weather').status_code == 400
@@ -0,0 +1,107 @@
+import json
+
+import flask
+import numpy as np
+import pandas as pd
+
+import lap_analysis
+import session_models
+import synthetic_data
+from data_sources import synthetic_laps_frame
+
+# jsonify's encoding, the bodies the front end was written against
+app = flask.Flask(__name__)
+
+
+def jsonify_body(value):
+    with app.app_context():
+        return app.json.response(value).get_data(as_text=True)
+
+
+def fixture_laps():
+    """Synthetic race laps with the gaps real sessions have"""
+    laps = synthetic_laps_frame(2023, 'monaco_grand_prix', 'race')
+    laps.loc[3, 'LapTime'] = pd.NaT
+    laps.loc[5, 'LapNumber'] = np.nan
+    laps.loc[7, 'Compound'] = None
+    laps.loc[9, 'TyreLife'] = np.nan
+    laps.loc[11, 'Compound'] = 'TEST_UNKNOWN'
+    # A lap under a minute and one on a whole second, where zero padding would show
+    laps.loc[13, 'LapTime'] = pd.to_timedelta(59.5, unit='s')
+    laps.loc[15, 'LapTime'] = pd.to_timedelta(65, unit='s')
+    # Shuffled, as the dict path sorted each driver's laps itself
+    return laps.sample(frac=1, random_state=1)
+
+
+def dict_laps_data(laps):
+    """lapsData built one dict per lap, as the /laps endpoint did before the lap table"""
+    drivers_laps = {}
+    for _, lap in laps.iterrows():
+        if pd.isna(lap['LapTime']) or pd.isna(lap['LapNumber']):
+            continue
+        tire_life = lap['TyreLife']
+        drivers_laps.setdefault(lap['Driver'], []).append({
+            "lap": int(lap['LapNumber']),
+            "time": lap_analysis.format_lap_time(lap['LapTime'].total_seconds()),
+            "compound": lap_analysis.normalize_compound(lap['Compound']),
+            "tireAge": max(int(tire_life), 0) if not pd.isna(tire_life) else 0
+        })
+    return {driver: sorted(driver_laps, key=lambda lap: lap['lap']) for driver, driver_laps in drivers_laps.items()}
+
+
+def test_laps_json_matches_the_dict_path():
+    laps = fixture_laps()
+    table = lap_analysis.build_lap_table(laps)
+    assert session_models.laps_json(table) + '\n' == jsonify_body({"lapsData": dict_laps_data(laps)})
+
+
+def test_stints_json_matches_extract_strategy_from_laps(server):
+    laps = fixture_laps()
+    table = lap_analysis.build_lap_table(laps)
+    expected = server.extract_strategy_from_laps(dict_laps_data(laps))
+    assert session_models.stints_json(table) + '\n' == jsonify_body(expected)
+
+
+def test_stints_split_on_gaps_in_the_lap_numbers(server):
+    laps = synthetic_laps_frame(2023, 'monaco_grand_prix', 'race')
+    laps = laps[~laps['LapNumber'].isin([20, 21, 40])]
+    table = lap_analysis.build_lap_table(laps)
+    expected = server.extract_strategy_from_laps(dict_laps_data(laps))
+    assert json.loads(session_models.stints_json(table)) == expected
+
+
+def test_empty_lap_table():
+    table = lap_analysis.empty_lap_table()
+    assert session_models.laps_json(table) == '{"lapsData":{}}'
+    assert session_models.stints_json(table) == '{}'
+
+
+def test_result_records_match_dicts():
+    rows = [
+        (1, 'RAI', 'Kimi Räikkönen', 'Ferrari', 'Finished', '1:32:10.123'),
+        (2.0, 'VER', 'Max "Mad Max" Verstappen', 'Red Bull Racing', 'Finished', '+1.234'),
+        (None, 'PER', 'Sergio Perez', 'Red Bull Racing', 'DNF', None)
+    ]
+    fields = ('position', 'code', 'name', 'team', 'status', 'gap')
+    records = [session_models.ResultRecord(*row) for row in rows]
+    dicts = [dict(zip(fields, row)) for row in rows]
+
+    for record, row in zip(records, dicts):
+        assert record.encode_json() + '\n' == jsonify_body(row)
+
+    payload = {"results": records, "season": 2018, "laps": session_models.RawJSON('{"b":1,"a":[2]}')}
+    expected = {"results": dicts, "season": 2018, "laps": {"b": 1, "a": [2]}}
+    assert json.loads(session_models.encode_json(payload)) == expected
+    assert session_models.encode_json(dict(payload, laps=None)) + '\n' == jsonify_body(dict(expected, laps=None))
+
+
+def test_lap_times_have_one_format():
+    assert lap_analysis.format_lap_time(92.456) == '1:32.456'
+    assert lap_analysis.format_lap_time(65.123) == '1:5.123'
+    assert lap_analysis.format_lap_time(59.5) == '0:59.500'
+
+    laps_data = synthetic_data.generate_lap_data_for_session(2023, 'monaco_grand_prix', 'race')['lapsData']
+    arrays = synthetic_data.generate_lap_arrays(2023, 'monaco_grand_prix', 'race')
+    first_driver = arrays['drivers'][0]
+    assert [lap['time'] for lap in laps_data[first_driver]] == \
+        [lap_analysis.format_lap_time(t) for t in arrays['time'][0].tolist()]
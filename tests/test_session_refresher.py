@@ -0,0 +1,53 @@
+from datetime import date
+
+import session_refresher
+from session_refresher import LIVE_INTERVAL, RECENT_TTL, SessionRefresher, is_stale, session_tier
+
+TODAY = date(2024, 5, 24)
+
+
+def test_past_seasons_are_historical():
+    assert session_tier(2023, date(2023, 11, 26), today=TODAY) == 'historical'
+    assert session_tier(2023, None, today=TODAY) == 'historical'
+
+
+def test_race_weekend_is_live():
+    assert session_tier(2024, date(2024, 5, 26), today=date(2024, 5, 23)) == 'live'
+    assert session_tier(2024, date(2024, 5, 26), today=date(2024, 5, 27)) == 'live'
+
+
+def test_rest_of_current_season_is_recent():
+    assert session_tier(2024, date(2024, 5, 26), today=date(2024, 5, 22)) == 'recent'
+    assert session_tier(2024, date(2024, 5, 26), today=date(2024, 5, 28)) == 'recent'
+    assert session_tier(2024, None, today=date(2024, 5, 22)) == 'recent'
+
+
+def test_staleness_by_tier():
+    now = 1_000_000.0
+    assert not is_stale('historical', 0.0, now=now)
+    assert not is_stale('live', now - LIVE_INTERVAL + 1, now=now)
+    assert is_stale('live', now - LIVE_INTERVAL, now=now)
+    assert not is_stale('recent', now - LIVE_INTERVAL, now=now)
+    assert is_stale('recent', now - RECENT_TTL, now=now)
+
+
+def test_refresher_does_not_start_for_an_unserved_season():
+    refresher = SessionRefresher(lambda season: [], lambda key: None, lambda key: None, range(2018, 2019))
+    assert refresher.current_season() is None
+    refresher.start()
+    assert refresher.thread is None
+    assert refresher.live_sessions() == []
+
+
+def test_run_once_reloads_live_and_queued_sessions(monkeypatch):
+    monkeypatch.setattr(session_refresher, 'date', type('FixedDate', (date,), {'today': staticmethod(lambda: TODAY)}))
+    events = [('Monaco Grand Prix', date(2024, 5, 26), ['Race']), ('Miami Grand Prix', date(2024, 5, 5), ['Race'])]
+    reloaded = []
+    refresher = SessionRefresher(lambda season: events, lambda key: None, reloaded.append, [2024])
+
+    refresher.request_refresh((2024, 'Miami Grand Prix', 'Race'))
+    refresher.run_once()
+
+    assert reloaded == [(2024, 'Monaco Grand Prix', 'Race'), (2024, 'Miami Grand Prix', 'Race')]
+    assert refresher.tier(2024, 'Monaco Grand Prix') == 'live'
+    assert refresher.tier(2024, 'Miami Grand Prix') == 'recent'
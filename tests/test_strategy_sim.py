@@ -0,0 +1,78 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import strategy_sim
+
+
+@pytest.mark.parametrize('total_laps, n_compounds, max_stops, min_stint', [(30, 3, 2, 5), (40, 2, 3, 8), (12, 3, 3, 5)])
+def test_enumerate_plans(total_laps, n_compounds, max_stops, min_stint):
+    lengths, compounds, stops = strategy_sim.enumerate_plans(total_laps, n_compounds, max_stops, min_stint)
+    assert lengths.shape == compounds.shape == (len(stops), max_stops + 1)
+
+    stints = np.arange(max_stops + 1)
+    used = stints[None, :] <= stops[:, None]
+    assert (lengths.sum(axis=1) == total_laps).all()
+    assert ((lengths >= min_stint) == used).all()
+    assert (compounds[~used] == 0).all()
+    for plan_compounds, plan_stops in zip(compounds, stops):
+        assert len(set(plan_compounds[:plan_stops + 1])) >= 2
+
+    # Same plans as trying every pit lap on the grid with every compound sequence
+    expected = 0
+    for n_stops in range(1, max_stops + 1):
+        grid = range(min_stint, total_laps - min_stint + 1, strategy_sim.PIT_LAP_STEP[n_stops])
+        valid_laps = sum(1 for pits in itertools.combinations(grid, n_stops)
+                         if (np.diff((0,) + pits + (total_laps,)) >= min_stint).all())
+        expected += valid_laps * (n_compounds ** (n_stops + 1) - n_compounds)
+    assert len(stops) == expected
+    assert len(set(map(tuple, np.concatenate([lengths, compounds], axis=1).tolist()))) == expected
+
+
+def test_enumerate_plans_without_room_for_a_stop():
+    lengths, compounds, stops = strategy_sim.enumerate_plans(9, 3, min_stint=5)
+    assert lengths.shape == (0, 4) and len(stops) == 0
+
+
+# Soft is faster at first but wears out at once, so one stop for the shortest Soft stint is clearly best
+INPUTS = {
+    "totalLaps": 50,
+    "baseTime": 90.0,
+    "fuelEffect": 0.03,
+    "compounds": {
+        "Soft": {"offset": 0.0, "degradation": 0.5, "spread": 0.001},
+        "Hard": {"offset": 0.8, "degradation": 0.0, "spread": 0.001}
+    }
+}
+
+
+@pytest.mark.parametrize('lap_noise', [0.0, strategy_sim.DEFAULT_LAP_NOISE, 5.0])
+def test_cheapest_plan_ranks_first(lap_noise):
+    result = strategy_sim.simulate(INPUTS, samples=200, min_stint=5, lap_noise=lap_noise, top=3, seed=7)
+    first, second, third = result['plans']
+
+    # Soft first or last costs the same, the next plan runs one more lap on Soft
+    for plan in (first, second):
+        assert plan['stops'] == 1
+        assert sorted(plan['compounds']) == ['Hard', 'Soft']
+        assert plan['pitLaps'] in ([5], [45])
+    assert second['deltaToBest'] == 0.0
+    assert third['deltaToBest'] == pytest.approx(0.5 * (21 - 15) - 0.8, abs=0.05)
+
+
+def test_lap_noise_only_widens_the_interval():
+    quiet = strategy_sim.simulate(INPUTS, samples=500, lap_noise=0.0, top=5, seed=3)
+    noisy = strategy_sim.simulate(INPUTS, samples=500, lap_noise=5.0, top=5, seed=3)
+
+    assert [p['pitLaps'] for p in noisy['plans']] == [p['pitLaps'] for p in quiet['plans']]
+    assert [p['deltaToBest'] for p in noisy['plans']] == pytest.approx([p['deltaToBest'] for p in quiet['plans']],
+                                                                        abs=0.01)
+    width = lambda plan: plan['ci90'][1] - plan['ci90'][0]
+    assert width(noisy['plans'][0]) > width(quiet['plans'][0])
+
+
+def test_seeded_runs_are_repeatable():
+    first = strategy_sim.simulate(INPUTS, samples=100, seed=11)
+    second = strategy_sim.simulate(INPUTS, samples=100, seed=11)
+    assert first['plans'] == second['plans']
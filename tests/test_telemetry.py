@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+import telemetry
+
+
+def lap_trace(n, seed=0):
+    """Distance and a noisy speed trace of one lap sampled n times"""
+    rng = np.random.default_rng(seed)
+    distance = np.sort(rng.uniform(0, 5400, n))
+    speed = 200 + 80 * np.sin(distance / 300) + rng.normal(0, 5, n)
+    return distance, speed
+
+
+@pytest.mark.parametrize('n, points', [(1000, 500), (4321, 97), (50, 3), (10, 9)])
+def test_lttb_keeps_endpoints_and_returns_the_requested_points(n, points):
+    distance, speed = lap_trace(n)
+    keep = telemetry.lttb_indices(distance, speed, points)
+
+    assert len(keep) == points
+    assert keep[0] == 0 and keep[-1] == n - 1
+    # Every point is chosen once and in distance order
+    assert np.all(np.diff(keep) > 0)
+    assert np.all(np.diff(distance[keep]) >= 0)
+
+
+def test_lttb_picks_the_extreme_point_of_a_bucket():
+    x = np.arange(100, dtype=np.float64)
+    y = np.zeros(100)
+    y[42] = 50.0
+
+    keep = telemetry.lttb_indices(x, y, 10)
+    assert 42 in keep
+
+
+@pytest.mark.parametrize('points', [100, 1000, 2])
+def test_lttb_keeps_every_point_when_it_cannot_reduce(points):
+    distance, speed = lap_trace(100)
+    assert telemetry.lttb_indices(distance, speed, points).tolist() == list(range(100))
+
+
+def test_downsample_telemetry_keeps_channels_aligned():
+    distance, speed = lap_trace(2000)
+    gear = np.clip(speed // 40, 1, 8)
+    channels = {'distance': distance, 'speed': speed, 'gear': gear.astype(np.float32)}
+
+    result = telemetry.downsample_telemetry(channels, 200)
+    keep = telemetry.lttb_indices(distance, speed, 200)
+
+    assert result['rawPoints'] == 2000 and result['points'] == 200
+    assert result['distance'] == np.round(distance[keep], 1).tolist()
+    assert result['speed'] == np.round(speed[keep], 1).tolist()
+    assert result['gear'] == [int(g) for g in gear[keep]]
+    assert result['distance'][0] == round(distance[0], 1)
+    assert result['distance'][-1] == round(distance[-1], 1)
+
+
+def test_downsample_telemetry_returns_missing_samples_as_none():
+    distance, speed = lap_trace(300)
+    speed[0] = np.nan
+
+    result = telemetry.downsample_telemetry({'distance': distance, 'speed': speed}, 50)
+    assert result['speed'][0] is None
+    assert all(v is not None for v in result['speed'][1:])
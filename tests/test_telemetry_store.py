@@ -0,0 +1,55 @@
+import types
+
+import numpy as np
+
+import telemetry_store
+from data_sources import synthetic_car_data, synthetic_laps_frame
+
+
+def synthetic_session():
+    laps = synthetic_laps_frame(2023, 'monaco_grand_prix', 'race')
+    return types.SimpleNamespace(laps=laps, car_data=synthetic_car_data(laps))
+
+
+def test_round_trip(tmp_path):
+    session = synthetic_session()
+    path = telemetry_store.store_path(tmp_path, 2023, 'Monaco Grand Prix', 'Race')
+    telemetry_store.build_store(session, path, 100.0)
+
+    assert telemetry_store.store_exists(path)
+    store = telemetry_store.open_store(path)
+    assert store['loaded_at'] == 100.0
+
+    driver_number, car_data = next(iter(session.car_data.items()))
+    driver_laps = session.laps[session.laps['DriverNumber'] == driver_number]
+    code = driver_laps['Driver'].iloc[0]
+
+    whole = telemetry_store.driver_channels(store, code)
+    assert np.allclose(whole['speed'], car_data['Speed'].astype(np.float32))
+    assert np.array_equal(whole['gear'], car_data['nGear'])
+    assert whole['distance'][0] == 0.0 and np.all(np.diff(whole['distance']) >= 0)
+
+    lap = telemetry_store.lap_channels(store, code, 5)
+    lap_start, lap_end = driver_laps.loc[driver_laps['LapNumber'] == 5, ['LapStartTime', 'Time']].iloc[0]
+    in_lap = car_data['SessionTime'].between(lap_start, lap_end)
+    assert np.allclose(lap['speed'], car_data.loc[in_lap, 'Speed'].astype(np.float32))
+
+    assert telemetry_store.lap_channels(store, code, 999) is None
+    assert telemetry_store.driver_channels(store, 'XXX') is None
+    assert telemetry_store.max_speed(store) == np.float32(max(d['Speed'].max() for d in session.car_data.values()))
+
+
+def test_only_newer_loads_replace_a_store(tmp_path):
+    session = synthetic_session()
+    path = telemetry_store.store_path(tmp_path, 2023, 'Monaco Grand Prix', 'Race')
+    telemetry_store.build_store(session, path, 200.0)
+
+    telemetry_store.build_store(session, path, 100.0)
+    assert telemetry_store.store_loaded_at(path) == 200.0
+
+    telemetry_store.build_store(session, path, 300.0)
+    assert telemetry_store.store_loaded_at(path) == 300.0
+    assert sorted(p.name for p in tmp_path.glob('2023/monaco_grand_prix/*')) == ['race']
+
+    telemetry_store.remove_store(path)
+    assert not telemetry_store.store_exists(path)